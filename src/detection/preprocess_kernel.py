@@ -0,0 +1,125 @@
+"""
+YOLO输入预处理内核 (Numba加速)
+单次遍历完成 BGR→RGB、双线性等比缩放、letterbox填充、HWC→CHW 和归一化，
+直接写入可送入模型的 (3, H, W) float32 缓冲区
+
+Numba在CPU上不支持float16，半精度转换在张量上传到GPU后进行。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器（保持纯Python可执行）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+def letterbox_geometry(
+    img_height: int,
+    img_width: int,
+    imgsz: int,
+    stride: int = 32,
+    auto: bool = True
+) -> tuple:
+    """
+    计算letterbox缩放尺寸和填充量（与Ultralytics LetterBox一致）
+
+    Args:
+        img_height: 原图高度
+        img_width: 原图宽度
+        imgsz: 模型输入尺寸
+        stride: 填充对齐步长
+        auto: True时只填充到stride的整数倍（PyTorch模型）；
+              False时填充到 imgsz×imgsz（导出的引擎等固定输入尺寸的模型）
+
+    Returns:
+        (比例, 缩放后高, 缩放后宽, 上填充, 左填充, 输出高, 输出宽)
+    """
+    ratio = min(imgsz / img_height, imgsz / img_width)
+    new_height = int(round(img_height * ratio))
+    new_width = int(round(img_width * ratio))
+
+    if auto:
+        pad_h = (stride - new_height % stride) % stride
+        pad_w = (stride - new_width % stride) % stride
+    else:
+        pad_h = imgsz - new_height
+        pad_w = imgsz - new_width
+
+    return (ratio, new_height, new_width, pad_h // 2, pad_w // 2,
+            new_height + pad_h, new_width + pad_w)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def letterbox_to_chw(src, dst, new_height, new_width, top, left, pad_value):
+    """
+    BGR uint8 图像 → letterbox 后的 RGB CHW 归一化数组
+
+    双线性插值采用像素中心对齐（同 cv2.INTER_LINEAR），按输出行并行。
+
+    Args:
+        src: (H, W, 3) uint8 BGR 原图
+        dst: (3, out_H, out_W) float32 输出缓冲区
+        new_height: 缩放后高度
+        new_width: 缩放后宽度
+        top: 上填充
+        left: 左填充
+        pad_value: 填充值（已归一化到 [0, 1]）
+    """
+    src_h = src.shape[0]
+    src_w = src.shape[1]
+    scale_y = src_h / new_height
+    scale_x = src_w / new_width
+    inv = np.float32(1.0 / 255.0)
+
+    # 填充区域整体赋值，缩放区域之外不再逐像素判断
+    dst[:, :top, :] = pad_value
+    dst[:, top + new_height:, :] = pad_value
+    dst[:, :, :left] = pad_value
+    dst[:, :, left + new_width:] = pad_value
+
+    # 每列的采样位置和权重只与列号有关，预先计算一次
+    col_x0 = np.empty(new_width, dtype=np.int64)
+    col_x1 = np.empty(new_width, dtype=np.int64)
+    col_wx = np.empty(new_width, dtype=np.float32)
+    for col in range(new_width):
+        fx = (col + 0.5) * scale_x - 0.5
+        if fx < 0.0:
+            fx = 0.0
+        x0 = min(int(fx), src_w - 1)
+        col_x0[col] = x0
+        col_x1[col] = min(x0 + 1, src_w - 1)
+        col_wx[col] = fx - x0
+
+    for row in prange(new_height):
+        fy = (row + 0.5) * scale_y - 0.5
+        if fy < 0.0:
+            fy = 0.0
+        y0 = min(int(fy), src_h - 1)
+        y1 = min(y0 + 1, src_h - 1)
+        wy = np.float32(fy - y0)
+        y = row + top
+
+        for col in range(new_width):
+            x0 = col_x0[col]
+            x1 = col_x1[col]
+            wx = col_wx[col]
+            x = col + left
+
+            for c in range(3):
+                p00 = np.float32(src[y0, x0, c])
+                p01 = np.float32(src[y0, x1, c])
+                p10 = np.float32(src[y1, x0, c])
+                p11 = np.float32(src[y1, x1, c])
+                upper = p00 + (p01 - p00) * wx
+                lower = p10 + (p11 - p10) * wx
+                # BGR → RGB
+                dst[2 - c, y, x] = (upper + (lower - upper) * wy) * inv
@@ -3,10 +3,16 @@ YOLO检测引擎
 使用YOLOv11x模型进行目标检测
 """
 
+import os
+import copy
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+import cv2
 import numpy as np
 from typing import List, Dict, Any, Optional
 from ultralytics import YOLO
 from loguru import logger
+from . import preprocess_kernel
 
 
 class YOLODetector:
@@ -23,7 +29,11 @@ class YOLODetector:
         class_names: Dict[int, str] = None,
         target_classes: List[int] = None,
         tracker_type: str = "bytetrack.yaml",
-        obb_mode: bool = False
+        obb_mode: bool = False,
+        gpu_preprocess: bool = True,
+        cpu_preprocess: bool = False,
+        engine_path: str = "",
+        devices: List[str] = None
     ):
         """
         初始化YOLO检测器
@@ -39,25 +49,52 @@ class YOLODetector:
             target_classes: 目标类别列表（如果为None则检测所有类别）
             tracker_type: 跟踪器类型 ("bytetrack.yaml" 或 "botsort.yaml")
             obb_mode: 是否启用 OBB 旋转框模式
+            gpu_preprocess: 半精度推理时是否在GPU上完成缩放/归一化/FP16转换（需CUDA）
+            cpu_preprocess: 未启用GPU预处理时是否用Numba内核完成letterbox和CHW归一化（需numba）
+            engine_path: TensorRT引擎路径（文件存在时优先于model_path加载）
+            devices: 多设备推理的设备列表（如 ["cuda:0", "cuda:1"]），每个设备加载一个模型副本，
+                     detect_batch_async 将批次分派给空闲的副本；为空时只使用device
         """
         self.model_path = model_path
+        if engine_path:
+            if os.path.exists(engine_path):
+                self.model_path = engine_path
+            else:
+                logger.warning(f"TensorRT引擎不存在: {engine_path}，使用PyTorch权重 {model_path}")
         self.confidence_threshold = confidence_threshold
         self.iou_threshold = iou_threshold
-        self.device = device
+        self.device = devices[0] if devices else device
         self.half_precision = half_precision
         self.imgsz = imgsz
         self.class_names = class_names or {}
         self.target_classes = target_classes
         self.tracker_type = tracker_type
         self.obb_mode = obb_mode
+        self.gpu_preprocess = gpu_preprocess
+        self.cpu_preprocess = cpu_preprocess
+        
+        # GPU预处理使用的锁页内存和显存（双缓冲，按批次形状复用）及独立的H2D拷贝流
+        self._init_upload_buffers()
+        # CPU预处理输出的 (B, 3, H, W) float32 缓冲区（按批次形状复用）
+        self._chw_buffer = None
         
         # 加载模型
         self.model = None
+        self._predict_args = {}
         self._load_model()
         
         # 统计信息
         self.inference_count = 0
         self.total_detections = 0
+        
+        # 多设备模型副本（第一个为自身），空闲副本按轮转顺序取用
+        self._replicas = [self] + [self._spawn_replica(d) for d in (devices or [])[1:]]
+        self._free_replicas = queue.Queue()
+        for replica in self._replicas:
+            self._free_replicas.put(replica)
+        self._executor = None
+        if len(self._replicas) > 1:
+            logger.info(f"多设备推理已启用: {[r.device for r in self._replicas]}")
     
     def _load_model(self):
         """加载YOLO模型"""
@@ -75,10 +112,28 @@ class YOLODetector:
                 except:
                     pass
             
-            self.model = YOLO(self.model_path)
+            # 导出格式（.engine/.onnx等）由Ultralytics AutoBackend加载，需显式指定任务类型；
+            # 这类模型不支持 .to()，推理设备在每次调用时传入
+            if self.model_path.endswith('.pt'):
+                self.model = YOLO(self.model_path)
+                self.model.to(self.device)
+            else:
+                self.model = YOLO(self.model_path, task='obb' if self.obb_mode else 'detect')
+                self._predict_args = {'device': self.device}
+            
+            # 与Ultralytics一致：PyTorch模型只填充到32的整数倍，其他格式填充到 imgsz×imgsz
+            # （未以dynamic导出的引擎只接受固定尺寸输入）
+            self._letterbox_auto = self.model_path.endswith('.pt')
             
-            # 设置设备
-            self.model.to(self.device)
+            # 仅半精度CUDA推理时启用GPU预处理
+            self.gpu_preprocess = (
+                self.gpu_preprocess and self.half_precision
+                and str(self.device).startswith('cuda') and torch.cuda.is_available()
+            )
+            self.cpu_preprocess = (
+                self.cpu_preprocess and not self.gpu_preprocess
+                and preprocess_kernel.NUMBA_AVAILABLE
+            )
             
             mode_str = "OBB旋转框" if self.obb_mode else "HBB水平框"
             logger.info(f"YOLO模型加载成功，设备: {self.device}，模式: {mode_str}")
@@ -128,13 +183,15 @@ class YOLODetector:
         
         try:
             # 推理
+            source, letterbox = self._prepare_source([image])
             results = self.model(
-                image,
+                source if letterbox is not None else image,
                 conf=self.confidence_threshold,
                 iou=self.iou_threshold,
                 imgsz=self.imgsz,
                 half=self.half_precision,
-                verbose=False
+                verbose=False,
+                **self._predict_args
             )
             
             self.inference_count += 1
@@ -149,17 +206,19 @@ class YOLODetector:
                 if self.obb_mode and result.obb is not None:
                     detections += self._parse_obb_result(
                         result, img_width, img_height,
-                        return_type, check_edge, edge_threshold
+                        return_type, check_edge, edge_threshold,
+                        letterbox=letterbox
                     )
                 else:
                     detections += self._parse_hbb_result(
                         result, img_width, img_height,
-                        return_type, check_edge, edge_threshold
+                        return_type, check_edge, edge_threshold,
+                        letterbox=letterbox
                     )
                 
                 self.total_detections += len(detections)
             
-            logger.debug(f"检测到 {len(detections)} 个目标")
+            logger.debug("检测到 {} 个目标", len(detections))
             
             return detections
             
@@ -177,6 +236,112 @@ class YOLODetector:
         """
         批量检测
         
+        多帧图像在一次前向推理中完成，摊薄CUDA内核启动开销。
+        
+        Args:
+            images: 图像列表
+            return_type: 返回坐标类型
+            check_edge: 是否检查边缘
+            edge_threshold: 边缘距离阈值
+            
+        Returns:
+            检测结果列表的列表（与输入图像一一对应）
+        """
+        if not images:
+            return []
+        
+        if self.model is None:
+            logger.error("模型未加载")
+            return [[] for _ in images]
+        
+        try:
+            # 推理（batch参数决定一次前向的图像数）
+            source, letterbox = self._prepare_source(images)
+            results = self.model(
+                source,
+                conf=self.confidence_threshold,
+                iou=self.iou_threshold,
+                imgsz=self.imgsz,
+                half=self.half_precision,
+                batch=len(images),
+                verbose=False,
+                **self._predict_args
+            )
+            
+            self.inference_count += len(images)
+            
+            all_detections = []
+            for image, result in zip(images, results):
+                img_height, img_width = image.shape[:2]
+                
+                if self.obb_mode and result.obb is not None:
+                    detections = self._parse_obb_result(
+                        result, img_width, img_height,
+                        return_type, check_edge, edge_threshold,
+                        letterbox=letterbox
+                    )
+                else:
+                    detections = self._parse_hbb_result(
+                        result, img_width, img_height,
+                        return_type, check_edge, edge_threshold,
+                        letterbox=letterbox
+                    )
+                
+                self.total_detections += len(detections)
+                all_detections.append(detections)
+            
+            logger.opt(lazy=True).debug(
+                "批量检测 {} 帧，共 {} 个目标",
+                lambda: len(images), lambda: sum(len(d) for d in all_detections)
+            )
+            
+            return all_detections
+            
+        except Exception as e:
+            logger.error(f"YOLO批量检测时发生错误: {e}")
+            return [[] for _ in images]
+    
+    @property
+    def num_replicas(self) -> int:
+        """模型副本数（即可并行推理的设备数）"""
+        return len(self._replicas)
+    
+    def _spawn_replica(self, device: str) -> 'YOLODetector':
+        """
+        在指定设备上创建一个配置相同的模型副本
+        
+        Args:
+            device: 推理设备
+            
+        Returns:
+            模型副本（拥有独立的模型、预处理缓冲区和统计）
+        """
+        replica = copy.copy(self)
+        replica.device = device
+        replica.model = None
+        replica._predict_args = {}
+        replica._init_upload_buffers()
+        replica._chw_buffer = None
+        replica.inference_count = 0
+        replica.total_detections = 0
+        replica._replicas = [replica]
+        replica._executor = None
+        replica._load_model()
+        return replica
+    
+    def detect_batch_async(
+        self,
+        images: List[np.ndarray],
+        return_type: str = "corners",
+        check_edge: bool = False,
+        edge_threshold: int = 50
+    ) -> Future:
+        """
+        异步批量检测
+        
+        批次交给线程池，由当前空闲的模型副本执行：多设备时各设备并行推理，
+        单设备时推理与调用线程中的坐标转换、保存等后处理重叠。
+        
         Args:
             images: 图像列表
             return_type: 返回坐标类型
@@ -184,15 +349,215 @@ class YOLODetector:
             edge_threshold: 边缘距离阈值
             
         Returns:
-            检测结果列表的列表
+            Future，结果与 detect_batch 相同
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=len(self._replicas), thread_name_prefix='yolo-infer'
+            )
+        return self._executor.submit(
+            self._detect_on_free_replica, images, return_type, check_edge, edge_threshold
+        )
+    
+    def _detect_on_free_replica(
+        self,
+        images: List[np.ndarray],
+        return_type: str,
+        check_edge: bool,
+        edge_threshold: int
+    ) -> List[List[Dict[str, Any]]]:
+        """取一个空闲副本执行检测，完成后放回队尾（轮转分派）"""
+        replica = self._free_replicas.get()
+        try:
+            if len(images) == 1:
+                return [replica.detect(images[0], return_type, check_edge, edge_threshold)]
+            return replica.detect_batch(images, return_type, check_edge, edge_threshold)
+        finally:
+            self._free_replicas.put(replica)
+    
+    def close(self):
+        """等待异步推理完成并释放线程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _prepare_source(self, images: List[np.ndarray]):
+        """
+        准备推理输入
+        
+        启用GPU预处理时，帧按Ultralytics LetterBox的方式（uint8上cv2双线性缩放，
+        填充值114）直接letterbox到双缓冲锁页内存，异步拷贝到GPU后完成BGR→RGB
+        和FP16归一化，模型输入与Ultralytics预处理逐像素一致；
+        启用CPU预处理时，由Numba内核单次遍历完成同样的变换，写入复用的
+        CHW缓冲区后送入模型；否则原样返回ndarray列表，由Ultralytics预处理。
+        
+        Args:
+            images: BGR图像列表
+            
+        Returns:
+            (推理输入, 缩放信息)；缩放信息为 (比例, x填充, y填充)，未启用预处理时为None
         """
-        all_detections = []
+        if not (self.gpu_preprocess or self.cpu_preprocess) or len({img.shape for img in images}) != 1:
+            return images, None
+        
+        img_height, img_width = images[0].shape[:2]
+        ratio, new_height, new_width, top, left, out_height, out_width = \
+            preprocess_kernel.letterbox_geometry(
+                img_height, img_width, self.imgsz, auto=self._letterbox_auto
+            )
+        
+        if self.cpu_preprocess:
+            tensor = self._prepare_source_cpu(
+                images, new_height, new_width, top, left, out_height, out_width
+            )
+            return tensor, (ratio, left, top)
+        
+        # (B, H, W, 3) uint8 → (B, 3, H, W) RGB 半精度 [0, 1]（同Ultralytics：先转半精度再除以255）
+        tensor = self._upload_uint8(images, (new_height, new_width, top, left, out_height, out_width))
+        tensor = tensor.permute(0, 3, 1, 2).flip(1).half().div_(255.0)
+        
+        return tensor, (ratio, left, top)
+    
+    def _init_upload_buffers(self):
+        """重置GPU预处理的上传缓冲区（首次上传时按批次形状分配）"""
+        self._upload_slot = 0
+        self._pinned_buffers = [None, None]
+        self._device_buffers = [None, None]
+        self._upload_events = [None, None]
+        self._h2d_stream = None
+    
+    def _upload_uint8(self, images: List[np.ndarray], geometry: tuple):
+        """
+        将同尺寸uint8帧letterbox到锁页内存并异步拷贝到GPU
+        
+        逐帧在独立的H2D流上发起拷贝，CPU letterbox下一帧与上一帧的DMA传输重叠；
+        锁页内存和显存双缓冲，填充当前缓冲区时不必等待上一批次的拷贝。
+        
+        Args:
+            images: 同尺寸BGR图像列表
+            geometry: (缩放后高, 缩放后宽, 上填充, 左填充, 输出高, 输出宽)
+            
+        Returns:
+            (B, out_H, out_W, 3) uint8 GPU张量，当前流已等待拷贝完成
+        """
+        import torch
+        
+        slot = self._upload_slot
+        self._upload_slot ^= 1
+        
+        new_height, new_width, top, left, out_height, out_width = geometry
+        batch_shape = (len(images), out_height, out_width, 3)
+        if self._pinned_buffers[slot] is None or tuple(self._pinned_buffers[slot].shape) != batch_shape:
+            self._pinned_buffers[slot] = torch.empty(batch_shape, dtype=torch.uint8).pin_memory()
+            self._device_buffers[slot] = torch.empty(batch_shape, dtype=torch.uint8, device=self.device)
+            self._upload_events[slot] = None
+        if self._h2d_stream is None:
+            self._h2d_stream = torch.cuda.Stream(device=self.device)
+        
+        # 覆盖该缓冲区前，等待其上一次拷贝完成
+        if self._upload_events[slot] is not None:
+            self._upload_events[slot].synchronize()
+        
+        pinned = self._pinned_buffers[slot]
+        device_buffer = self._device_buffers[slot]
+        host = pinned.numpy()
+        compute_stream = torch.cuda.current_stream(self.device)
+        
+        # 拷贝流先等待计算流用完该显存缓冲区
+        self._h2d_stream.wait_stream(compute_stream)
+        with torch.cuda.stream(self._h2d_stream):
+            for i, img in enumerate(images):
+                self._letterbox_into(img, host[i], new_height, new_width, top, left)
+                device_buffer[i].copy_(pinned[i], non_blocking=True)
+            event = torch.cuda.Event()
+            event.record(self._h2d_stream)
+        self._upload_events[slot] = event
+        
+        compute_stream.wait_stream(self._h2d_stream)
+        return device_buffer
+    
+    @staticmethod
+    def _letterbox_into(
+        img: np.ndarray,
+        dst: np.ndarray,
+        new_height: int,
+        new_width: int,
+        top: int,
+        left: int
+    ):
+        """
+        按Ultralytics LetterBox的方式将图像缩放并填充到dst（uint8，原地写入）
+        
+        Args:
+            img: (H, W, 3) uint8 BGR图像
+            dst: (out_H, out_W, 3) uint8 输出缓冲区
+            new_height: 缩放后高度
+            new_width: 缩放后宽度
+            top: 上填充
+            left: 左填充
+        """
+        bottom = top + new_height
+        right = left + new_width
+        dst[:top] = 114
+        dst[bottom:] = 114
+        dst[top:bottom, :left] = 114
+        dst[top:bottom, right:] = 114
+        
+        region = dst[top:bottom, left:right]
+        if img.shape[:2] == (new_height, new_width):
+            region[...] = img
+        else:
+            resized = cv2.resize(img, (new_width, new_height), dst=region, interpolation=cv2.INTER_LINEAR)
+            if resized is not region:
+                region[...] = resized
+    
+    def _prepare_source_cpu(
+        self,
+        images: List[np.ndarray],
+        new_height: int,
+        new_width: int,
+        top: int,
+        left: int,
+        out_height: int,
+        out_width: int
+    ):
+        """
+        用Numba内核将整批图像letterbox为 (B, 3, H, W) 张量
+        
+        Args:
+            images: 同尺寸BGR图像列表
+            new_height: 缩放后高度
+            new_width: 缩放后宽度
+            top: 上填充
+            left: 左填充
+            out_height: 输出高度
+            out_width: 输出宽度
+            
+        Returns:
+            模型输入张量（CUDA设备时已上传，半精度推理时为FP16）
+        """
+        import torch
+        
+        on_cuda = str(self.device).startswith('cuda') and torch.cuda.is_available()
+        batch_shape = (len(images), 3, out_height, out_width)
+        if self._chw_buffer is None or tuple(self._chw_buffer.shape) != batch_shape:
+            self._chw_buffer = torch.empty(batch_shape, dtype=torch.float32)
+            if on_cuda:
+                self._chw_buffer = self._chw_buffer.pin_memory()
+        
+        host = self._chw_buffer.numpy()
+        pad_value = np.float32(114 / 255.0)
+        for i, img in enumerate(images):
+            preprocess_kernel.letterbox_to_chw(
+                np.ascontiguousarray(img), host[i], new_height, new_width, top, left, pad_value
+            )
         
-        for image in images:
-            detections = self.detect(image, return_type, check_edge, edge_threshold)
-            all_detections.append(detections)
+        if not on_cuda:
+            return self._chw_buffer
         
-        return all_detections
+        # Numba在CPU上不支持float16，上传后再转半精度
+        tensor = self._chw_buffer.to(self.device, non_blocking=True)
+        return tensor.half() if self.half_precision else tensor
     
     def detect_with_tracking(
         self,
@@ -230,7 +595,8 @@ class YOLODetector:
                 half=self.half_precision,
                 persist=True,
                 tracker=self.tracker_type,
-                verbose=False
+                verbose=False,
+                **self._predict_args
             )
             
             self.inference_count += 1
@@ -253,7 +619,7 @@ class YOLODetector:
                 detections += parsed
                 self.total_detections += len(parsed)
             
-            logger.debug(f"[Tracking] detected {len(detections)} targets with track_ids")
+            logger.debug("[Tracking] detected {} targets with track_ids", len(detections))
             return detections
             
         except Exception as e:
@@ -275,14 +641,20 @@ class YOLODetector:
         check_edge: bool = False,
         edge_threshold: int = 50,
         with_tracking: bool = False,
+        letterbox=None,
     ) -> List[Dict[str, Any]]:
-        """解析 HBB（水平框）检测结果"""
+        """解析 HBB（水平框）检测结果，letterbox 不为空时将坐标还原到原图"""
         detections = []
         boxes = result.boxes
         if boxes is None or len(boxes) == 0:
             return detections
 
         xyxy = boxes.xyxy.cpu().numpy()
+        if letterbox is not None:
+            ratio, pad_x, pad_y = letterbox
+            xyxy = (xyxy - [pad_x, pad_y, pad_x, pad_y]) / ratio
+            xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, img_width)
+            xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, img_height)
         confs = boxes.conf.cpu().numpy()
         classes = boxes.cls.cpu().numpy().astype(int)
 
@@ -341,14 +713,18 @@ class YOLODetector:
         check_edge: bool = False,
         edge_threshold: int = 50,
         with_tracking: bool = False,
+        letterbox=None,
     ) -> List[Dict[str, Any]]:
-        """解析 OBB（旋转框）检测结果，从 result.obb 提取四角点"""
+        """解析 OBB（旋转框）检测结果，从 result.obb 提取四角点，letterbox 不为空时将坐标还原到原图"""
         detections = []
         obbs = result.obb
         if obbs is None or len(obbs) == 0:
             return detections
 
         xyxyxyxy = obbs.xyxyxyxy.cpu().numpy()   # shape: (N, 4, 2)
+        if letterbox is not None:
+            ratio, pad_x, pad_y = letterbox
+            xyxyxyxy = (xyxyxyxy - [pad_x, pad_y]) / ratio
         confs = obbs.conf.cpu().numpy()
         classes = obbs.cls.cpu().numpy().astype(int)
 
@@ -460,14 +836,17 @@ class YOLODetector:
         Returns:
             统计信息字典
         """
-        avg_detections = self.total_detections / self.inference_count if self.inference_count > 0 else 0
+        # 多设备时汇总所有副本的统计
+        inference_count = sum(r.inference_count for r in self._replicas)
+        total_detections = sum(r.total_detections for r in self._replicas)
+        avg_detections = total_detections / inference_count if inference_count > 0 else 0
         
         return {
-            'inference_count': self.inference_count,
-            'total_detections': self.total_detections,
+            'inference_count': inference_count,
+            'total_detections': total_detections,
             'avg_detections_per_frame': avg_detections,
             'model_path': self.model_path,
-            'device': self.device,
+            'device': ', '.join(str(r.device) for r in self._replicas),
             'confidence_threshold': self.confidence_threshold
         }
     
@@ -6,7 +6,11 @@
 import os
 import re
 import cv2
+import queue
+import threading
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List, Dict, Any
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -23,7 +27,9 @@ class ImageSequenceReader(BaseReader):
         image_pattern: str = "*.jpeg",
         start_index: int = 0,
         end_index: int = 0,
-        skip: int = 1
+        skip: int = 1,
+        prefetch_size: int = 0,
+        decode_workers: int = 1
     ):
         """
         初始化图片序列读取器
@@ -34,6 +40,8 @@ class ImageSequenceReader(BaseReader):
             start_index: 起始索引
             end_index: 结束索引 (0表示读取到最后)
             skip: 跳帧间隔 (1表示读取每一张)
+            prefetch_size: 后台预读队列长度 (0表示不预读，在调用线程中同步读取)
+            decode_workers: 预读时并行解码JPEG的线程数
         """
         super().__init__()
         self.image_dir = image_dir
@@ -41,9 +49,17 @@ class ImageSequenceReader(BaseReader):
         self.start_index = start_index
         self.end_index = end_index
         self.skip = skip
+        self.prefetch_size = prefetch_size
+        self.decode_workers = max(1, decode_workers)
         
         self.image_files = []
         self.current_index = 0
+        
+        # 后台预读线程
+        self._prefetch_queue: Optional[queue.Queue] = None
+        self._prefetch_thread: Optional[threading.Thread] = None
+        self._prefetch_stop = threading.Event()
+        self._prefetch_eof = False
     
     def open(self) -> bool:
         """
@@ -89,6 +105,9 @@ class ImageSequenceReader(BaseReader):
             
             self.is_opened = True
             
+            if self.prefetch_size > 0:
+                self._start_prefetch()
+            
             logger.info(f"图片序列已打开: {self.image_dir}")
             logger.info(f"总图片数: {self.frame_count}, 处理范围: {self.start_index} - {self.end_index}")
             
@@ -102,6 +121,26 @@ class ImageSequenceReader(BaseReader):
         """
         读取下一张图片
         
+        Returns:
+            (是否成功, 图像, 元数据)
+        """
+        if self._prefetch_queue is None:
+            return self._read_next()
+        
+        if self._prefetch_eof:
+            return False, None, None
+        
+        item = self._prefetch_queue.get()
+        if item is None:
+            self._prefetch_eof = True
+            return False, None, None
+        
+        return item
+    
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray], Optional[dict]]:
+        """
+        同步读取下一张图片（单线程预读时在后台线程中调用）
+        
         Returns:
             (是否成功, 图像, 元数据)
         """
@@ -117,34 +156,124 @@ class ImageSequenceReader(BaseReader):
             image_path = self.image_files[self.current_index]
             image = cv2.imread(image_path)
             
-            if image is None:
-                logger.warning(f"无法读取图片: {image_path}")
-                self.current_index += self.skip
-                self.current_frame += self.skip
-                return False, None, None
-            
-            # 提取元数据
-            filename = os.path.basename(image_path)
-            timestamp = self._extract_timestamp_from_filename(filename)
+            return self._build_item(image_path, image)
             
-            metadata = {
-                'frame_number': self.current_index,
-                'filename': filename,
-                'filepath': image_path,
-                'timestamp': timestamp,
-                'width': image.shape[1],
-                'height': image.shape[0]
-            }
+        except Exception as e:
+            logger.error(f"读取图片时发生错误: {e}")
+            return False, None, None
+    
+    def _build_item(
+        self,
+        image_path: str,
+        image: Optional[np.ndarray]
+    ) -> Tuple[bool, Optional[np.ndarray], Optional[dict]]:
+        """
+        为当前索引处已解码的图片构建元数据并前移索引
+        
+        Args:
+            image_path: 图片路径
+            image: 解码后的图像（读取失败时为None）
             
-            # 更新索引
+        Returns:
+            (是否成功, 图像, 元数据)
+        """
+        if image is None:
+            logger.warning(f"无法读取图片: {image_path}")
             self.current_index += self.skip
             self.current_frame += self.skip
-            
-            return True, image, metadata
-            
-        except Exception as e:
-            logger.error(f"读取图片时发生错误: {e}")
             return False, None, None
+        
+        # 提取元数据
+        filename = os.path.basename(image_path)
+        timestamp = self._extract_timestamp_from_filename(filename)
+        
+        metadata = {
+            'frame_number': self.current_index,
+            'filename': filename,
+            'filepath': image_path,
+            'timestamp': timestamp,
+            'width': image.shape[1],
+            'height': image.shape[0]
+        }
+        
+        # 更新索引
+        self.current_index += self.skip
+        self.current_frame += self.skip
+        
+        return True, image, metadata
+    
+    def _start_prefetch(self):
+        """启动后台预读线程，磁盘读取和JPEG解码与检测并行执行"""
+        self._prefetch_queue = queue.Queue(maxsize=self.prefetch_size)
+        self._prefetch_stop.clear()
+        self._prefetch_eof = False
+        self._prefetch_thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._prefetch_thread.start()
+        logger.info(f"后台预读已启动 (队列长度 {self.prefetch_size}, 解码线程 {self.decode_workers})")
+    
+    def _decode_loop(self):
+        """
+        后台预读循环，读到结尾或读取失败后放入None作为结束标记
+        
+        decode_workers > 1 时多张图片并行imread（OpenCV解码时释放GIL），
+        按文件顺序依次入队。
+        """
+        pool = ThreadPoolExecutor(max_workers=self.decode_workers) if self.decode_workers > 1 else None
+        in_flight = deque()
+        next_index = self.current_index
+        
+        try:
+            while not self._prefetch_stop.is_set():
+                if pool is None:
+                    item = self._read_next()
+                else:
+                    # 保持decode_workers张图片在途
+                    while len(in_flight) < self.decode_workers and next_index < self.end_index:
+                        image_path = self.image_files[next_index]
+                        in_flight.append((image_path, pool.submit(cv2.imread, image_path)))
+                        next_index += self.skip
+                    
+                    if not in_flight:
+                        item = None
+                    else:
+                        image_path, future = in_flight.popleft()
+                        try:
+                            item = self._build_item(image_path, future.result())
+                        except Exception as e:
+                            logger.error(f"读取图片时发生错误: {e}")
+                            item = None
+                
+                if item is not None and not item[0]:
+                    item = None
+                
+                # 队列满时阻塞等待，期间响应停止信号
+                while not self._prefetch_stop.is_set():
+                    try:
+                        self._prefetch_queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                
+                if item is None:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _stop_prefetch(self):
+        """停止后台预读线程"""
+        self._prefetch_stop.set()
+        
+        # 清空队列，解除预读线程的阻塞
+        try:
+            while True:
+                self._prefetch_queue.get_nowait()
+        except queue.Empty:
+            pass
+        
+        self._prefetch_thread.join(timeout=5)
+        self._prefetch_thread = None
+        self._prefetch_queue = None
     
     def _extract_timestamp_from_filename(self, filename: str) -> float:
         """
@@ -198,6 +327,9 @@ class ImageSequenceReader(BaseReader):
     
     def close(self):
         """关闭图片序列"""
+        if self._prefetch_thread is not None:
+            self._stop_prefetch()
+        
         self.is_opened = False
         self.image_files = []
         logger.info("图片序列已关闭")
@@ -261,6 +393,10 @@ class ImageSequenceReader(BaseReader):
             logger.warning(f"索引超出范围: {index}")
             return False
         
+        if self._prefetch_thread is not None:
+            logger.warning("预读模式不支持跳转")
+            return False
+        
         self.current_index = index
         self.current_frame = index
         
@@ -4,12 +4,51 @@ OSD OCR识别器
 """
 
 import re
+import time
 import cv2
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from loguru import logger
 
 
+# OSD文本解析正则（模块加载时预编译）
+# 识别文本先统一转为小写再匹配，正则本身区分大小写，避免IGNORECASE逐字符折叠
+# GPS格式示例1: latitude: 31.123456 或 longitude: 120.123456
+# GPS格式示例2: 22.784800°N 114.105067°E (实际OSD格式)
+_LAT_PATTERNS = [
+    re.compile(r'latitude[:\s]*([+-]?\d+\.\d+)'),
+    re.compile(r'([+-]?\d+\.\d+)[°\s]*n'),  # 匹配 "22.784800°N" 格式
+    re.compile(r'n[:\s]*([+-]?\d+\.\d+)'),
+    re.compile(r'纬度[:\s]*([+-]?\d+\.\d+)'),
+]
+
+_LON_PATTERNS = [
+    re.compile(r'longitude[:\s]*([+-]?\d+\.\d+)'),
+    re.compile(r'([+-]?\d+\.\d+)[°\s]*e'),  # 匹配 "114.105067°E" 格式
+    re.compile(r'e[:\s]*([+-]?\d+\.\d+)'),
+    re.compile(r'经度[:\s]*([+-]?\d+\.\d+)'),
+]
+
+# 高度格式示例:
+# - altitude: 100.5m
+# - H100.5
+# - "114.105067°E 139" (E后面的数字)
+# - "139.369m" (数字+m)
+_ALT_PATTERNS = [
+    re.compile(r'altitude[:\s]*([+-]?\d+\.?\d*)'),  # altitude: 100.5
+    re.compile(r'h[:\s]*([+-]?\d+\.?\d*)'),         # H100.5
+    re.compile(r'高度[:\s]*([+-]?\d+\.?\d*)'),        # 高度: 100.5
+    re.compile(r'e\s+([+-]?\d+\.?\d*)m?'),          # E后面跟空格和数字 (最常见的OSD格式)
+    re.compile(r'([+-]?\d+\.?\d*)m\s*$'),            # 行尾的数字+m
+]
+
+# 姿态角格式示例: yaw: 90.5, pitch: -10.2, roll: 5.3
+_ATTITUDE_PATTERNS = {
+    key: re.compile(key + r'[:\s]*([+-]?\d+\.?\d*)')
+    for key in ('yaw', 'pitch', 'roll')
+}
+
+
 class OSDOCRReader:
     """OSD OCR识别器类"""
     
@@ -19,7 +58,10 @@ class OSDOCRReader:
         cache_enabled: bool = True,
         frame_interval: int = 5,
         use_gpu: bool = False,
-        language: str = 'ch'
+        language: str = 'ch',
+        use_tensorrt: bool = False,
+        precision: str = 'fp32',
+        warmup_runs: int = 3
     ):
         """
         初始化OSD OCR识别器
@@ -30,12 +72,21 @@ class OSDOCRReader:
             frame_interval: OCR识别帧间隔（每N帧识别一次）
             use_gpu: 是否使用GPU加速
             language: OCR语言，'ch'(中文)或'en'(英文)
+            use_tensorrt: GPU模式下是否启用TensorRT推理（需paddlepaddle-gpu+TRT）
+            precision: GPU推理精度，'fp32'或'fp16'
+            warmup_runs: 初始化后的预热推理次数（0表示不预热）
         """
         self.roi_config = roi_config or {'x': 0, 'y': 0, 'width': 600, 'height': 300}
         self.cache_enabled = cache_enabled
         self.frame_interval = frame_interval
         self.use_gpu = use_gpu
         self.language = language
+        self.use_tensorrt = use_tensorrt
+        self.precision = precision
+        self.warmup_runs = warmup_runs
+        
+        # ROI连续内存缓冲区（复用，避免每次识别重新分配）
+        self._roi_buffer: Optional[np.ndarray] = None
         
         # 缓存相关
         self.last_pose = None
@@ -56,14 +107,25 @@ class OSDOCRReader:
             # PaddleOCR 3.x+ 使用device参数代替use_gpu
             device = 'gpu' if self.use_gpu else 'cpu'
             
-            self.ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang=self.language,
-                device=device
-            )
+            ocr_kwargs = {
+                'use_angle_cls': True,
+                'lang': self.language,
+                'device': device
+            }
+            
+            # GPU模式：可选TensorRT + FP16，减少推理和数据传输开销
+            if self.use_gpu:
+                if self.use_tensorrt:
+                    ocr_kwargs['use_tensorrt'] = True
+                if self.precision != 'fp32':
+                    ocr_kwargs['precision'] = self.precision
+            
+            self.ocr = PaddleOCR(**ocr_kwargs)
             
             logger.info("PaddleOCR引擎初始化成功")
             
+            self._warmup_ocr()
+            
         except ImportError:
             logger.error("PaddleOCR未安装，请运行: pip install paddleocr paddlepaddle")
             raise
@@ -71,6 +133,38 @@ class OSDOCRReader:
             logger.error(f"PaddleOCR初始化失败: {e}")
             raise
     
+    def _warmup_ocr(self):
+        """
+        预热OCR引擎
+        
+        首次推理包含cuDNN算法搜索、显存分配等一次性开销，
+        在启动阶段用ROI尺寸的样例图像提前触发，避免首帧卡顿。
+        """
+        if self.warmup_runs <= 0:
+            return
+        
+        if self.use_gpu:
+            try:
+                import paddle
+                paddle.set_flags({'FLAGS_cudnn_exhaustive_search': True})
+            except Exception as e:
+                logger.debug(f"设置cuDNN搜索标志失败: {e}")
+        
+        # 与ROI同尺寸的样例图像，带一行OSD样式文字以同时触发检测和识别模型
+        h = self.roi_config['height']
+        w = self.roi_config['width']
+        dummy = np.zeros((h, w, 3), dtype=np.uint8)
+        cv2.putText(dummy, '22.784800N 114.105067E 139.4m', (10, min(h - 1, 40)),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        
+        try:
+            start = time.time()
+            for _ in range(self.warmup_runs):
+                self.ocr.ocr(dummy)
+            logger.info(f"OCR预热完成: {self.warmup_runs}次, 耗时 {(time.time() - start) * 1000:.0f}ms")
+        except Exception as e:
+            logger.warning(f"OCR预热失败（不影响正常使用）: {e}")
+    
     def extract_pose_from_frame(
         self,
         frame: np.ndarray,
@@ -129,9 +223,9 @@ class OSDOCRReader:
             if self.cache_enabled:
                 self.last_pose = pose
             
-            logger.debug(f"帧 {frame_number}: OCR提取成功 - "
-                        f"GPS: ({pose.get('latitude', 0):.6f}, {pose.get('longitude', 0):.6f}), "
-                        f"高度: {pose.get('altitude', 0):.1f}m")
+            logger.debug("帧 {}: OCR提取成功 - GPS: ({:.6f}, {:.6f}), 高度: {:.1f}m",
+                         frame_number, pose.get('latitude', 0), pose.get('longitude', 0),
+                         pose.get('altitude', 0))
             
             return pose
             
@@ -162,7 +256,18 @@ class OSDOCRReader:
         h = min(h, height - y)
         
         roi = frame[y:y+h, x:x+w]
-        return roi
+        
+        # 帧切片不连续，拷贝到复用的连续缓冲区后再交给OCR，
+        # 避免PaddleOCR内部每次重新分配并拷贝
+        if roi.flags['C_CONTIGUOUS']:
+            return roi
+        
+        if (self._roi_buffer is None
+                or self._roi_buffer.shape != roi.shape
+                or self._roi_buffer.dtype != roi.dtype):
+            self._roi_buffer = np.empty(roi.shape, dtype=roi.dtype)
+        np.copyto(self._roi_buffer, roi)
+        return self._roi_buffer
     
     def _ocr_region(self, image_roi: np.ndarray) -> List[str]:
         """
@@ -198,6 +303,32 @@ class OSDOCRReader:
             logger.error(f"OCR识别失败: {e}")
             return []
     
+    @staticmethod
+    def _search_float(patterns: List[re.Pattern], text: str) -> Optional[float]:
+        """
+        按格式优先级搜索第一个可解析的数值
+        
+        始终按优先级顺序尝试：同一行文本可能同时被多个格式匹配
+        （如 "latitude: 22.78 longitude: 114.10" 也能被通用的 e[:\s]* 格式匹配），
+        跳过高优先级格式会取到错误的字段。
+        
+        Args:
+            patterns: 预编译正则列表（按优先级排列）
+            text: 待搜索文本
+            
+        Returns:
+            解析出的数值，未命中时返回None
+        """
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                try:
+                    return float(match.group(1))
+                except ValueError:
+                    continue
+        
+        return None
+    
     def _parse_osd_text(self, text_lines: List[str]) -> Optional[Dict[str, Any]]:
         """
         解析OSD文本，提取飞行数据
@@ -210,89 +341,31 @@ class OSDOCRReader:
         """
         # 合并所有文本行
         full_text = ' '.join(text_lines)
+        full_text_lower = full_text.lower()
         
         pose = {}
         
-        # 解析GPS坐标
-        # 格式示例1: latitude: 31.123456 或 longitude: 120.123456
-        # 格式示例2: 22.784800°N 114.105067°E (实际OSD格式)
-        lat_patterns = [
-            r'latitude[:\s]*([+-]?\d+\.\d+)',
-            r'([+-]?\d+\.\d+)[°\s]*[Nn]',  # 新增：匹配 "22.784800°N" 格式
-            r'[Nn][:\s]*([+-]?\d+\.\d+)',
-            r'纬度[:\s]*([+-]?\d+\.\d+)'
-        ]
-        
-        lon_patterns = [
-            r'longitude[:\s]*([+-]?\d+\.\d+)',
-            r'([+-]?\d+\.\d+)[°\s]*[Ee]',  # 新增：匹配 "114.105067°E" 格式
-            r'[Ee][:\s]*([+-]?\d+\.\d+)',
-            r'经度[:\s]*([+-]?\d+\.\d+)'
-        ]
-        
-        for pattern in lat_patterns:
-            lat_match = re.search(pattern, full_text, re.IGNORECASE)
-            if lat_match:
-                try:
-                    pose['latitude'] = float(lat_match.group(1))
-                    break
-                except ValueError:
-                    continue
+        # 解析GPS坐标和高度
+        latitude = self._search_float(_LAT_PATTERNS, full_text_lower)
+        if latitude is not None:
+            pose['latitude'] = latitude
         
-        for pattern in lon_patterns:
-            lon_match = re.search(pattern, full_text, re.IGNORECASE)
-            if lon_match:
-                try:
-                    pose['longitude'] = float(lon_match.group(1))
-                    break
-                except ValueError:
-                    continue
+        longitude = self._search_float(_LON_PATTERNS, full_text_lower)
+        if longitude is not None:
+            pose['longitude'] = longitude
         
-        # 解析高度
-        # 格式示例: 
-        # - altitude: 100.5m
-        # - H100.5
-        # - "114.105067°E 139" (E后面的数字)
-        # - "139.369m" (数字+m)
-        alt_patterns = [
-            r'altitude[:\s]*([+-]?\d+\.?\d*)',  # altitude: 100.5
-            r'[Hh][:\s]*([+-]?\d+\.?\d*)',      # H100.5
-            r'高度[:\s]*([+-]?\d+\.?\d*)',        # 高度: 100.5
-            r'[Ee]\s+([+-]?\d+\.?\d*)[mM]?',    # E后面跟空格和数字 (最常见的OSD格式)
-            r'([+-]?\d+\.?\d*)[mM]\s*$'         # 行尾的数字+m
-        ]
+        altitude = self._search_float(_ALT_PATTERNS, full_text_lower)
+        if altitude is not None:
+            pose['altitude'] = altitude
         
-        for pattern in alt_patterns:
-            alt_match = re.search(pattern, full_text, re.IGNORECASE)
-            if alt_match:
+        # 解析姿态角（可选）
+        for key, pattern in _ATTITUDE_PATTERNS.items():
+            match = pattern.search(full_text_lower)
+            if match:
                 try:
-                    pose['altitude'] = float(alt_match.group(1))
-                    break
+                    pose[key] = float(match.group(1))
                 except ValueError:
-                    continue
-        
-        # 解析姿态角（可选）
-        # 格式示例: yaw: 90.5, pitch: -10.2, roll: 5.3
-        yaw_match = re.search(r'yaw[:\s]*([+-]?\d+\.?\d*)', full_text, re.IGNORECASE)
-        if yaw_match:
-            try:
-                pose['yaw'] = float(yaw_match.group(1))
-            except ValueError:
-                pass
-        
-        pitch_match = re.search(r'pitch[:\s]*([+-]?\d+\.?\d*)', full_text, re.IGNORECASE)
-        if pitch_match:
-            try:
-                pose['pitch'] = float(pitch_match.group(1))
-            except ValueError:
-                pass
-        
-        roll_match = re.search(r'roll[:\s]*([+-]?\d+\.?\d*)', full_text, re.IGNORECASE)
-        if roll_match:
-            try:
-                pose['roll'] = float(roll_match.group(1))
-            except ValueError:
-                pass
+                    pass
         
         # 解析日期时间（可选）
         # 格式示例: 2024-02-12 10:30:45.123
@@ -305,7 +378,7 @@ class OSDOCRReader:
         
         # 检查是否至少有GPS坐标
         if 'latitude' not in pose or 'longitude' not in pose:
-            logger.debug(f"未能提取GPS坐标，识别文本: {full_text[:100]}...")
+            logger.debug("未能提取GPS坐标，识别文本: {}...", full_text[:100])
             return None
         
         return pose
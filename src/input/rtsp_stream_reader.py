@@ -3,16 +3,114 @@ RTSP视频流读取器
 用于实时接收RTSP/RTMP视频流
 """
 
+import os
 import cv2
 import numpy as np
 import time
 import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
 from typing import Optional, Tuple
 from collections import deque
 from loguru import logger
 from .base_reader import BaseReader
 
 
+def _reader_process_entry(
+    rtsp_url: str,
+    shm_name: str,
+    frame_shape: Tuple[int, int, int],
+    buffer_size: int,
+    write_count,
+    timestamps,
+    stop_event,
+    transport_protocol: str,
+    connection_timeout: int,
+    read_timeout: int,
+    reconnect_interval: int,
+    max_reconnect_attempts: int
+):
+    """
+    读取子进程入口
+    
+    在独立进程中解码RTSP流，帧直接写入共享内存环形缓冲区，
+    解码过程不占用主进程的GIL。
+    
+    Args:
+        rtsp_url: RTSP流地址
+        shm_name: 共享内存名称
+        frame_shape: 帧尺寸 (H, W, 3)
+        buffer_size: 环形缓冲区槽位数
+        write_count: 已写入帧总数 (multiprocessing.Value)
+        timestamps: 各槽位帧时间戳 (multiprocessing.Array)
+        stop_event: 停止事件
+        其余参数同RTSPStreamReader
+    """
+    if transport_protocol.lower() == "tcp":
+        os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = 'rtsp_transport;tcp'
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((buffer_size,) + tuple(frame_shape), dtype=np.uint8, buffer=shm.buf)
+    height, width = frame_shape[:2]
+    
+    cap = None
+    reconnect_count = 0
+    consecutive_failures = 0
+    max_consecutive_failures = 10
+    
+    try:
+        while not stop_event.is_set():
+            if cap is None:
+                if max_reconnect_attempts and reconnect_count >= max_reconnect_attempts:
+                    logger.error("达到最大重连次数，读取进程退出")
+                    break
+                
+                cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
+                cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, connection_timeout * 1000)
+                cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, read_timeout * 1000)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                
+                if not cap.isOpened():
+                    cap.release()
+                    cap = None
+                    reconnect_count += 1
+                    stop_event.wait(reconnect_interval)
+                    continue
+                
+                reconnect_count = 0
+                consecutive_failures = 0
+            
+            ret, frame = cap.read()
+            
+            if not ret or frame is None:
+                consecutive_failures += 1
+                if consecutive_failures >= max_consecutive_failures:
+                    logger.error("连续读取失败次数过多，读取进程重新连接")
+                    cap.release()
+                    cap = None
+                time.sleep(0.1)
+                continue
+            
+            consecutive_failures = 0
+            
+            # 写入下一个槽位（重连后分辨率变化时缩放到固定槽位尺寸）
+            index = write_count.value
+            slot = index % buffer_size
+            if frame.shape[:2] != (height, width):
+                cv2.resize(frame, (width, height), dst=ring[slot])
+            else:
+                np.copyto(ring[slot], frame)
+            timestamps[slot] = time.time() * 1000
+            
+            # 帧数据写完后再发布写入计数
+            write_count.value = index + 1
+    finally:
+        if cap is not None:
+            cap.release()
+        del ring
+        shm.close()
+
+
 class RTSPStreamReader(BaseReader):
     """RTSP视频流读取器类"""
     
@@ -24,7 +122,8 @@ class RTSPStreamReader(BaseReader):
         max_reconnect_attempts: int = 0,
         transport_protocol: str = "tcp",
         connection_timeout: int = 10,
-        read_timeout: int = 5
+        read_timeout: int = 5,
+        use_process: bool = False
     ):
         """
         初始化RTSP流读取器
@@ -37,6 +136,7 @@ class RTSPStreamReader(BaseReader):
             transport_protocol: 传输协议 ("tcp" 或 "udp")
             connection_timeout: 连接超时 (秒)
             read_timeout: 读取超时 (秒)
+            use_process: 是否在独立子进程中解码（共享内存环形缓冲区，避免与OCR争抢GIL）
         """
         super().__init__()
         self.rtsp_url = rtsp_url
@@ -46,6 +146,7 @@ class RTSPStreamReader(BaseReader):
         self.transport_protocol = transport_protocol
         self.connection_timeout = connection_timeout
         self.read_timeout = read_timeout
+        self.use_process = use_process
         
         self.cap = None
         self.fps = 0
@@ -61,6 +162,15 @@ class RTSPStreamReader(BaseReader):
         self.is_running = False
         self.reconnect_count = 0
         
+        # 读取子进程及共享内存环形缓冲区（use_process模式）
+        self.read_process = None
+        self._shm = None
+        self._ring = None
+        self._write_count = None
+        self._timestamps = None
+        self._stop_event = None
+        self._read_index = 0
+        
         # 统计信息
         self.frame_received_count = 0
         self.last_receive_time = 0
@@ -96,6 +206,9 @@ class RTSPStreamReader(BaseReader):
             self.cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, self.connection_timeout * 1000)
             self.cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, self.read_timeout * 1000)
             
+            # 解码器内部缓冲只保留1帧，避免读到积压的旧帧（缓冲由frame_buffer负责）
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            
             if not self.cap.isOpened():
                 logger.error(f"无法打开RTSP流: {self.rtsp_url}")
                 return False
@@ -132,11 +245,95 @@ class RTSPStreamReader(BaseReader):
                 return
         
         self.is_running = True
+        
+        if self.use_process:
+            self._start_process()
+            return
+        
         self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
         self.read_thread.start()
         
         logger.info("RTSP流读取线程已启动")
     
+    def _start_process(self):
+        """启动读取子进程，并分配共享内存环形缓冲区"""
+        # 主进程只用于探测分辨率，解码交给子进程
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        
+        frame_shape = (self.height, self.width, 3)
+        frame_bytes = self.height * self.width * 3
+        
+        self._shm = shared_memory.SharedMemory(create=True, size=self.buffer_size * frame_bytes)
+        self._ring = np.ndarray(
+            (self.buffer_size,) + frame_shape, dtype=np.uint8, buffer=self._shm.buf
+        )
+        self._write_count = mp.Value('q', 0, lock=False)
+        self._timestamps = mp.Array('d', self.buffer_size, lock=False)
+        self._stop_event = mp.Event()
+        self._read_index = 0
+        
+        self.read_process = mp.Process(
+            target=_reader_process_entry,
+            args=(
+                self.rtsp_url,
+                self._shm.name,
+                frame_shape,
+                self.buffer_size,
+                self._write_count,
+                self._timestamps,
+                self._stop_event,
+                self.transport_protocol,
+                self.connection_timeout,
+                self.read_timeout,
+                self.reconnect_interval,
+                self.max_reconnect_attempts
+            ),
+            daemon=True
+        )
+        self.read_process.start()
+        
+        logger.info(f"RTSP流读取进程已启动 (PID {self.read_process.pid}, "
+                    f"共享缓冲区 {self.buffer_size}帧)")
+    
+    def _copy_slot(self, index: int) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        拷贝环形缓冲区中第index帧及其时间戳（顺序锁校验）
+        
+        子进程绕回一圈后会覆盖同一槽位，拷贝完成后再检查写入计数：
+        拷贝期间该槽位已开始被改写时丢弃本次结果，避免返回撕裂的帧
+        或与帧不对应的时间戳。
+        
+        Args:
+            index: 帧序号（写入计数）
+            
+        Returns:
+            (帧副本, 时间戳)；拷贝期间被覆盖时返回None
+        """
+        slot = index % self.buffer_size
+        frame = self._ring[slot].copy()
+        timestamp = self._timestamps[slot]
+        
+        # 写入计数达到 index + buffer_size 时子进程已开始改写该槽位
+        if self._write_count.value - index >= self.buffer_size:
+            return None
+        
+        return frame, timestamp
+    
+    def _sync_process_stats(self) -> int:
+        """
+        同步子进程的写入计数到统计信息
+        
+        Returns:
+            已写入帧总数
+        """
+        count = self._write_count.value
+        if count > self.frame_received_count:
+            self.frame_received_count = count
+            self.last_receive_time = time.time()
+        return count
+    
     def _read_loop(self):
         """后台读取循环"""
         consecutive_failures = 0
@@ -212,11 +409,27 @@ class RTSPStreamReader(BaseReader):
         Returns:
             (是否成功, 图像帧, 元数据)
         """
-        with self.buffer_lock:
-            if len(self.frame_buffer) == 0:
-                return False, None, None
-            
-            frame, timestamp = self.frame_buffer.popleft()
+        if self._shm is not None:
+            # 槽位会被子进程循环覆盖，帧和时间戳一并拷贝出来；
+            # 拷贝期间被覆盖说明读取已落后，跳到仍有效的最旧帧重试
+            copied = None
+            while copied is None:
+                count = self._sync_process_stats()
+                # 落后超过缓冲区容量时，跳到仍有效的最旧帧
+                self._read_index = max(self._read_index, count - self.buffer_size + 1)
+                if self._read_index >= count:
+                    return False, None, None
+                
+                index = self._read_index
+                self._read_index += 1
+                copied = self._copy_slot(index)
+            frame, timestamp = copied
+        else:
+            with self.buffer_lock:
+                if len(self.frame_buffer) == 0:
+                    return False, None, None
+                
+                frame, timestamp = self.frame_buffer.popleft()
         
         metadata = {
             'timestamp': timestamp,
@@ -228,20 +441,43 @@ class RTSPStreamReader(BaseReader):
         
         return True, frame, metadata
     
-    def get_frame(self) -> Optional[np.ndarray]:
+    def get_frame(self, copy: bool = False) -> Optional[np.ndarray]:
         """
         快捷方法：获取最新的帧
         
+        线程读取模式下默认返回缓冲区中帧的只读视图（不做整帧拷贝），误写会抛出ValueError；
+        调用方如需在原图上绘制/修改，请传入 copy=True 获取独立副本。
+        子进程模式下共享内存槽位会被循环覆盖、关闭时随之释放，总是返回独立副本。
+        
+        Args:
+            copy: 是否返回可写的独立副本
+        
         Returns:
             图像帧，如果没有则返回None
         """
-        with self.buffer_lock:
-            if len(self.frame_buffer) == 0:
-                return None
-            
-            # 返回最新的帧
-            frame, _ = self.frame_buffer[-1]
+        if self._shm is not None:
+            copied = None
+            while copied is None:
+                count = self._sync_process_stats()
+                if count == 0:
+                    return None
+                copied = self._copy_slot(count - 1)
+            return copied[0]
+        else:
+            with self.buffer_lock:
+                if len(self.frame_buffer) == 0:
+                    return None
+                
+                # 返回最新的帧
+                frame, _ = self.frame_buffer[-1]
+        
+        if copy:
             return frame.copy()
+        
+        # 只读视图：共享底层内存，不影响缓冲区中原数组的可写性
+        view = frame.view()
+        view.flags.writeable = False
+        return view
     
     def get_buffer_size(self) -> int:
         """
@@ -250,13 +486,20 @@ class RTSPStreamReader(BaseReader):
         Returns:
             缓冲区中的帧数
         """
+        if self._shm is not None:
+            count = self._sync_process_stats()
+            return max(0, min(count - self._read_index, self.buffer_size))
+        
         with self.buffer_lock:
             return len(self.frame_buffer)
     
     def clear_buffer(self):
         """清空帧缓冲区"""
-        with self.buffer_lock:
-            self.frame_buffer.clear()
+        if self._shm is not None:
+            self._read_index = self._write_count.value
+        else:
+            with self.buffer_lock:
+                self.frame_buffer.clear()
         logger.info("帧缓冲区已清空")
     
     def stop(self):
@@ -266,8 +509,27 @@ class RTSPStreamReader(BaseReader):
         if self.read_thread and self.read_thread.is_alive():
             self.read_thread.join(timeout=5)
         
+        if self.read_process is not None:
+            self._stop_process()
+        
         logger.info("RTSP流读取已停止")
     
+    def _stop_process(self):
+        """停止读取子进程并释放共享内存"""
+        self._stop_event.set()
+        self.read_process.join(timeout=5)
+        if self.read_process.is_alive():
+            logger.warning("读取进程未能及时退出，强制终止")
+            self.read_process.terminate()
+            self.read_process.join(timeout=1)
+        self.read_process = None
+        
+        # 读取接口只返回拷贝，关闭前除 _ring 外不存在引用共享内存的数组
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+    
     def close(self):
         """关闭RTSP流"""
         self.stop()
@@ -5,10 +5,27 @@ SRT字幕提取器
 
 import os
 import subprocess
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
 from loguru import logger
 
 
+def _extract_worker(
+    ffmpeg_path: str,
+    temp_dir: str,
+    subtitle_stream_index: int,
+    video_path: str,
+    force: bool
+) -> Optional[str]:
+    """子进程入口：在独立进程中提取单个视频的SRT字幕"""
+    extractor = SRTExtractor(
+        ffmpeg_path=ffmpeg_path,
+        temp_dir=temp_dir,
+        subtitle_stream_index=subtitle_stream_index
+    )
+    return extractor.extract(video_path, force=force)
+
+
 class SRTExtractor:
     """SRT字幕提取器类"""
     
@@ -30,6 +47,10 @@ class SRTExtractor:
         self.temp_dir = temp_dir
         self.subtitle_stream_index = subtitle_stream_index
         
+        # 目录列表缓存: 目录 -> 文件名集合 (一次readdir代替多次stat)
+        # 无人机数据在运行期间不会变化，缓存在本会话内有效
+        self._dir_index: Dict[str, Set[str]] = {}
+        
         # 创建临时目录
         os.makedirs(temp_dir, exist_ok=True)
     
@@ -62,7 +83,7 @@ class SRTExtractor:
             output_srt_path = os.path.join(self.temp_dir, f"{video_name}.srt")
         
         # 如果SRT文件已存在且不强制重新提取，直接返回
-        if os.path.exists(output_srt_path) and not force:
+        if not force and self._file_in_dir(output_srt_path):
             logger.info(f"SRT文件已存在，跳过提取: {output_srt_path}")
             return output_srt_path
         
@@ -99,6 +120,7 @@ class SRTExtractor:
             
             if result.returncode == 0:
                 logger.info(f"SRT字幕提取成功: {output_srt_path}")
+                self._remember_file(output_srt_path)
                 return output_srt_path
             else:
                 logger.error(f"SRT字幕提取失败: {result.stderr}")
@@ -108,6 +130,70 @@ class SRTExtractor:
             logger.error(f"提取SRT字幕时发生错误: {e}")
             return None
     
+    def extract_many(
+        self,
+        video_paths: List[str],
+        max_workers: Optional[int] = None,
+        force: bool = False
+    ) -> Dict[str, Optional[str]]:
+        """
+        并行提取多个视频的SRT字幕
+        
+        FFmpeg提取字幕为单线程任务，多个视频使用进程池并行处理。
+        
+        Args:
+            video_paths: 视频文件路径列表
+            max_workers: 最大并行进程数 (None表示CPU核数的一半)
+            force: 是否强制重新提取
+            
+        Returns:
+            视频路径 -> 提取的SRT文件路径（失败为None）
+        """
+        if max_workers is None:
+            max_workers = max(1, (os.cpu_count() or 2) // 2)
+        
+        results: Dict[str, Optional[str]] = {}
+        if not video_paths:
+            return results
+        
+        # 单个视频或单进程时无需进程池
+        if max_workers <= 1 or len(video_paths) == 1:
+            for video_path in video_paths:
+                results[video_path] = self.extract(video_path, force=force)
+            return results
+        
+        logger.info(f"并行提取SRT字幕: {len(video_paths)}个视频, {max_workers}个进程")
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                video_path: executor.submit(
+                    _extract_worker,
+                    self.ffmpeg_path,
+                    self.temp_dir,
+                    self.subtitle_stream_index,
+                    video_path,
+                    force
+                )
+                for video_path in video_paths
+            }
+            
+            for video_path, future in futures.items():
+                try:
+                    results[video_path] = future.result()
+                except Exception as e:
+                    logger.error(f"提取SRT字幕时发生错误: {video_path}: {e}")
+                    results[video_path] = None
+        
+        # 子进程生成的文件登记到本进程的目录缓存
+        for srt_path in results.values():
+            if srt_path:
+                self._remember_file(srt_path)
+        
+        success_count = sum(1 for srt_path in results.values() if srt_path)
+        logger.info(f"SRT字幕批量提取完成: 成功 {success_count}/{len(video_paths)}")
+        
+        return results
+    
     def _check_ffmpeg(self) -> bool:
         """
         检查FFmpeg是否可用
@@ -178,19 +264,62 @@ class SRTExtractor:
         
         # 尝试在视频同目录查找
         srt_path = os.path.join(video_dir, f"{video_name}.srt")
-        if os.path.exists(srt_path):
+        if self._file_in_dir(srt_path):
             logger.info(f"找到同名SRT文件: {srt_path}")
             return srt_path
         
         # 尝试在临时目录查找
         srt_path = os.path.join(self.temp_dir, f"{video_name}.srt")
-        if os.path.exists(srt_path):
+        if self._file_in_dir(srt_path):
             logger.info(f"找到已提取的SRT文件: {srt_path}")
             return srt_path
         
         logger.info("未找到同名SRT文件")
         return None
     
+    def _list_dir(self, directory: str) -> Set[str]:
+        """
+        获取目录下的文件名集合（带缓存）
+        
+        Args:
+            directory: 目录路径
+            
+        Returns:
+            文件名集合 (已按平台规则normcase)
+        """
+        key = os.path.normcase(os.path.abspath(directory or '.'))
+        entries = self._dir_index.get(key)
+        if entries is None:
+            try:
+                entries = {os.path.normcase(name) for name in os.listdir(key)}
+            except OSError:
+                entries = set()
+            self._dir_index[key] = entries
+        return entries
+    
+    def _file_in_dir(self, file_path: str) -> bool:
+        """
+        通过目录缓存判断文件是否存在
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            是否存在
+        """
+        directory, name = os.path.split(file_path)
+        return os.path.normcase(name) in self._list_dir(directory)
+    
+    def _remember_file(self, file_path: str):
+        """
+        将新生成的文件登记到目录缓存
+        
+        Args:
+            file_path: 文件路径
+        """
+        directory, name = os.path.split(file_path)
+        self._list_dir(directory).add(os.path.normcase(name))
+    
     def get_or_extract(self, video_path: str) -> Optional[str]:
         """
         获取或提取SRT文件
@@ -3,18 +3,262 @@ SRT字幕解析器
 解析DJI SRT字幕文件，提取GPS、高度、姿态等数据
 """
 
+import os
 import re
-from typing import List, Dict, Any, Optional
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from loguru import logger
+from . import srt_scanner
+
+
+# 日期时间格式不固定前缀，仍使用正则（模块加载时预编译）
+_RE_DATETIME = re.compile(r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)')
+
+# 超过该文件大小（约1万个字幕块）时使用进程池并行解析，小文件进程启动开销不划算
+_PARALLEL_MIN_BYTES = 3 * 1024 * 1024
+
+# 进程池每次分发的字幕块数
+_PARALLEL_CHUNKSIZE = 1024
+
+# SRT解析方式：
+#   auto    - 安装了numba时使用字节扫描器，否则大文件使用进程池，小文件逐块解析
+#   numba   - 字节扫描器（需numba）
+#   process - 大文件使用进程池并行逐块解析（小文件仍在当前进程解析）
+#   python  - 当前进程逐块解析
+SRT_BACKENDS = ('auto', 'numba', 'process', 'python')
+
+# 各字段前缀之后的数值格式（与逐字段正则解析时一致）：
+# 帧号为整数，时间差为整数加ms，经纬度必须带整数和小数部分，高度和姿态角可省略小数部分
+_RE_INT = re.compile(r'\s*(\d+)')
+_RE_DIFF_TIME = re.compile(r'\s*(\d+)ms')
+_RE_DECIMAL = re.compile(r'\s*([-+]?\d+\.\d+)')
+_RE_NUMBER = re.compile(r'\s*([-+]?\d+\.?\d*)')
+
+
+def _num_after(text: str, key: str, value_re: re.Pattern, start: int = 0) -> Tuple[Optional[str], int]:
+    """
+    提取固定前缀后的数值文本
+    
+    DJI SRT字段均为 "key: value" 形式且顺序固定，用str.find从上一字段
+    结束处（游标）开始定位前缀，已匹配的部分不再重复扫描。前缀后的值不符合
+    格式时继续查找该前缀的下一次出现（同 re.search）；游标之后找不到时
+    （字段顺序不同）再从头查找。
+    
+    Args:
+        text: 字幕内容
+        key: 字段前缀（如 "latitude:"）
+        value_re: 数值格式（从前缀结束处匹配，第1组为数值）
+        start: 游标，开始查找的位置
+        
+    Returns:
+        (数值文本, 新游标)，未找到时数值文本为None、游标不变
+    """
+    for begin in ((start, 0) if start > 0 else (0,)):
+        i = text.find(key, begin)
+        while i >= 0:
+            match = value_re.match(text, i + len(key))
+            if match:
+                return match.group(1), max(match.end(), start)
+            i = text.find(key, i + 1)
+    
+    return None, start
+
+
+def _parse_block(block: str) -> Optional[Dict[str, Any]]:
+    """
+    解析单个字幕块
+    
+    Args:
+        block: 字幕块文本
+    
+    Returns:
+        位姿数据字典
+    """
+    try:
+        # 按前两个换行符切片，不拆分整块文本
+        text = block.strip()
+        first = text.find('\n')
+        second = text.find('\n', first + 1) if first >= 0 else -1
+        
+        if second < 0:
+            return None
+        
+        # 第一行: 序号
+        block_number = int(text[:first])
+        
+        # 第二行: 时间戳
+        timestamp_line = text[first + 1:second]
+        timestamp = _parse_timestamp(timestamp_line)
+        
+        # 第三行及之后: 字幕内容
+        content = text[second + 1:]
+        
+        # 解析位姿数据
+        pose = {
+            'block_number': block_number,
+            'timestamp': timestamp,
+        }
+        
+        # 按DJI字段顺序依次解析，游标随已匹配字段前移
+        # 解析帧号
+        frame_text, cursor = _num_after(content, 'FrameCnt:', _RE_INT)
+        if frame_text:
+            pose['frame_number'] = int(frame_text)
+        
+        # 解析时间差
+        diff_text, cursor = _num_after(content, 'DiffTime:', _RE_DIFF_TIME, cursor)
+        if diff_text:
+            pose['diff_time'] = int(diff_text)
+        
+        # 解析日期时间
+        datetime_match = _RE_DATETIME.search(content, cursor)
+        if datetime_match is None and cursor:
+            datetime_match = _RE_DATETIME.search(content)
+        if datetime_match:
+            pose['datetime'] = datetime_match.group(1)
+            cursor = max(cursor, datetime_match.end())
+        
+        # 以下字段不区分大小写，统一转小写后查找
+        # （小写后长度可能变化，游标偏移时由_num_after从头查找兜底）
+        content_lower = content.lower()
+        
+        # 解析GPS坐标
+        lat_text, cursor = _num_after(content_lower, 'latitude:', _RE_DECIMAL, cursor)
+        lon_text, cursor = _num_after(content_lower, 'longitude:', _RE_DECIMAL, cursor)
+        
+        if lat_text and lon_text:
+            pose['latitude'] = float(lat_text)
+            pose['longitude'] = float(lon_text)
+        
+        # 解析高度
+        alt_text, cursor = _num_after(content_lower, 'altitude:', _RE_NUMBER, cursor)
+        if alt_text:
+            pose['altitude'] = float(alt_text)
+        
+        # 解析姿态角
+        for key in ('yaw:', 'pitch:', 'roll:'):
+            angle_text, cursor = _num_after(content_lower, key, _RE_NUMBER, cursor)
+            if angle_text:
+                pose[key[:-1]] = float(angle_text)
+        
+        # 检查是否至少有GPS坐标
+        if 'latitude' not in pose or 'longitude' not in pose:
+            logger.warning("字幕块 {} 缺少GPS坐标", block_number)
+            return None
+        
+        return pose
+    
+    except Exception as e:
+        logger.debug("解析字幕块失败: {}", e)
+        return None
+
+
+def _parse_timestamp(timestamp_line: str) -> float:
+    """
+    解析SRT时间戳
+    
+    Args:
+        timestamp_line: 时间戳行，格式如 "00:00:00,000 --> 00:00:00,033"
+    
+    Returns:
+        时间戳 (毫秒)
+    """
+    try:
+        # 快速路径：标准格式 "HH:MM:SS,mmm --> ..." 为定宽，直接按偏移切片；
+        # 分隔符不是 " --> " 的行走通用路径，保持原有的容错/报错行为
+        s = timestamp_line
+        if len(s) >= 17 and s[2] == ':' and s[5] == ':' and s[8] == ',' and s[12:17] == ' --> ':
+            return ((int(s[0:2]) * 60 + int(s[3:5])) * 60 + int(s[6:8])) * 1000 + int(s[9:12])
+        
+        # 提取起始时间
+        start_time = timestamp_line.split('-->')[0].strip()
+        
+        # 解析时间格式 HH:MM:SS,mmm
+        time_parts = start_time.replace(',', ':').split(':')
+        
+        hours = int(time_parts[0])
+        minutes = int(time_parts[1])
+        seconds = int(time_parts[2])
+        milliseconds = int(time_parts[3])
+        
+        # 转换为毫秒
+        total_ms = (hours * 3600 + minutes * 60 + seconds) * 1000 + milliseconds
+        
+        return total_ms
+    
+    except Exception as e:
+        logger.warning(f"解析时间戳失败: {timestamp_line}, 错误: {e}")
+        return 0.0
+
+
+def _iter_blocks(srt_path: str) -> Iterator[str]:
+    """
+    逐块读取SRT文件
+    
+    按行流式读取，以空行分隔字幕块，避免一次性读入整个文件
+    再整体分割产生的大字符串和大列表。
+    
+    Args:
+        srt_path: SRT文件路径
+        
+    Yields:
+        字幕块文本
+    """
+    buf = []
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line == '\n':
+                if buf:
+                    yield ''.join(buf)
+                    buf.clear()
+            else:
+                buf.append(line)
+    
+    if buf:
+        yield ''.join(buf)
 
 
 class SRTParser:
     """SRT字幕解析器类"""
     
-    def __init__(self):
-        """初始化SRT解析器"""
+    def __init__(self, max_workers: Optional[int] = None, backend: str = 'auto'):
+        """
+        初始化SRT解析器
+        
+        Args:
+            max_workers: 大文件并行解析的进程数 (None表示CPU核数，1表示禁用并行)
+            backend: 解析方式，见 SRT_BACKENDS
+        """
+        if backend not in SRT_BACKENDS:
+            logger.warning(f"未知的SRT解析方式: {backend}，使用 auto")
+            backend = 'auto'
+        if backend == 'numba' and not srt_scanner.NUMBA_AVAILABLE:
+            logger.warning("未安装numba，SRT解析改为逐块解析")
+            backend = 'python'
+        if backend == 'auto':
+            backend = 'numba' if srt_scanner.NUMBA_AVAILABLE else 'process'
+        
+        self.max_workers = max_workers
+        self.backend = backend
         self.pose_data = []
+        
+        # 列式位姿数组（SoA，按字幕顺序；缺失字段为NaN/-1）
+        # 时间戳数组同时作为二分查找索引
+        self.arr_ts = np.empty(0, dtype=np.float64)
+        self.arr_frame = np.empty(0, dtype=np.int64)
+        self.arr_lat = np.empty(0, dtype=np.float64)
+        self.arr_lon = np.empty(0, dtype=np.float64)
+        self.arr_alt = np.empty(0, dtype=np.float64)
+        self.arr_yaw = np.empty(0, dtype=np.float32)
+        self.arr_pitch = np.empty(0, dtype=np.float32)
+        self.arr_roll = np.empty(0, dtype=np.float32)
+        self._ts_sorted = True
+        self._last_ts_idx = 0
+        
+        # 帧号索引
+        self._by_frame: Dict[int, Dict[str, Any]] = {}
     
     def parse(self, srt_path: str) -> List[Dict[str, Any]]:
         """
@@ -27,18 +271,33 @@ class SRTParser:
             位姿数据列表
         """
         try:
-            with open(srt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 分割字幕块
-            subtitle_blocks = content.strip().split('\n\n')
-            
             self.pose_data = []
             
-            for block in subtitle_blocks:
-                pose = self._parse_block(block)
-                if pose:
-                    self.pose_data.append(pose)
+            # 字幕块相互独立，大文件分发到进程池并行解析
+            use_pool = (
+                self.backend == 'process'
+                and self.max_workers != 1
+                and (os.cpu_count() or 1) > 1
+                and os.path.getsize(srt_path) >= _PARALLEL_MIN_BYTES
+            )
+            
+            if self.backend == 'numba':
+                # Numba编译的字节扫描器：整个文件一次扫描完成
+                self.pose_data = self._parse_scanned(srt_path)
+            elif use_pool:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    results = executor.map(
+                        _parse_block, _iter_blocks(srt_path), chunksize=_PARALLEL_CHUNKSIZE
+                    )
+                    self.pose_data = [pose for pose in results if pose]
+            else:
+                # 流式读取并逐块解析，只保留解析结果
+                for block in _iter_blocks(srt_path):
+                    pose = _parse_block(block)
+                    if pose:
+                        self.pose_data.append(pose)
+            
+            self._build_index()
             
             logger.info(f"成功解析SRT文件: {srt_path}, 共{len(self.pose_data)}条位姿数据")
             
@@ -48,119 +307,110 @@ class SRTParser:
             logger.error(f"解析SRT文件时发生错误: {e}")
             return []
     
-    def _parse_block(self, block: str) -> Optional[Dict[str, Any]]:
+    def _parse_scanned(self, srt_path: str) -> List[Dict[str, Any]]:
         """
-        解析单个字幕块
+        使用字节扫描器解析SRT文件
+        
+        扫描器无法保证结果一致的字幕块会回退到Python解析
         
         Args:
-            block: 字幕块文本
+            srt_path: SRT文件路径
             
         Returns:
-            位姿数据字典
+            位姿数据列表
         """
-        try:
-            lines = block.strip().split('\n')
-            
-            if len(lines) < 3:
-                return None
-            
-            # 第一行: 序号
-            block_number = int(lines[0])
-            
-            # 第二行: 时间戳
-            timestamp_line = lines[1]
-            timestamp = self._parse_timestamp(timestamp_line)
-            
-            # 第三行及之后: 字幕内容
-            content = '\n'.join(lines[2:])
-            
-            # 解析位姿数据
-            pose = {
-                'block_number': block_number,
-                'timestamp': timestamp,
-            }
-            
-            # 解析帧号
-            frame_match = re.search(r'FrameCnt:\s*(\d+)', content)
-            if frame_match:
-                pose['frame_number'] = int(frame_match.group(1))
-            
-            # 解析时间差
-            diff_time_match = re.search(r'DiffTime:\s*(\d+)ms', content)
-            if diff_time_match:
-                pose['diff_time'] = int(diff_time_match.group(1))
-            
-            # 解析日期时间
-            datetime_match = re.search(r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)', content)
-            if datetime_match:
-                pose['datetime'] = datetime_match.group(1)
-            
-            # 解析GPS坐标
-            lat_match = re.search(r'latitude:\s*([-+]?\d+\.\d+)', content, re.IGNORECASE)
-            lon_match = re.search(r'longitude:\s*([-+]?\d+\.\d+)', content, re.IGNORECASE)
-            
-            if lat_match and lon_match:
-                pose['latitude'] = float(lat_match.group(1))
-                pose['longitude'] = float(lon_match.group(1))
-            
-            # 解析高度
-            alt_match = re.search(r'altitude:\s*([-+]?\d+\.?\d*)m?', content, re.IGNORECASE)
-            if alt_match:
-                pose['altitude'] = float(alt_match.group(1))
-            
-            # 解析姿态角
-            yaw_match = re.search(r'yaw:\s*([-+]?\d+\.?\d*)', content, re.IGNORECASE)
-            pitch_match = re.search(r'pitch:\s*([-+]?\d+\.?\d*)', content, re.IGNORECASE)
-            roll_match = re.search(r'roll:\s*([-+]?\d+\.?\d*)', content, re.IGNORECASE)
-            
-            if yaw_match:
-                pose['yaw'] = float(yaw_match.group(1))
-            if pitch_match:
-                pose['pitch'] = float(pitch_match.group(1))
-            if roll_match:
-                pose['roll'] = float(roll_match.group(1))
-            
-            # 检查是否至少有GPS坐标
-            if 'latitude' not in pose or 'longitude' not in pose:
-                logger.warning(f"字幕块 {block_number} 缺少GPS坐标")
-                return None
+        with open(srt_path, 'rb') as f:
+            data = f.read()
+        
+        # 与文本模式一致的换行处理
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        
+        spans, status, out_int, out_float, out_dt = srt_scanner.scan_srt_bytes(data)
+        
+        spans = spans.tolist()
+        status = status.tolist()
+        out_int = out_int.tolist()
+        out_float = out_float.tolist()
+        out_dt = out_dt.tolist()
+        
+        poses = []
+        for i, block_status in enumerate(status):
+            if block_status == srt_scanner.STATUS_OK:
+                block_number, timestamp, frame_number, diff_time, flags = out_int[i]
+                lat, lon, alt, yaw, pitch, roll = out_float[i]
+                
+                pose = {
+                    'block_number': block_number,
+                    'timestamp': timestamp,
+                }
+                if flags & srt_scanner.FLAG_FRAME:
+                    pose['frame_number'] = frame_number
+                if flags & srt_scanner.FLAG_DIFF:
+                    pose['diff_time'] = diff_time
+                if flags & srt_scanner.FLAG_DATETIME:
+                    dt_start, dt_end = out_dt[i]
+                    pose['datetime'] = data[dt_start:dt_end].decode('ascii')
+                pose['latitude'] = lat
+                pose['longitude'] = lon
+                if flags & srt_scanner.FLAG_ALT:
+                    pose['altitude'] = alt
+                if flags & srt_scanner.FLAG_YAW:
+                    pose['yaw'] = yaw
+                if flags & srt_scanner.FLAG_PITCH:
+                    pose['pitch'] = pitch
+                if flags & srt_scanner.FLAG_ROLL:
+                    pose['roll'] = roll
+                poses.append(pose)
+            
+            elif block_status == srt_scanner.STATUS_SLOW:
+                start, end = spans[i]
+                pose = _parse_block(data[start:end].decode('utf-8'))
+                if pose:
+                    poses.append(pose)
             
-            return pose
+            elif block_status == srt_scanner.STATUS_MISSING_GPS:
+                logger.warning("字幕块 {} 缺少GPS坐标", out_int[i][0])
             
-        except Exception as e:
-            logger.debug(f"解析字幕块失败: {e}")
-            return None
+            elif block_status == srt_scanner.STATUS_ERROR:
+                logger.debug("解析字幕块失败: 第{}个字幕块数值格式错误", i + 1)
+        
+        return poses
+    
+    def _parse_block(self, block: str) -> Optional[Dict[str, Any]]:
+        """解析单个字幕块（见模块函数 _parse_block）"""
+        return _parse_block(block)
     
     def _parse_timestamp(self, timestamp_line: str) -> float:
-        """
-        解析SRT时间戳
+        """解析SRT时间戳（见模块函数 _parse_timestamp）"""
+        return _parse_timestamp(timestamp_line)
+    
+    def _build_index(self):
+        """构建列式位姿数组、时间戳索引和帧号索引"""
+        n = len(self.pose_data)
+        nan = float('nan')
         
-        Args:
-            timestamp_line: 时间戳行，格式如 "00:00:00,000 --> 00:00:00,033"
-            
-        Returns:
-            时间戳 (毫秒)
-        """
-        try:
-            # 提取起始时间
-            start_time = timestamp_line.split('-->')[0].strip()
-            
-            # 解析时间格式 HH:MM:SS,mmm
-            time_parts = start_time.replace(',', ':').split(':')
-            
-            hours = int(time_parts[0])
-            minutes = int(time_parts[1])
-            seconds = int(time_parts[2])
-            milliseconds = int(time_parts[3])
-            
-            # 转换为毫秒
-            total_ms = (hours * 3600 + minutes * 60 + seconds) * 1000 + milliseconds
-            
-            return total_ms
-            
-        except Exception as e:
-            logger.warning(f"解析时间戳失败: {timestamp_line}, 错误: {e}")
-            return 0.0
+        self.arr_ts = np.fromiter((pose['timestamp'] for pose in self.pose_data), dtype=np.float64, count=n)
+        self.arr_frame = np.fromiter((pose.get('frame_number', -1) for pose in self.pose_data), dtype=np.int64, count=n)
+        self.arr_lat = np.fromiter((pose['latitude'] for pose in self.pose_data), dtype=np.float64, count=n)
+        self.arr_lon = np.fromiter((pose['longitude'] for pose in self.pose_data), dtype=np.float64, count=n)
+        self.arr_alt = np.fromiter((pose.get('altitude', nan) for pose in self.pose_data), dtype=np.float64, count=n)
+        self.arr_yaw = np.fromiter((pose.get('yaw', nan) for pose in self.pose_data), dtype=np.float32, count=n)
+        self.arr_pitch = np.fromiter((pose.get('pitch', nan) for pose in self.pose_data), dtype=np.float32, count=n)
+        self.arr_roll = np.fromiter((pose.get('roll', nan) for pose in self.pose_data), dtype=np.float32, count=n)
+        
+        self._ts_sorted = bool(np.all(self.arr_ts[1:] >= self.arr_ts[:-1]))
+        self._last_ts_idx = 0
+        
+        # 帧号重复时保留首次出现的位姿
+        self._by_frame = {}
+        for pose in self.pose_data:
+            frame_number = pose.get('frame_number')
+            if frame_number is not None:
+                self._by_frame.setdefault(frame_number, pose)
+        
+        if not self._ts_sorted:
+            logger.warning("SRT时间戳非单调递增，按时间戳查询将使用线性扫描")
     
     def get_pose_by_timestamp(self, timestamp: float, tolerance: float = 100.0) -> Optional[Dict[str, Any]]:
         """
@@ -176,6 +426,48 @@ class SRTParser:
         if not self.pose_data:
             return None
         
+        # pose_data被外部替换时重建索引
+        if len(self.arr_ts) != len(self.pose_data):
+            self._build_index()
+        
+        if not self._ts_sorted:
+            return self._get_pose_by_timestamp_linear(timestamp, tolerance)
+        
+        ts = self.arr_ts
+        
+        # 帧时间通常单调递增，从上次命中位置开始二分
+        lo = self._last_ts_idx if ts[self._last_ts_idx] <= timestamp else 0
+        i = lo + int(np.searchsorted(ts[lo:], timestamp, side='left'))
+        
+        # 比较左右相邻两个位姿，时间差相同时取较早的一个
+        if i == 0:
+            best_idx = 0
+        elif i == len(ts):
+            best_idx = i - 1
+        elif timestamp - ts[i - 1] <= ts[i] - timestamp:
+            best_idx = i - 1
+        else:
+            best_idx = i
+        
+        self._last_ts_idx = best_idx
+        
+        # 检查是否在容差范围内
+        if abs(ts[best_idx] - timestamp) <= tolerance:
+            return self.pose_data[best_idx]
+        
+        return None
+    
+    def _get_pose_by_timestamp_linear(self, timestamp: float, tolerance: float) -> Optional[Dict[str, Any]]:
+        """
+        线性扫描查找最接近的位姿（时间戳无序时使用）
+        
+        Args:
+            timestamp: 目标时间戳 (毫秒)
+            tolerance: 容差 (毫秒)
+            
+        Returns:
+            最接近的位姿数据
+        """
         # 找到时间差最小的位姿
         min_diff = float('inf')
         best_pose = None
@@ -202,11 +494,11 @@ class SRTParser:
         Returns:
             对应的位姿数据
         """
-        for pose in self.pose_data:
-            if pose.get('frame_number') == frame_number:
-                return pose
+        # pose_data被外部替换时重建索引
+        if len(self.arr_ts) != len(self.pose_data):
+            self._build_index()
         
-        return None
+        return self._by_frame.get(frame_number)
     
     def get_all_poses(self) -> List[Dict[str, Any]]:
         """
@@ -217,6 +509,39 @@ class SRTParser:
         """
         return self.pose_data
     
+    def get_timestamp_array(self) -> np.ndarray:
+        """
+        获取与pose_data一一对应的时间戳数组
+        
+        Returns:
+            float64时间戳数组 (毫秒)
+        """
+        if len(self.arr_ts) != len(self.pose_data):
+            self._build_index()
+        
+        return self.arr_ts
+    
+    def get_pose_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        获取列式位姿数组，便于批量向量化处理
+        
+        Returns:
+            字段名 -> 数组 (timestamp/frame_number/latitude/longitude/altitude/yaw/pitch/roll)
+        """
+        if len(self.arr_ts) != len(self.pose_data):
+            self._build_index()
+        
+        return {
+            'timestamp': self.arr_ts,
+            'frame_number': self.arr_frame,
+            'latitude': self.arr_lat,
+            'longitude': self.arr_lon,
+            'altitude': self.arr_alt,
+            'yaw': self.arr_yaw,
+            'pitch': self.arr_pitch,
+            'roll': self.arr_roll,
+        }
+    
     def get_pose_count(self) -> int:
         """
         获取位姿数据总数
@@ -233,10 +558,10 @@ class SRTParser:
         Args:
             count: 打印数量
         """
-        logger.info(f"=== SRT位姿数据示例 (前{count}条) ===")
+        logger.info("=== SRT位姿数据示例 (前{}条) ===", count)
         
+        # 参数由loguru在输出时才格式化，日志级别过滤时不产生字符串开销
         for i, pose in enumerate(self.pose_data[:count]):
-            logger.info(f"[{i+1}] 帧号: {pose.get('frame_number', 'N/A')}, "
-                       f"时间戳: {pose.get('timestamp', 0):.2f}ms, "
-                       f"GPS: ({pose.get('latitude', 0):.6f}, {pose.get('longitude', 0):.6f}), "
-                       f"高度: {pose.get('altitude', 0):.1f}m")
+            logger.info("[{}] 帧号: {}, 时间戳: {:.2f}ms, GPS: ({:.6f}, {:.6f}), 高度: {:.1f}m",
+                        i + 1, pose.get('frame_number', 'N/A'), pose.get('timestamp', 0),
+                        pose.get('latitude', 0), pose.get('longitude', 0), pose.get('altitude', 0))
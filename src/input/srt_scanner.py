@@ -0,0 +1,488 @@
+"""
+SRT字节扫描器 (Numba加速)
+在整个SRT文件的字节缓冲区上逐字符扫描，一次性提取所有字幕块的数值字段
+
+仅处理纯ASCII、格式规范的字幕块；无法保证与Python解析结果完全一致的块
+（非ASCII字符、非定宽时间戳、超长数字等）标记为SLOW，交由Python解析器处理。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器（保持纯Python可执行）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# 字幕块扫描状态
+STATUS_OK = 0           # 解析成功
+STATUS_SKIP = 1         # 行数不足，静默跳过
+STATUS_MISSING_GPS = 2  # 缺少GPS坐标
+STATUS_SLOW = 3         # 交给Python解析器处理
+STATUS_ERROR = 4        # 数值格式错误
+
+# 字段存在标记位
+FLAG_FRAME = 1
+FLAG_DIFF = 2
+FLAG_DATETIME = 4
+FLAG_LATLON = 8
+FLAG_ALT = 16
+FLAG_YAW = 32
+FLAG_PITCH = 64
+FLAG_ROLL = 128
+
+# 字段数值格式
+VALUE_INT = 0        # \d+
+VALUE_DIFF_TIME = 1  # \d+ms
+VALUE_DECIMAL = 2    # [-+]?\d+\.\d+
+VALUE_NUMBER = 3     # [-+]?\d+\.?\d*
+
+# 浮点数组列
+COL_LAT = 0
+COL_LON = 1
+COL_ALT = 2
+COL_YAW = 3
+COL_PITCH = 4
+COL_ROLL = 5
+
+# 字段前缀（不区分大小写的前缀为小写）
+_KEY_FRAME = np.frombuffer(b'FrameCnt:', dtype=np.uint8)
+_KEY_DIFF = np.frombuffer(b'DiffTime:', dtype=np.uint8)
+_KEY_LAT = np.frombuffer(b'latitude:', dtype=np.uint8)
+_KEY_LON = np.frombuffer(b'longitude:', dtype=np.uint8)
+_KEY_ALT = np.frombuffer(b'altitude:', dtype=np.uint8)
+_KEY_YAW = np.frombuffer(b'yaw:', dtype=np.uint8)
+_KEY_PITCH = np.frombuffer(b'pitch:', dtype=np.uint8)
+_KEY_ROLL = np.frombuffer(b'roll:', dtype=np.uint8)
+
+# 10的整数次幂（1e0~1e22均可精确表示），尾数小于2^53时 m / 10^k 与float()结果一致
+_POW10 = np.array([10.0 ** i for i in range(23)], dtype=np.float64)
+_MAX_MANTISSA = 2 ** 53
+
+_NL = 10       # '\n'
+_COLON = 58    # ':'
+_COMMA = 44    # ','
+_DOT = 46      # '.'
+_MINUS = 45    # '-'
+_PLUS = 43     # '+'
+
+
+@njit(cache=True)
+def _is_space(c):
+    """ASCII范围内与str.isspace一致的空白字符判断"""
+    return c == 32 or (9 <= c <= 13) or (28 <= c <= 31)
+
+
+@njit(cache=True)
+def _is_digit(c):
+    return 48 <= c <= 57
+
+
+@njit(cache=True)
+def _find_key(data, start, end, key, ignore_case):
+    """在data[start:end]中查找前缀首次出现的位置，未找到返回-1"""
+    n = len(key)
+    for p in range(start, end - n + 1):
+        matched = True
+        for q in range(n):
+            c = data[p + q]
+            if ignore_case and 65 <= c <= 90:
+                c += 32
+            if c != key[q]:
+                matched = False
+                break
+        if matched:
+            return p
+    return -1
+
+
+@njit(cache=True)
+def _match_value(data, j, end, kind):
+    """
+    从data[j]开始按字段数值格式匹配（与srt_parser中的数值正则一致）
+
+    Returns:
+        (数值终点, 匹配终点)，不匹配时为(-1, -1)
+    """
+    k = j
+    if kind != VALUE_INT and kind != VALUE_DIFF_TIME:
+        if k < end and (data[k] == _MINUS or data[k] == _PLUS):
+            k += 1
+
+    # 整数部分至少一位
+    digits_start = k
+    while k < end and _is_digit(data[k]):
+        k += 1
+    if k == digits_start:
+        return -1, -1
+
+    if kind == VALUE_DIFF_TIME:
+        if k + 2 <= end and data[k] == 109 and data[k + 1] == 115:  # 'ms'
+            return k, k + 2
+        return -1, -1
+
+    if kind == VALUE_DECIMAL:
+        # 必须带小数点和至少一位小数
+        if k >= end or data[k] != _DOT:
+            return -1, -1
+        k += 1
+        frac_start = k
+        while k < end and _is_digit(data[k]):
+            k += 1
+        if k == frac_start:
+            return -1, -1
+    elif kind == VALUE_NUMBER:
+        # 可省略小数点及小数部分
+        if k < end and data[k] == _DOT:
+            k += 1
+            while k < end and _is_digit(data[k]):
+                k += 1
+
+    return k, k
+
+
+@njit(cache=True)
+def _num_span(data, start, end, key, ignore_case, cursor, kind):
+    """
+    与srt_parser._num_after一致：从游标处定位前缀，跳过空白后按格式匹配数值，
+    不匹配时查找该前缀的下一次出现；游标之后找不到时再从头查找
+
+    Returns:
+        (数值起点, 数值终点, 新游标)，缺失时数值起点/终点为-1
+    """
+    begin = cursor
+    while True:
+        p = _find_key(data, begin, end, key, ignore_case)
+        while p >= 0:
+            j = p + len(key)
+            while j < end and _is_space(data[j]):
+                j += 1
+            k, match_end = _match_value(data, j, end, kind)
+            if k >= 0:
+                return j, k, max(match_end, cursor)
+            p = _find_key(data, p + 1, end, key, ignore_case)
+
+        if begin <= start:
+            return -1, -1, cursor
+        begin = start
+
+
+@njit(cache=True)
+def _parse_int(data, j, k):
+    """
+    按int()规则解析整数
+
+    Returns:
+        (状态, 数值)，状态: 0成功 / STATUS_ERROR / STATUS_SLOW
+    """
+    i = j
+    negative = False
+    if i < k and (data[i] == _MINUS or data[i] == _PLUS):
+        negative = data[i] == _MINUS
+        i += 1
+    if i >= k or k - i > 18:
+        return (STATUS_SLOW if k - i > 18 else STATUS_ERROR), 0
+
+    value = 0
+    for q in range(i, k):
+        c = data[q]
+        if not _is_digit(c):
+            return STATUS_ERROR, 0
+        value = value * 10 + (c - 48)
+    return 0, -value if negative else value
+
+
+@njit(cache=True)
+def _parse_float(data, j, k, pow10, max_mantissa):
+    """
+    按float()规则解析仅含[+-.0-9]的小数
+
+    Returns:
+        (状态, 数值)，状态: 0成功 / STATUS_ERROR / STATUS_SLOW
+    """
+    i = j
+    negative = False
+    if i < k and (data[i] == _MINUS or data[i] == _PLUS):
+        negative = data[i] == _MINUS
+        i += 1
+
+    mantissa = 0
+    int_digits = 0
+    frac_digits = 0
+    seen_dot = False
+    for q in range(i, k):
+        c = data[q]
+        if c == _DOT:
+            if seen_dot:
+                return STATUS_ERROR, 0.0
+            seen_dot = True
+        elif _is_digit(c):
+            mantissa = mantissa * 10 + (c - 48)
+            if mantissa >= max_mantissa:
+                return STATUS_SLOW, 0.0
+            if seen_dot:
+                frac_digits += 1
+            else:
+                int_digits += 1
+        else:
+            return STATUS_ERROR, 0.0
+
+    if int_digits + frac_digits == 0:
+        return STATUS_ERROR, 0.0
+    if frac_digits >= len(pow10):
+        return STATUS_SLOW, 0.0
+
+    value = float(mantissa) / pow10[frac_digits]
+    return 0, -value if negative else value
+
+
+@njit(cache=True)
+def _match_datetime(data, p, end):
+    """
+    匹配 \\d{4}-\\d{2}-\\d{2}\\s+\\d{2}:\\d{2}:\\d{2}\\.\\d+ ，成功返回终点，否则返回-1
+    """
+    # 日期部分 YYYY-MM-DD
+    if p + 10 > end:
+        return -1
+    for q in range(p, p + 4):
+        if not _is_digit(data[q]):
+            return -1
+    if data[p + 4] != _MINUS or data[p + 7] != _MINUS:
+        return -1
+    if not (_is_digit(data[p + 5]) and _is_digit(data[p + 6])
+            and _is_digit(data[p + 8]) and _is_digit(data[p + 9])):
+        return -1
+
+    # 至少一个空白
+    i = p + 10
+    if i >= end or not _is_space(data[i]):
+        return -1
+    while i < end and _is_space(data[i]):
+        i += 1
+
+    # 时间部分 HH:MM:SS.f+
+    if i + 10 > end:
+        return -1
+    if not (_is_digit(data[i]) and _is_digit(data[i + 1]) and data[i + 2] == _COLON
+            and _is_digit(data[i + 3]) and _is_digit(data[i + 4]) and data[i + 5] == _COLON
+            and _is_digit(data[i + 6]) and _is_digit(data[i + 7]) and data[i + 8] == _DOT
+            and _is_digit(data[i + 9])):
+        return -1
+    i += 10
+    while i < end and _is_digit(data[i]):
+        i += 1
+    return i
+
+
+@njit(cache=True)
+def _find_datetime(data, start, end):
+    """在data[start:end]中查找日期时间首次出现的位置，未找到返回-1"""
+    for p in range(start, end):
+        if _match_datetime(data, p, end) >= 0:
+            return p
+    return -1
+
+
+@njit(cache=True)
+def _count_blocks(data):
+    """统计字幕块数（以空行分隔）"""
+    n = len(data)
+    count = 0
+    in_block = False
+    pos = 0
+    while pos < n:
+        line_end = pos
+        while line_end < n and data[line_end] != _NL:
+            line_end += 1
+        if line_end == pos and line_end < n:
+            in_block = False
+        elif not in_block:
+            in_block = True
+            count += 1
+        pos = line_end + 1
+    return count
+
+
+@njit(cache=True)
+def _scan_block(data, bs, be, out_int, out_float, out_dt, i, keys, pow10, max_mantissa):
+    """
+    扫描单个字幕块 data[bs:be]，结果写入第i行
+
+    Returns:
+        状态码
+    """
+    # 非ASCII字节：交给Python处理（大小写转换、Unicode空白等语义）
+    for q in range(bs, be):
+        if data[q] >= 128:
+            return STATUS_SLOW
+
+    # block.strip()
+    while bs < be and _is_space(data[bs]):
+        bs += 1
+    while be > bs and _is_space(data[be - 1]):
+        be -= 1
+
+    # 前两行的换行位置
+    nl1 = -1
+    nl2 = -1
+    for q in range(bs, be):
+        if data[q] == _NL:
+            if nl1 < 0:
+                nl1 = q
+            else:
+                nl2 = q
+                break
+    if nl2 < 0:
+        return STATUS_SKIP
+
+    # 第一行: 序号 (int()允许首尾空白，下划线等情况交给Python)
+    s = bs
+    e = nl1
+    while e > s and _is_space(data[e - 1]):
+        e -= 1
+    for q in range(s, e):
+        if data[q] == 95:  # '_'
+            return STATUS_SLOW
+    status, block_number = _parse_int(data, s, e)
+    if status != 0:
+        return status
+    out_int[i, 0] = block_number
+
+    # 第二行: 定宽时间戳 "HH:MM:SS,mmm --> "，其余格式交给Python
+    t = nl1 + 1
+    if nl2 - t < 17 or data[t + 2] != _COLON or data[t + 5] != _COLON or data[t + 8] != _COMMA:
+        return STATUS_SLOW
+    if not (data[t + 12] == 32 and data[t + 13] == _MINUS and data[t + 14] == _MINUS
+            and data[t + 15] == 62 and data[t + 16] == 32):  # " --> "
+        return STATUS_SLOW
+    for q in (0, 1, 3, 4, 6, 7, 9, 10, 11):
+        if not _is_digit(data[t + q]):
+            return STATUS_SLOW
+    hours = (data[t] - 48) * 10 + (data[t + 1] - 48)
+    minutes = (data[t + 3] - 48) * 10 + (data[t + 4] - 48)
+    seconds = (data[t + 6] - 48) * 10 + (data[t + 7] - 48)
+    millis = (data[t + 9] - 48) * 100 + (data[t + 10] - 48) * 10 + (data[t + 11] - 48)
+    out_int[i, 1] = ((hours * 60 + minutes) * 60 + seconds) * 1000 + millis
+
+    # 第三行及之后: 字幕内容
+    cs = nl2 + 1
+    ce = be
+    flags = 0
+
+    # 按DJI字段顺序依次扫描，游标随已匹配字段前移
+    j, k, cursor = _num_span(data, cs, ce, keys[0], False, cs, VALUE_INT)
+    if j >= 0:
+        status, value = _parse_int(data, j, k)
+        if status != 0:
+            return status
+        out_int[i, 2] = value
+        flags |= FLAG_FRAME
+
+    j, k, cursor = _num_span(data, cs, ce, keys[1], False, cursor, VALUE_DIFF_TIME)
+    if j >= 0:
+        status, value = _parse_int(data, j, k)
+        if status != 0:
+            return status
+        out_int[i, 3] = value
+        flags |= FLAG_DIFF
+
+    dt_start = _find_datetime(data, cursor, ce)
+    if dt_start < 0 and cursor > cs:
+        dt_start = _find_datetime(data, cs, ce)
+    if dt_start >= 0:
+        dt_end = _match_datetime(data, dt_start, ce)
+        out_dt[i, 0] = dt_start
+        out_dt[i, 1] = dt_end
+        flags |= FLAG_DATETIME
+        cursor = max(cursor, dt_end)
+
+    lat_j, lat_k, cursor = _num_span(data, cs, ce, keys[2], True, cursor, VALUE_DECIMAL)
+    lon_j, lon_k, cursor = _num_span(data, cs, ce, keys[3], True, cursor, VALUE_DECIMAL)
+    if lat_j >= 0 and lon_j >= 0:
+        status, value = _parse_float(data, lat_j, lat_k, pow10, max_mantissa)
+        if status != 0:
+            return status
+        out_float[i, COL_LAT] = value
+        status, value = _parse_float(data, lon_j, lon_k, pow10, max_mantissa)
+        if status != 0:
+            return status
+        out_float[i, COL_LON] = value
+        flags |= FLAG_LATLON
+
+    for col in range(COL_ALT, COL_ROLL + 1):
+        j, k, cursor = _num_span(data, cs, ce, keys[col + 2], True, cursor, VALUE_NUMBER)
+        if j >= 0:
+            status, value = _parse_float(data, j, k, pow10, max_mantissa)
+            if status != 0:
+                return status
+            out_float[i, col] = value
+            flags |= FLAG_ALT << (col - COL_ALT)
+
+    out_int[i, 4] = flags
+
+    if not flags & FLAG_LATLON:
+        return STATUS_MISSING_GPS
+    return STATUS_OK
+
+
+@njit(cache=True)
+def _scan_all(data, keys, pow10, max_mantissa):
+    n_blocks = _count_blocks(data)
+
+    spans = np.empty((n_blocks, 2), dtype=np.int64)
+    status = np.empty(n_blocks, dtype=np.int8)
+    # 列: 序号, 时间戳, 帧号, 时间差, 字段标记
+    out_int = np.zeros((n_blocks, 5), dtype=np.int64)
+    out_float = np.zeros((n_blocks, 6), dtype=np.float64)
+    out_dt = np.zeros((n_blocks, 2), dtype=np.int64)
+
+    n = len(data)
+    i = -1
+    in_block = False
+    pos = 0
+    while pos < n:
+        line_end = pos
+        while line_end < n and data[line_end] != _NL:
+            line_end += 1
+        if line_end == pos and line_end < n:
+            in_block = False
+        else:
+            if not in_block:
+                in_block = True
+                i += 1
+                spans[i, 0] = pos
+            spans[i, 1] = min(line_end + 1, n)
+        pos = line_end + 1
+
+    for b in range(n_blocks):
+        status[b] = _scan_block(
+            data, spans[b, 0], spans[b, 1], out_int, out_float, out_dt, b,
+            keys, pow10, max_mantissa
+        )
+
+    return spans, status, out_int, out_float, out_dt
+
+
+def scan_srt_bytes(data: bytes):
+    """
+    扫描SRT文件内容
+
+    Args:
+        data: 换行已统一为 '\\n' 的文件字节内容
+
+    Returns:
+        (块范围, 状态, 整数字段, 浮点字段, 日期时间范围)
+        整数字段列: 序号, 时间戳(ms), 帧号, 时间差, 字段存在标记
+        浮点字段列: 纬度, 经度, 高度, 偏航, 俯仰, 横滚
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    keys = (_KEY_FRAME, _KEY_DIFF, _KEY_LAT, _KEY_LON,
+            _KEY_ALT, _KEY_YAW, _KEY_PITCH, _KEY_ROLL)
+    return _scan_all(buf, keys, _POW10, _MAX_MANTISSA)
@@ -4,6 +4,8 @@
 """
 
 import cv2
+import queue
+import threading
 import numpy as np
 from typing import Optional, Tuple
 from loguru import logger
@@ -18,7 +20,11 @@ class VideoFileReader(BaseReader):
         video_path: str,
         frame_skip: int = 1,
         start_frame: int = 0,
-        end_frame: int = 0
+        end_frame: int = 0,
+        seek_threshold: int = 60,
+        backend: str = 'cpu',
+        prefetch_size: int = 0,
+        frame_pool_size: int = 0
     ):
         """
         初始化视频文件读取器
@@ -28,14 +34,37 @@ class VideoFileReader(BaseReader):
             frame_skip: 跳帧间隔 (1表示读取每一帧)
             start_frame: 起始帧号
             end_frame: 结束帧号 (0表示读取到结束)
+            seek_threshold: 跳帧间隔达到该值时改用CAP_PROP_POS_FRAMES定位 (0表示始终使用grab)
+            backend: 解码后端，'cpu' (OpenCV FFmpeg) 或 'cuda' (cv2.cudacodec / NVDEC，不可用时自动回退CPU)
+            prefetch_size: 后台预解码队列长度 (0表示不预解码，在调用线程中同步解码)
+            frame_pool_size: 循环复用的预分配帧缓冲数量 (0表示每帧新分配)；
+                返回的帧在读取该数量的后续帧后会被覆盖，调用方同时持有的帧数必须小于该值
         """
         super().__init__()
         self.video_path = video_path
         self.frame_skip = frame_skip
         self.start_frame = start_frame
         self.end_frame = end_frame
+        self.seek_threshold = seek_threshold
+        self.backend = backend
+        self.prefetch_size = prefetch_size
+        self.frame_pool_size = frame_pool_size
+        
+        # 预分配帧缓冲环，解码直接写入，避免每帧分配大块内存
+        self._frame_pool = []
+        self._pool_idx = 0
+        
+        # 后台解码线程
+        self._prefetch_queue: Optional[queue.Queue] = None
+        self._prefetch_thread: Optional[threading.Thread] = None
+        self._prefetch_stop = threading.Event()
+        self._prefetch_eof = False
+        
+        # 定位不准确的编码格式会自动回退到grab跳帧
+        self._use_seek = seek_threshold > 0 and frame_skip >= seek_threshold
         
         self.cap = None
+        self.gpu_reader = None
         self.fps = 0
         self.width = 0
         self.height = 0
@@ -69,8 +98,18 @@ class VideoFileReader(BaseReader):
             if self.end_frame == 0 or self.end_frame > self.frame_count:
                 self.end_frame = self.frame_count
             
+            # GPU硬解码：属性仍由CPU VideoCapture探测
+            if self.backend == 'cuda':
+                self._open_cuda()
+            
+            if self.frame_pool_size > 0 and self.gpu_reader is None:
+                self._init_frame_pool()
+            
             self.is_opened = True
             
+            if self.prefetch_size > 0:
+                self._start_prefetch()
+            
             logger.info(f"视频文件已打开: {self.video_path}")
             logger.info(f"分辨率: {self.width}x{self.height}, 帧率: {self.fps:.2f}, 总帧数: {self.frame_count}")
             logger.info(f"处理范围: 第{self.start_frame}帧 到 第{self.end_frame}帧")
@@ -85,6 +124,68 @@ class VideoFileReader(BaseReader):
         """
         读取一帧视频
         
+        Returns:
+            (是否成功, 图像帧, 元数据)
+        """
+        if self._prefetch_queue is None:
+            return self._read_next()
+        
+        if self._prefetch_eof:
+            return False, None, None
+        
+        item = self._prefetch_queue.get()
+        if item is None:
+            self._prefetch_eof = True
+            return False, None, None
+        
+        return item
+    
+    def _start_prefetch(self):
+        """启动后台解码线程，解码与检测并行执行"""
+        self._prefetch_queue = queue.Queue(maxsize=self.prefetch_size)
+        self._prefetch_stop.clear()
+        self._prefetch_eof = False
+        self._prefetch_thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._prefetch_thread.start()
+        logger.info(f"后台预解码已启动 (队列长度 {self.prefetch_size})")
+    
+    def _decode_loop(self):
+        """后台解码循环，读到结尾后放入None作为结束标记"""
+        while not self._prefetch_stop.is_set():
+            item = self._read_next()
+            if not item[0]:
+                item = None
+            
+            # 队列满时阻塞等待，期间响应停止信号
+            while not self._prefetch_stop.is_set():
+                try:
+                    self._prefetch_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            
+            if item is None:
+                break
+    
+    def _stop_prefetch(self):
+        """停止后台解码线程"""
+        self._prefetch_stop.set()
+        
+        # 清空队列，解除解码线程的阻塞
+        try:
+            while True:
+                self._prefetch_queue.get_nowait()
+        except queue.Empty:
+            pass
+        
+        self._prefetch_thread.join(timeout=5)
+        self._prefetch_thread = None
+        self._prefetch_queue = None
+    
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray], Optional[dict]]:
+        """
+        同步解码下一帧（预解码模式下在后台线程中调用）
+        
         Returns:
             (是否成功, 图像帧, 元数据)
         """
@@ -96,7 +197,7 @@ class VideoFileReader(BaseReader):
             return False, None, None
         
         # 读取帧
-        ret, frame = self.cap.read()
+        ret, frame = self._read_frame()
         
         if not ret or frame is None:
             logger.warning(f"无法读取第{self.current_frame}帧")
@@ -119,18 +220,114 @@ class VideoFileReader(BaseReader):
         
         # 跳帧处理
         if self.frame_skip > 1:
-            skip_count = self.frame_skip - 1
-            for _ in range(skip_count):
-                if self.current_frame < self.end_frame:
-                    self.cap.read()
-                    self.current_frame += 1
-                else:
-                    break
+            self._skip_frames(self.frame_skip - 1)
         
         return True, frame, metadata
     
+    def _skip_frames(self, skip_count: int):
+        """
+        跳过指定数量的帧
+        
+        小间隔使用grab()：只解码不做颜色转换和拷贝；
+        大间隔直接按帧号定位，由解复用器跳到最近关键帧后解码（MP4/H.264下精确）。
+        
+        Args:
+            skip_count: 跳过的帧数
+        """
+        target = min(self.current_frame + skip_count, self.end_frame)
+        
+        if self._use_seek and target < self.end_frame:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+            
+            # 部分编码格式定位不精确，检测到后回退到grab
+            actual = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if actual == target:
+                self.current_frame = target
+                return
+            
+            logger.warning(f"视频帧定位不精确 (目标{target}, 实际{actual})，回退到逐帧跳过")
+            self._use_seek = False
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.current_frame)
+        
+        while self.current_frame < target:
+            if self.gpu_reader is not None:
+                self.gpu_reader.grab()
+            else:
+                self.cap.grab()
+            self.current_frame += 1
+    
+    def _open_cuda(self):
+        """
+        切换到cv2.cudacodec (NVDEC) 硬件解码
+        
+        需要带CUDA编译的OpenCV；不可用时保持CPU解码。
+        """
+        try:
+            if not hasattr(cv2, 'cudacodec') or cv2.cuda.getCudaEnabledDeviceCount() == 0:
+                logger.warning("OpenCV未启用CUDA视频解码，使用CPU解码")
+                return
+            
+            gpu_reader = cv2.cudacodec.createVideoReader(self.video_path)
+            if hasattr(cv2.cudacodec, 'ColorFormat_BGR'):
+                gpu_reader.set(cv2.cudacodec.ColorFormat_BGR)
+            
+            # 硬解码读取器不支持按帧号定位，起始帧通过grab跳过
+            for _ in range(self.current_frame):
+                gpu_reader.grab()
+            
+        except Exception as e:
+            logger.warning(f"GPU解码初始化失败，使用CPU解码: {e}")
+            return
+        
+        self.gpu_reader = gpu_reader
+        self._use_seek = False
+        self.cap.release()
+        logger.info("已启用GPU硬件解码 (cv2.cudacodec)")
+    
+    def _init_frame_pool(self):
+        """分配帧缓冲环，预解码队列中的帧和解码线程正在写入的帧也占用缓冲"""
+        pool_size = max(self.frame_pool_size, self.prefetch_size + 2)
+        self._frame_pool = [
+            np.empty((self.height, self.width, 3), dtype=np.uint8) for _ in range(pool_size)
+        ]
+        self._pool_idx = 0
+        logger.info(f"帧缓冲复用已启用 ({pool_size} 帧)")
+    
+    def _read_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        从当前解码后端读取一帧
+        
+        Returns:
+            (是否成功, BGR图像帧)
+        """
+        if self.gpu_reader is None:
+            if not self._frame_pool:
+                return self.cap.read()
+            
+            # grab + retrieve 到预分配缓冲；尺寸不符时OpenCV会重新分配
+            if not self.cap.grab():
+                return False, None
+            buf = self._frame_pool[self._pool_idx]
+            self._pool_idx = (self._pool_idx + 1) % len(self._frame_pool)
+            return self.cap.retrieve(buf)
+        
+        ret, gpu_frame = self.gpu_reader.nextFrame()
+        if not ret or gpu_frame is None:
+            return False, None
+        
+        # 旧版cudacodec输出BGRA，在GPU上转换后再下载
+        if gpu_frame.channels() == 4:
+            gpu_frame = cv2.cuda.cvtColor(gpu_frame, cv2.COLOR_BGRA2BGR)
+        
+        return True, gpu_frame.download()
+    
     def close(self):
         """关闭视频文件"""
+        if self._prefetch_thread is not None:
+            self._stop_prefetch()
+        
+        self.gpu_reader = None
+        self._frame_pool = []
         if self.cap is not None:
             self.cap.release()
             self.is_opened = False
@@ -180,6 +377,14 @@ class VideoFileReader(BaseReader):
             logger.warning(f"帧号超出范围: {frame_number}")
             return False
         
+        if self.gpu_reader is not None:
+            logger.warning("GPU解码模式不支持跳转")
+            return False
+        
+        if self._prefetch_thread is not None:
+            logger.warning("预解码模式不支持跳转")
+            return False
+        
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
         self.current_frame = frame_number
         
@@ -64,7 +64,11 @@ class OfflinePipeline:
         )
         
         # SRT解析器
-        self.srt_parser = SRTParser()
+        input_config = self.offline_config.get('input', {})
+        self.srt_parser = SRTParser(
+            max_workers=input_config.get('srt_parse_workers'),
+            backend=input_config.get('srt_parser_backend', 'auto')
+        )
         
         # OCR读取器（备用）
         ocr_config = self.offline_config.get('ocr', {})
@@ -76,7 +80,9 @@ class OfflinePipeline:
                     cache_enabled=True,
                     frame_interval=ocr_config.get('frame_interval', 5),
                     use_gpu=ocr_config.get('use_gpu', False),
-                    language=ocr_config.get('language', 'ch')
+                    language=ocr_config.get('language', 'ch'),
+                    use_tensorrt=ocr_config.get('use_tensorrt', False),
+                    precision=ocr_config.get('precision', 'fp32')
                 )
             except Exception as e:
                 logger.warning(f"OCR初始化失败，将无法使用OCR备用功能: {e}")
@@ -107,9 +113,16 @@ class OfflinePipeline:
             class_names=classes_config.get('names', {}),
             target_classes=classes_config.get('target_classes'),
             tracker_type=tracking_config.get('tracker', 'bytetrack.yaml'),
-            obb_mode=model_config.get('obb_mode', False)
+            obb_mode=model_config.get('obb_mode', False),
+            gpu_preprocess=model_config.get('gpu_preprocess', True),
+            cpu_preprocess=model_config.get('cpu_preprocess', False),
+            engine_path=model_config.get('engine', '')
         )
         
+        # 批量推理：跟踪模式依赖逐帧顺序，仅常规模式生效
+        batch_config = self.yolo_config.get('batch', {})
+        self.batch_size = max(1, batch_config.get('size', 1)) if batch_config.get('enabled', False) else 1
+        
         # 目标跟踪管理器（延迟保存策略）
         self.track_manager = None
         if self.tracking_enabled:
@@ -144,7 +157,9 @@ class OfflinePipeline:
             image_format=output_config.get('image_format', 'full'),
             image_quality=output_config.get('image_quality', 90),
             csv_write_mode='overwrite',
-            post_process_config=output_config  # 传递完整配置以启用后处理
+            post_process_config=output_config,  # 传递完整配置以启用后处理
+            io_workers=output_config.get('io_workers', 0),
+            copy_frames=self.offline_config.get('video_processing', {}).get('reuse_frame_buffers', False)
         )
         
         # 可视化器
@@ -190,8 +205,7 @@ class OfflinePipeline:
                 
                 if pose_data:
                     # 将位姿数据添加到同步器
-                    for pose in pose_data:
-                        self.synchronizer.add_pose(pose)
+                    self.synchronizer.load_bulk(self.srt_parser.get_timestamp_array(), pose_data)
                     logger.info(f"SRT模式: 已加载 {len(pose_data)} 条位姿数据")
                 else:
                     logger.warning("SRT解析失败")
@@ -211,12 +225,22 @@ class OfflinePipeline:
             step_num = 3 if not use_ocr_mode else 2
             logger.info(f"步骤{step_num}: 打开视频文件")
             video_config = self.offline_config.get('video_processing', {})
+            prefetch_frames = video_config.get('prefetch_frames', 8)
+            
+            # 复用帧缓冲时，缓冲数需覆盖预解码队列和一个批次内同时持有的帧
+            frame_pool_size = 0
+            if video_config.get('reuse_frame_buffers', False):
+                frame_pool_size = prefetch_frames + self.batch_size + 2
             
             video_reader = VideoFileReader(
                 video_path=video_path,
                 frame_skip=video_config.get('frame_skip', 1),
                 start_frame=video_config.get('start_frame', 0),
-                end_frame=video_config.get('end_frame', 0)
+                end_frame=video_config.get('end_frame', 0),
+                seek_threshold=video_config.get('seek_threshold', 60),
+                backend=video_config.get('decode_backend', 'cpu'),
+                prefetch_size=prefetch_frames,
+                frame_pool_size=frame_pool_size
             )
             
             if not video_reader.open():
@@ -276,85 +300,137 @@ class OfflinePipeline:
         show_progress = self.offline_config.get('video_processing', {}).get('show_progress', True)
         total_frames = video_reader.end_frame - video_reader.start_frame
         
-        # 创建进度条
-        pbar = tqdm(total=total_frames, desc="处理进度") if show_progress else None
-        
         frame_count = 0
         fps_start_time = time.time()
         fps_frame_count = 0
         current_fps = 0
         
+        # 循环内不变的配置判断提前到循环外
+        tracking_mode = bool(self.tracking_enabled and self.track_manager)
+        visualizer = self.visualizer
+        
+        # 常规模式下累积若干帧后一次批量推理
+        batch_size = 1 if tracking_mode else self.batch_size
+        pending = []
+        
+        # 创建进度条（按批次累计后更新，避免逐帧刷新）
+        pbar = tqdm(total=total_frames, desc="处理进度", mininterval=0.5, miniters=batch_size) if show_progress else None
+        progress = 0
+        
         while True:
             # 读取帧
             success, frame, metadata = video_reader.read()
+            end_of_video = not success or frame is None
             
-            if not success or frame is None:
-                break
-            
-            frame_number = metadata['frame_number']
-            frame_timestamp = metadata['timestamp']
-            
-            # 获取位姿数据
-            if use_ocr_mode:
-                # OCR模式: 从当前帧提取位姿
-                pose = self.osd_reader.extract_pose_from_frame(
-                    frame, frame_number, frame_timestamp
-                )
-                if pose:
-                    # 将OCR提取的位姿添加到同步器（用于后续可能的查询）
-                    self.synchronizer.add_pose(pose)
+            if end_of_video:
+                # 视频结束，处理剩余的不满一批的帧
+                if not pending:
+                    break
+                results = self._detect_pending(pending)
+                pending = []
             else:
-                # SRT模式: 从同步器获取位姿
-                pose = self.synchronizer.sync_frame_with_pose(frame_timestamp, frame_number)
-            
-            if pose is None:
+                frame_number = metadata['frame_number']
+                frame_timestamp = metadata['timestamp']
+                
+                # 获取位姿数据
                 if use_ocr_mode:
-                    logger.debug(f"帧 {frame_number} OCR未能提取位姿数据")
+                    # OCR模式: 从当前帧提取位姿
+                    pose = self.osd_reader.extract_pose_from_frame(
+                        frame, frame_number, frame_timestamp
+                    )
+                    if pose:
+                        # 将OCR提取的位姿添加到同步器（用于后续可能的查询）
+                        self.synchronizer.add_pose(pose)
                 else:
-                    logger.warning(f"帧 {frame_number} 未找到匹配的位姿数据")
-                if pbar:
-                    pbar.update(1)
-                continue
-            
-            if self.tracking_enabled and self.track_manager:
-                # 跟踪模式：延迟保存，由 TrackManager 管理
-                detections = self.detector.detect_with_tracking(frame)
-                if detections:
-                    self.track_manager.update(detections, frame, pose, frame_number)
-                self.track_manager.flush_lost_tracks(
-                    frame_number, self.transformer, self.report_gen
-                )
-            else:
-                # 常规模式：每帧直接保存
-                detections = self.detector.detect(frame)
-                if detections:
-                    detections = self.transformer.transform_detections(detections, pose)
-                    self.report_gen.save(detections, frame, pose, frame_number)
-            
-            # 可视化
-            if self.visualizer:
-                # 计算FPS
-                fps_frame_count += 1
-                if fps_frame_count % 10 == 0:
-                    elapsed = time.time() - fps_start_time
-                    current_fps = fps_frame_count / elapsed if elapsed > 0 else 0
+                    # SRT模式: 从同步器获取位姿
+                    pose = self.synchronizer.sync_frame_with_pose(frame_timestamp, frame_number)
                 
-                key = self.visualizer.show(frame, detections, pose, frame_number, current_fps)
+                if pose is None:
+                    if use_ocr_mode:
+                        logger.debug("帧 {} OCR未能提取位姿数据", frame_number)
+                    else:
+                        logger.warning("帧 {} 未找到匹配的位姿数据", frame_number)
+                    progress += 1
+                    if pbar and progress >= batch_size:
+                        pbar.update(progress)
+                        progress = 0
+                    continue
                 
-                # 按ESC退出
-                if key == 27:
-                    logger.info("用户按下ESC键，退出处理")
-                    break
+                if tracking_mode:
+                    # 跟踪模式：延迟保存，由 TrackManager 管理
+                    detections = self.detector.detect_with_tracking(frame)
+                    if detections:
+                        self.track_manager.update(detections, frame, pose, frame_number)
+                    self.track_manager.flush_lost_tracks(
+                        frame_number, self.transformer, self.report_gen
+                    )
+                    results = [(frame, detections, pose, frame_number)]
+                else:
+                    # 常规模式：攒满一批后推理并直接保存
+                    pending.append((frame, pose, frame_number))
+                    if len(pending) < batch_size:
+                        continue
+                    results = self._detect_pending(pending)
+                    pending = []
             
-            frame_count += 1
-            if pbar:
-                pbar.update(1)
+            user_exit = False
+            for frame, detections, pose, frame_number in results:
+                # 可视化
+                if visualizer:
+                    # 计算FPS
+                    fps_frame_count += 1
+                    if fps_frame_count % 10 == 0:
+                        elapsed = time.time() - fps_start_time
+                        current_fps = fps_frame_count / elapsed if elapsed > 0 else 0
+                    
+                    key = visualizer.show(frame, detections, pose, frame_number, current_fps)
+                    
+                    # 按ESC退出
+                    if key == 27:
+                        logger.info("用户按下ESC键，退出处理")
+                        user_exit = True
+                        break
+                
+                frame_count += 1
+                progress += 1
+            
+            if pbar and progress:
+                pbar.update(progress)
+                progress = 0
+            
+            if user_exit or end_of_video:
+                break
         
         if pbar:
+            pbar.update(progress)
             pbar.close()
         
         logger.info(f"共处理 {frame_count} 帧")
     
+    def _detect_pending(self, pending: list) -> list:
+        """
+        对累积的帧批量检测，并完成坐标转换和保存
+        
+        Args:
+            pending: (图像帧, 位姿, 帧号) 列表
+            
+        Returns:
+            (图像帧, 检测结果, 位姿, 帧号) 列表，顺序与输入一致
+        """
+        if len(pending) == 1:
+            detections_list = [self.detector.detect(pending[0][0])]
+        else:
+            detections_list = self.detector.detect_batch([item[0] for item in pending])
+        
+        results = []
+        for (frame, pose, frame_number), detections in zip(pending, detections_list):
+            if detections:
+                detections = self.transformer.transform_detections(detections, pose)
+                self.report_gen.save(detections, frame, pose, frame_number)
+            results.append((frame, detections, pose, frame_number))
+        
+        return results
+    
     def _print_stats(self):
         """打印统计信息"""
         logger.info("\n" + "="*50)
@@ -5,7 +5,7 @@
 
 import time
 import os
-from pathlib import Path
+from collections import deque
 from typing import Optional
 from tqdm import tqdm
 from loguru import logger
@@ -81,9 +81,18 @@ class OrthophotoPipeline:
             imgsz=detection_config.get('imgsz', 640),
             class_names=classes_config.get('names', {}),
             target_classes=classes_config.get('target_classes'),
-            obb_mode=model_config.get('obb_mode', False)
+            obb_mode=model_config.get('obb_mode', False),
+            gpu_preprocess=model_config.get('gpu_preprocess', True),
+            cpu_preprocess=model_config.get('cpu_preprocess', False),
+            engine_path=model_config.get('engine', ''),
+            devices=model_config.get('devices')
         )
         
+        # 批量推理：detection.batch_size 优先，否则使用 yolo_config 的批处理设置
+        batch_config = self.yolo_config.get('batch', {})
+        default_batch = batch_config.get('size', 1) if batch_config.get('enabled', False) else 1
+        self.batch_size = max(1, self.orthophoto_config.get('detection', {}).get('batch_size', default_batch))
+        
         # 坐标转换器
         self.camera_model = CameraModel(self.camera_config)
         self.transformer = CoordinateTransformer(self.camera_model)
@@ -96,7 +105,10 @@ class OrthophotoPipeline:
             save_images=output_config.get('save_images', True),
             image_format=output_config.get('image_format', 'full'),
             image_quality=output_config.get('image_quality', 85),
-            csv_write_mode=output_config.get('csv_write_mode', 'overwrite')
+            csv_write_mode=output_config.get('csv_write_mode', 'overwrite'),
+            # 图片读取器每张图片独立解码，后台保存无需拷贝
+            io_workers=output_config.get('io_workers', 2),
+            copy_frames=False
         )
         
         # 可视化器
@@ -153,6 +165,7 @@ class OrthophotoPipeline:
             # 将位姿数据添加到同步器
             for pose in pose_data:
                 self.synchronizer.add_pose(pose)
+            self.synchronizer.finalize()
             
             # 3. 打开图片序列
             logger.info("步骤3: 打开图片序列")
@@ -161,12 +174,17 @@ class OrthophotoPipeline:
             end_index = input_config.get('end_index', 0)
             skip = input_config.get('skip', 1)
             
+            # 预读队列默认容纳两个批次，解码与GPU推理重叠
+            prefetch_factor = input_config.get('prefetch_factor', 2)
+            
             image_reader = ImageSequenceReader(
                 image_dir=image_dir,
                 image_pattern=image_pattern,
                 start_index=start_index,
                 end_index=end_index,
-                skip=skip
+                skip=skip,
+                prefetch_size=prefetch_factor * self.batch_size,
+                decode_workers=input_config.get('decode_workers', 4)
             )
             
             if not image_reader.open():
@@ -194,10 +212,16 @@ class OrthophotoPipeline:
         except Exception as e:
             logger.error(f"处理过程中发生错误: {e}", exc_info=True)
         finally:
+            # 等待在途的异步推理结束
+            try:
+                self.detector.close()
+            except Exception as e:
+                logger.warning(f"关闭检测器时出错: {e}")
+            
             # 关闭报告生成器（释放CSV文件句柄）
-            if self.report_generator:
+            if self.report_gen:
                 try:
-                    self.report_generator.close()
+                    self.report_gen.close()
                 except Exception as e:
                     logger.warning(f"关闭报告生成器时出错: {e}")
             
@@ -227,13 +251,17 @@ class OrthophotoPipeline:
         
         # 如果启用了自动查找
         if input_config.get('auto_find_mrk', True):
-            # 在图片目录中查找.MRK文件
-            image_dir_path = Path(image_dir)
-            mrk_files = list(image_dir_path.glob('*.MRK'))
+            # 在图片目录中查找.MRK文件（目录中可能有上万张图片，用scandir按文件名过滤，
+            # 避免为每个条目构造Path对象）
+            mrk_files = []
+            if os.path.isdir(image_dir):
+                with os.scandir(image_dir) as entries:
+                    mrk_files = [entry.path for entry in entries
+                                 if entry.name.endswith('.MRK') and entry.is_file()]
             
             if mrk_files:
                 # 使用第一个找到的MRK文件
-                mrk_file = str(mrk_files[0])
+                mrk_file = mrk_files[0]
                 logger.info(f"自动找到MRK文件: {mrk_file}")
                 if len(mrk_files) > 1:
                     logger.warning(f"找到多个MRK文件 ({len(mrk_files)}个)，使用第一个")
@@ -254,12 +282,15 @@ class OrthophotoPipeline:
         
         stats_config = self.orthophoto_config.get('statistics', {})
         stats_enabled = stats_config.get('enabled', True)
-        stats_interval = stats_config.get('output_interval', 50)
+        stats_interval = max(1, stats_config.get('output_interval', 50))
+        # 下一次输出统计的图片数，未启用时永远达不到，逐张只需一次比较
+        next_stats_at = stats_interval if stats_enabled else float('inf')
         
         total_images = image_reader.get_frame_count()
         
-        # 创建进度条
-        pbar = tqdm(total=total_images, desc="处理进度")
+        # 创建进度条（按批次累计后更新，避免逐张刷新）
+        pbar = tqdm(total=total_images, desc="处理进度", mininterval=0.5, miniters=self.batch_size)
+        progress = 0
         
         image_count = 0
         detection_count = 0
@@ -268,94 +299,177 @@ class OrthophotoPipeline:
         fps_image_count = 0
         current_fps = 0
         
+        # 循环内反复访问的属性和方法绑定到局部变量
+        read_image = image_reader.read
+        sync_pose = self.synchronizer.sync_frame_with_pose
+        submit_pending = self._submit_pending
+        finish_pending = self._finish_pending
+        update_pbar = pbar.update
+        visualizer = self.visualizer
+        batch_size = self.batch_size
+        
+        # 累积若干张图片后一次批量推理，未匹配位姿的图片不进入批次
+        pending = []
+        
+        # 异步推理：每个模型副本一个在途批次，再多一个批次在主线程做后处理，
+        # 结果按提交顺序取回
+        in_flight = deque()
+        max_in_flight = self.detector.num_replicas + 1
+        
         while True:
             # 读取图片
-            success, image, metadata = image_reader.read()
-            
-            if not success or image is None:
-                break
-            
-            frame_number = metadata['frame_number']
-            image_timestamp = metadata['timestamp']
-            filename = metadata['filename']
-            
-            # 调试：打印第一张图片的时间戳
-            if frame_number == 0:
-                from datetime import datetime, timezone
-                logger.info(f"【调试】第一张图片: {filename}")
-                logger.info(f"【调试】图片时间戳: {image_timestamp}ms = {datetime.fromtimestamp(image_timestamp/1000, tz=timezone.utc)}")
-                if self.mrk_parser and self.mrk_parser.pose_data:
-                    first_pose = self.mrk_parser.pose_data[0]
-                    logger.info(f"【调试】第一个GPS时间戳: {first_pose['timestamp']}ms = {datetime.fromtimestamp(first_pose['timestamp']/1000, tz=timezone.utc)}")
-                    logger.info(f"【调试】时间差: {abs(image_timestamp - first_pose['timestamp'])/1000}秒")
-            
-            # 同步位姿数据
-            pose = self.synchronizer.sync_frame_with_pose(image_timestamp, frame_number)
+            success, image, metadata = read_image()
+            end_of_images = not success or image is None
             
-            if pose is None:
-                logger.warning(f"图片 {filename} (索引{frame_number}) 未找到匹配的位姿数据，跳过")
-                pbar.update(1)
-                continue
-            
-            # YOLO检测（带边缘检测）
-            detections = self.detector.detect(
-                image,
-                return_type='corners',
-                check_edge=check_edge,
-                edge_threshold=edge_threshold
-            )
-            
-            # 统计边缘检测数量
-            for det in detections:
-                if det.get('is_on_edge', False):
-                    edge_detection_count += 1
-            
-            # 坐标转换
-            if detections:
-                detections = self.transformer.transform_detections(detections, pose)
-                detection_count += len(detections)
+            if end_of_images:
+                # 图片读完，提交剩余的不满一批的图片，并逐个取回在途批次
+                if pending:
+                    in_flight.append(submit_pending(pending, check_edge, edge_threshold))
+                    pending = []
+                if not in_flight:
+                    break
+            else:
+                frame_number = metadata['frame_number']
+                image_timestamp = metadata['timestamp']
+                filename = metadata['filename']
+                
+                # 调试：打印第一张图片的时间戳
+                if frame_number == 0:
+                    from datetime import datetime, timezone
+                    logger.info(f"【调试】第一张图片: {filename}")
+                    logger.info(f"【调试】图片时间戳: {image_timestamp}ms = {datetime.fromtimestamp(image_timestamp/1000, tz=timezone.utc)}")
+                    if self.mrk_parser and self.mrk_parser.pose_data:
+                        first_pose = self.mrk_parser.pose_data[0]
+                        logger.info(f"【调试】第一个GPS时间戳: {first_pose['timestamp']}ms = {datetime.fromtimestamp(first_pose['timestamp']/1000, tz=timezone.utc)}")
+                        logger.info(f"【调试】时间差: {abs(image_timestamp - first_pose['timestamp'])/1000}秒")
+                
+                # 同步位姿数据
+                pose = sync_pose(image_timestamp, frame_number)
+                
+                if pose is None:
+                    logger.warning("图片 {} (索引{}) 未找到匹配的位姿数据，跳过", filename, frame_number)
+                    progress += 1
+                    if progress >= batch_size:
+                        update_pbar(progress)
+                        progress = 0
+                    continue
+                
+                pending.append((image, pose, frame_number))
+                if len(pending) < batch_size:
+                    continue
+                
+                # YOLO检测（带边缘检测）
+                in_flight.append(submit_pending(pending, check_edge, edge_threshold))
+                pending = []
+                if len(in_flight) < max_in_flight:
+                    continue
             
-            # 保存结果
-            if detections:
-                self.report_gen.save(detections, image, pose, frame_number)
+            results = finish_pending(*in_flight.popleft())
             
-            # 可视化
-            if self.visualizer:
-                # 计算FPS
-                fps_image_count += 1
-                if fps_image_count % 10 == 0:
-                    elapsed = time.time() - fps_start_time
-                    current_fps = fps_image_count / elapsed if elapsed > 0 else 0
+            user_exit = False
+            for image, detections, pose, frame_number in results:
+                # 无目标的图片（航拍中占多数）不做边缘统计
+                if detections:
+                    edge_detection_count += sum(1 for det in detections if det.get('is_on_edge'))
+                    detection_count += len(detections)
                 
-                key = self.visualizer.show(image, detections, pose, frame_number, current_fps)
+                # 可视化
+                if visualizer:
+                    # 计算FPS
+                    fps_image_count += 1
+                    if fps_image_count % 10 == 0:
+                        elapsed = time.time() - fps_start_time
+                        current_fps = fps_image_count / elapsed if elapsed > 0 else 0
+                    
+                    key = visualizer.show(image, detections, pose, frame_number, current_fps)
+                    
+                    # 按ESC退出
+                    if key == 27:
+                        logger.info("用户按下ESC键，退出处理")
+                        user_exit = True
+                        break
                 
-                # 按ESC退出
-                if key == 27:
-                    logger.info("用户按下ESC键，退出处理")
-                    break
+                image_count += 1
+                progress += 1
+                
+                # 定期输出统计
+                if image_count >= next_stats_at:
+                    next_stats_at += stats_interval
+                    self._print_interim_stats(image_count, detection_count, edge_detection_count, current_fps)
             
-            image_count += 1
-            pbar.update(1)
+            update_pbar(progress)
+            progress = 0
             
-            # 定期输出统计
-            if stats_enabled and image_count % stats_interval == 0:
-                self._print_interim_stats(image_count, detection_count, edge_detection_count, current_fps)
+            if user_exit:
+                break
         
+        pbar.update(progress)
         pbar.close()
         
-        logger.info(f"共处理 {image_count} 张图片，检测到 {detection_count} 个目标，其中 {edge_detection_count} 个在边缘")
+        logger.info("共处理 {} 张图片，检测到 {} 个目标，其中 {} 个在边缘",
+                    image_count, detection_count, edge_detection_count)
+    
+    def _submit_pending(self, pending: list, check_edge: bool, edge_threshold: int) -> tuple:
+        """
+        提交累积图片的异步批量检测
+        
+        Args:
+            pending: (图片, 位姿, 帧号) 列表
+            check_edge: 是否检查边缘
+            edge_threshold: 边缘距离阈值
+            
+        Returns:
+            (pending, Future)，交给 _finish_pending 取回结果
+        """
+        future = self.detector.detect_batch_async(
+            [item[0] for item in pending], return_type='corners',
+            check_edge=check_edge, edge_threshold=edge_threshold
+        )
+        return pending, future
+    
+    def _finish_pending(self, pending: list, future) -> list:
+        """
+        等待批量检测完成，并完成坐标转换和保存
+        
+        Args:
+            pending: (图片, 位姿, 帧号) 列表
+            future: _submit_pending 返回的检测Future
+            
+        Returns:
+            (图片, 检测结果, 位姿, 帧号) 列表，顺序与输入一致
+        """
+        detections_list = future.result()
+        
+        # 整批一次性坐标转换，无目标的图片不参与转换和保存
+        hits = [i for i, detections in enumerate(detections_list) if detections]
+        if hits:
+            transformed = self.transformer.transform_detections_batch(
+                [(detections_list[i], pending[i][1]) for i in hits]
+            )
+            save = self.report_gen.save
+            for i, detections in zip(hits, transformed):
+                image, pose, frame_number = pending[i]
+                detections_list[i] = detections
+                save(detections, image, pose, frame_number)
+        
+        results = [
+            (image, detections, pose, frame_number)
+            for (image, pose, frame_number), detections in zip(pending, detections_list)
+        ]
+        
+        return results
     
     def _print_interim_stats(self, image_count: int, detection_count: int, edge_detection_count: int, fps: float):
         """打印中间统计信息"""
         avg_detections = detection_count / image_count if image_count > 0 else 0
         edge_ratio = (edge_detection_count / detection_count * 100) if detection_count > 0 else 0
         
-        logger.info(f"--- 处理进度 ---")
-        logger.info(f"已处理图片: {image_count}")
-        logger.info(f"检测总数: {detection_count}")
-        logger.info(f"边缘检测数: {edge_detection_count} ({edge_ratio:.1f}%)")
-        logger.info(f"平均每张检测数: {avg_detections:.2f}")
-        logger.info(f"处理速度: {fps:.2f} 图片/秒")
+        logger.info("--- 处理进度 ---")
+        logger.info("已处理图片: {}", image_count)
+        logger.info("检测总数: {}", detection_count)
+        logger.info("边缘检测数: {} ({:.1f}%)", edge_detection_count, edge_ratio)
+        logger.info("平均每张检测数: {:.2f}", avg_detections)
+        logger.info("处理速度: {:.2f} 图片/秒", fps)
     
     def _print_stats(self):
         """打印最终统计信息"""
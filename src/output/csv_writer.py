@@ -11,11 +11,21 @@ CSV输出模块
 
 import csv
 import os
+import threading
+import time
+import weakref
 from typing import List, Dict, Any
 from datetime import datetime
 from loguru import logger
 
 
+def _quote_field(field: str) -> str:
+    """按csv.QUOTE_MINIMAL规则为含分隔符、引号或换行的字段加引号"""
+    if ',' in field or '"' in field or '\n' in field or '\r' in field:
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
 class CSVWriter:
     """
     CSV写入器类
@@ -28,16 +38,27 @@ class CSVWriter:
     - drone_lat/lon: 无人机位置 (原始WGS84坐标，供参考)
     """
     
-    def __init__(self, output_path: str, write_mode: str = "overwrite"):
+    def __init__(
+        self,
+        output_path: str,
+        write_mode: str = "overwrite",
+        flush_rows: int = 256,
+        flush_interval: float = 1.0
+    ):
         """
         初始化CSV写入器
         
         Args:
             output_path: CSV文件输出路径
             write_mode: 写入模式 ("overwrite" 或 "append")
+            flush_rows: 累积多少行后批量写入文件
+            flush_interval: 距上次写入超过该秒数时即使未满也写入（便于实时模式查看结果）；
+                大于0时由后台线程定时检查，没有新记录到来时累积的行也会及时落盘
         """
         self.output_path = output_path
         self.write_mode = write_mode
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_interval
         
         # 确保输出目录存在
         output_dir = os.path.dirname(output_path)
@@ -80,9 +101,21 @@ class CSVWriter:
         self._init_file()
         
         self.write_count = 0
-        self._file_handle = None
-        self._csv_writer = None
+        self._fd = None
+        self._pending = []  # 待写入的行（按fieldnames顺序的元组）
+        self._lock = threading.RLock()  # 保护 _pending 和文件写入（定时线程与调用线程共用）
+        self._last_flush_time = time.monotonic()
         self._open_file_for_writing()
+        
+        # 定时写入线程
+        self._stop_timer = threading.Event()
+        if self.flush_interval > 0:
+            threading.Thread(
+                target=self._flush_timer_loop,
+                args=(weakref.ref(self), self._stop_timer, self.flush_interval),
+                name='csv-flush',
+                daemon=True
+            ).start()
     
     def _init_file(self):
         """初始化CSV文件"""
@@ -98,14 +131,13 @@ class CSVWriter:
                 logger.error(f"初始化CSV文件失败: {e}")
     
     def _open_file_for_writing(self):
-        """打开文件用于持续写入"""
+        """以追加模式打开原始文件描述符，批量写入预先格式化的字节"""
         try:
-            self._file_handle = open(self.output_path, 'a', newline='', encoding='utf-8', buffering=1)
-            self._csv_writer = csv.DictWriter(self._file_handle, fieldnames=self.fieldnames)
+            flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+            self._fd = os.open(self.output_path, flags, 0o644)
         except Exception as e:
             logger.error(f"打开CSV文件失败: {e}")
-            self._file_handle = None
-            self._csv_writer = None
+            self._fd = None
     
     def write(
         self,
@@ -124,80 +156,168 @@ class CSVWriter:
             image_path: 图像路径
         """
         try:
-            # 准备数据行
-            row = {
-                'timestamp': pose.get('timestamp', 0),
-                'frame_number': frame_number,
-                'datetime': pose.get('datetime', datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]),
-                'track_id': detection.get('track_id', ''),
-                'class_id': detection.get('class_id', -1),
-                'class_name': detection.get('class_name', 'unknown'),
-                'confidence': detection.get('confidence', 0.0),
-                'altitude': pose.get('altitude', 0.0),
-                'drone_lat': pose.get('latitude', 0.0),
-                'drone_lon': pose.get('longitude', 0.0),
-                'image_path': image_path
-            }
-            
-            # 添加四角点坐标
-            geo_coords = detection.get('geo_coords', [])
-            if len(geo_coords) >= 4:
-                row['corner1_lat'] = geo_coords[0][0]
-                row['corner1_lon'] = geo_coords[0][1]
-                row['corner2_lat'] = geo_coords[1][0]
-                row['corner2_lon'] = geo_coords[1][1]
-                row['corner3_lat'] = geo_coords[2][0]
-                row['corner3_lon'] = geo_coords[2][1]
-                row['corner4_lat'] = geo_coords[3][0]
-                row['corner4_lon'] = geo_coords[3][1]
-            else:
-                row['corner1_lat'] = row['corner1_lon'] = 0
-                row['corner2_lat'] = row['corner2_lon'] = 0
-                row['corner3_lat'] = row['corner3_lon'] = 0
-                row['corner4_lat'] = row['corner4_lon'] = 0
-            
-            # 添加中心点坐标
-            center_geo = detection.get('center_geo', (0, 0))
-            row['center_lat'] = center_geo[0]
-            row['center_lon'] = center_geo[1]
-            
-            # 添加边缘标记信息
-            row['is_on_edge'] = detection.get('is_on_edge', False)
-            edge_positions = detection.get('edge_positions', [])
-            row['edge_positions'] = ','.join(edge_positions) if edge_positions else ''
-            
-            # 添加GPS质量信息（增强版转换器）
-            quality_info = detection.get('quality_info', {})
-            if quality_info:
-                row['gps_quality'] = quality_info.get('quality_level', '')
-                row['positioning_state'] = quality_info.get('positioning_state', '')
-                row['gps_level'] = quality_info.get('gps_level', 0)
-                row['satellite_count'] = quality_info.get('satellite_count', 0)
-            else:
-                row['gps_quality'] = ''
-                row['positioning_state'] = ''
-                row['gps_level'] = 0
-                row['satellite_count'] = 0
-            
-            # 添加误差估算（增强版转换器）
-            row['estimated_error'] = detection.get('estimated_error', 0.0)
-            
-            # 写入文件（使用持久化的文件句柄）
-            if self._csv_writer is not None:
-                self._csv_writer.writerow(row)
-                self._file_handle.flush()  # 立即刷新到磁盘
+            pose_head, pose_tail = self._pose_fields(pose)
+            row = self._build_row(detection, frame_number, image_path, pose_head, pose_tail)
+            with self._lock:
+                self._pending.append(row)
                 self.write_count += 1
-            else:
-                logger.warning("CSV写入器未正确初始化，尝试重新打开文件")
-                self._open_file_for_writing()
-                if self._csv_writer is not None:
-                    self._csv_writer.writerow(row)
-                    self._file_handle.flush()
-                    self.write_count += 1
+                self._maybe_flush()
             
         except Exception as e:
             logger.error(f"写入CSV记录失败: {e}")
     
+    @staticmethod
+    def _pose_fields(pose: Dict[str, Any]) -> tuple:
+        """
+        提取一帧内所有检测共用的位姿字段
+        
+        Returns:
+            ((timestamp, datetime), (altitude, drone_lat, drone_lon))
+        """
+        datetime_str = pose['datetime'] if 'datetime' in pose else \
+            datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        
+        return (
+            (pose.get('timestamp', 0), datetime_str),
+            (pose.get('altitude', 0.0), pose.get('latitude', 0.0), pose.get('longitude', 0.0)),
+        )
+    
+    @staticmethod
+    def _build_row(
+        detection: Dict[str, Any],
+        frame_number: int,
+        image_path: str,
+        pose_head: tuple,
+        pose_tail: tuple
+    ) -> tuple:
+        """按fieldnames顺序直接构建元组，省去DictWriter逐行的字典转换"""
+        # 四角点坐标
+        geo_coords = detection.get('geo_coords', [])
+        if len(geo_coords) >= 4:
+            corners = (
+                geo_coords[0][0], geo_coords[0][1],
+                geo_coords[1][0], geo_coords[1][1],
+                geo_coords[2][0], geo_coords[2][1],
+                geo_coords[3][0], geo_coords[3][1],
+            )
+        else:
+            corners = (0, 0, 0, 0, 0, 0, 0, 0)
+        
+        # 中心点坐标
+        center_geo = detection.get('center_geo', (0, 0))
+        
+        # 边缘标记信息
+        edge_positions = detection.get('edge_positions', [])
+        
+        # GPS质量信息（增强版转换器）
+        quality_info = detection.get('quality_info', {})
+        if quality_info:
+            quality = (
+                quality_info.get('quality_level', ''),
+                quality_info.get('positioning_state', ''),
+            )
+            gps_level = quality_info.get('gps_level', 0)
+            satellite_count = quality_info.get('satellite_count', 0)
+        else:
+            quality = ('', '')
+            gps_level = 0
+            satellite_count = 0
+        
+        timestamp, datetime_str = pose_head
+        
+        return (
+            timestamp,
+            frame_number,
+            datetime_str,
+            detection.get('track_id', ''),
+            detection.get('class_id', -1),
+            detection.get('class_name', 'unknown'),
+            detection.get('confidence', 0.0),
+            *corners,
+            center_geo[0],
+            center_geo[1],
+            *pose_tail,
+            detection.get('is_on_edge', False),
+            ','.join(edge_positions) if edge_positions else '',
+            image_path,
+            *quality,
+            detection.get('estimated_error', 0.0),  # 误差估算（增强版转换器）
+            gps_level,
+            satellite_count,
+        )
+    
+    @staticmethod
+    def _flush_timer_loop(writer_ref, stop_event: threading.Event, interval: float):
+        """
+        定时写入线程：每隔 interval 秒写入超时未落盘的行
+        
+        只持有写入器的弱引用，写入器被回收或关闭后线程退出。
+        
+        Args:
+            writer_ref: CSVWriter的弱引用
+            stop_event: 停止事件
+            interval: 检查间隔（秒）
+        """
+        while not stop_event.wait(interval):
+            writer = writer_ref()
+            if writer is None:
+                return
+            try:
+                with writer._lock:
+                    if writer._pending and time.monotonic() - writer._last_flush_time >= interval:
+                        writer.flush()
+            except Exception as e:
+                logger.error(f"定时写入CSV记录失败: {e}")
+            del writer
+    
+    def _maybe_flush(self):
+        """攒够一批或距上次写入过久时批量写入"""
+        if (len(self._pending) >= self.flush_rows
+                or time.monotonic() - self._last_flush_time >= self.flush_interval):
+            self.flush()
+    
+    def _format_rows(self) -> bytes:
+        """
+        将累积的行格式化为CSV字节（与csv.writer默认方言的输出一致）
+        
+        绝大多数行不含需要转义的字段，直接拼接后校验分隔符数量，
+        仅在校验不通过时逐字段加引号。
+        """
+        separators = len(self.fieldnames) - 1
+        lines = []
+        for row in self._pending:
+            fields = ['' if value is None else str(value) for value in row]
+            line = ','.join(fields)
+            if line.count(',') != separators or '"' in line or '\n' in line or '\r' in line:
+                line = ','.join([_quote_field(field) for field in fields])
+            lines.append(line)
+        lines.append('')
+        return '\r\n'.join(lines).encode('utf-8')
+    
+    def flush(self):
+        """将累积的行批量写入文件"""
+        with self._lock:
+            self._flush_pending()
+    
+    def _flush_pending(self):
+        """写入累积的行（调用方持有 _lock）"""
+        if self._pending:
+            if self._fd is None:
+                logger.warning("CSV写入器未正确初始化，尝试重新打开文件")
+                self._open_file_for_writing()
+            
+            if self._fd is not None:
+                try:
+                    data = memoryview(self._format_rows())
+                    while data:
+                        written = os.write(self._fd, data)
+                        data = data[written:]
+                except Exception as e:
+                    logger.error(f"写入CSV记录失败: {e}")
+            self._pending.clear()
+        
+        self._last_flush_time = time.monotonic()
+    
     def write_batch(
         self,
         detections: List[Dict[str, Any]],
@@ -217,9 +337,27 @@ class CSVWriter:
         if image_paths is None:
             image_paths = [""] * len(detections)
         
+        # 同一帧的位姿字段只提取一次
+        try:
+            pose_head, pose_tail = self._pose_fields(pose)
+        except Exception as e:
+            logger.error(f"写入CSV记录失败: {e}")
+            return
+        
+        rows = []
         for i, detection in enumerate(detections):
             image_path = image_paths[i] if i < len(image_paths) else ""
-            self.write(detection, pose, frame_number, image_path)
+            try:
+                rows.append(
+                    self._build_row(detection, frame_number, image_path, pose_head, pose_tail)
+                )
+            except Exception as e:
+                logger.error(f"写入CSV记录失败: {e}")
+        
+        with self._lock:
+            self._pending.extend(rows)
+            self.write_count += len(rows)
+            self._maybe_flush()
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -237,11 +375,13 @@ class CSVWriter:
     def close(self):
         """关闭CSV写入器，释放文件句柄"""
         try:
-            if self._file_handle is not None:
-                self._file_handle.flush()
-                self._file_handle.close()
-                self._file_handle = None
-                self._csv_writer = None
+            self._stop_timer.set()
+            with self._lock:
+                if self._fd is None:
+                    return
+                self._flush_pending()
+                os.close(self._fd)
+                self._fd = None
                 logger.info(f"CSV文件已关闭: {self.output_path}, 共写入 {self.write_count} 条记录")
         except Exception as e:
             logger.error(f"关闭CSV文件失败: {e}")
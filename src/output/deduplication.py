@@ -8,12 +8,117 @@
 3. 保留最佳检测（每组选择评分最高的）
 """
 
-import math
 import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Tuple
 from loguru import logger
 
+try:
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+    logger.warning("scipy库未安装，去重分组将使用numpy实现（较慢）。建议安装: pip install scipy>=1.9.0")
+
+from . import distance_kernel
+from .distance_kernel import EARTH_RADIUS
+
+
+def _haversine_vector(
+    lat: float,
+    lon: float,
+    cos_lat: float,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    cos_lats: np.ndarray
+) -> np.ndarray:
+    """
+    一个点到一组点的Haversine地面距离（米），公式同 _haversine_distance
+    （Numba不可用时代替 distance_kernel.haversine_pairs）
+    
+    Args:
+        lat, lon: 查询点的纬度、经度（弧度），也可以是与目标点逐个对应的数组
+        cos_lat: 查询点纬度的余弦
+        lats, lons: 目标点的纬度、经度数组（弧度）
+        cos_lats: 目标点纬度的余弦数组
+        
+    Returns:
+        距离数组（米）
+    """
+    a = (np.sin((lats - lat) / 2) ** 2 +
+         cos_lat * cos_lats * np.sin((lons - lon) / 2) ** 2)
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _query_pairs(xyz: np.ndarray, radius: float) -> np.ndarray:
+    """
+    查找欧氏距离 <= radius 的所有点对（i < j）
+    
+    优先使用scipy的k-d树；scipy不可用时按z坐标排序，逐点只比较z差不超过radius的窗口。
+    
+    Args:
+        xyz: 点坐标数组 (N, 3)
+        radius: 距离上限
+        
+    Returns:
+        点对下标数组 (M, 2)
+    """
+    if SCIPY_AVAILABLE:
+        return cKDTree(xyz).query_pairs(radius, output_type='ndarray')
+    
+    order = np.argsort(xyz[:, 2], kind='stable')
+    sorted_xyz = xyz[order]
+    upper = np.searchsorted(sorted_xyz[:, 2], sorted_xyz[:, 2] + radius, side='right')
+    
+    firsts = []
+    seconds = []
+    for i in range(len(order)):
+        window = sorted_xyz[i + 1:upper[i]]
+        if len(window):
+            close = np.flatnonzero(((window - sorted_xyz[i]) ** 2).sum(axis=1) <= radius * radius)
+            firsts.append(np.full(len(close), i, dtype=np.int64))
+            seconds.append(close + i + 1)
+    
+    if not firsts:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = order[np.column_stack((np.concatenate(firsts), np.concatenate(seconds)))]
+    return np.sort(pairs, axis=1)
+
+
+def _connected_labels(count: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """
+    求无向图的连通分量
+    
+    优先使用scipy.sparse.csgraph；scipy不可用时迭代传播最小下标（每轮再做一次指针跳跃），
+    收敛后每个分量的标签为其中最小的下标。
+    
+    Args:
+        count: 节点数
+        first, second: 边的两个端点数组
+        
+    Returns:
+        每个节点的分量标签（同一分量标签相同）
+    """
+    if SCIPY_AVAILABLE:
+        graph = coo_matrix(
+            (np.ones(len(first), dtype=np.int8), (first, second)),
+            shape=(count, count)
+        )
+        return connected_components(graph, directed=False)[1]
+    
+    labels = np.arange(count)
+    while True:
+        low = np.minimum(labels[first], labels[second])
+        updated = labels.copy()
+        np.minimum.at(updated, first, low)
+        np.minimum.at(updated, second, low)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
 
 class DetectionDeduplicator:
     """检测结果去重器"""
@@ -76,18 +181,23 @@ class DetectionDeduplicator:
         
         logger.info(f"开始去重: {len(df)} 条记录")
         
-        # 转换为字典列表
-        detections = df.to_dict('records')
+        # 整列向量化计算质量评分，不再逐行转换为字典
+        scores = self._calculate_quality_scores(df)
+        positions = np.arange(len(df))
         
-        # 添加索引（用于追溯原始行）
-        for i, det in enumerate(detections):
-            det['_original_index'] = i
+        # 过滤低质量检测
+        if self.min_quality_score > 0:
+            positions = positions[scores >= self.min_quality_score]
+            logger.info(f"质量过滤后: {len(positions)} 条")
         
-        # 执行去重
-        unique_detections = self.deduplicate(detections)
+        # 按空间距离分组
+        group_ids = self._assign_groups(
+            df['center_lat'].to_numpy(dtype=np.float64)[positions],
+            df['center_lon'].to_numpy(dtype=np.float64)[positions]
+        )
         
-        # 提取保留的索引
-        unique_indices = [det['_original_index'] for det in unique_detections]
+        # 每组保留质量评分最高的，按组号顺序输出
+        unique_indices = positions[self._best_per_group(scores[positions], group_ids)]
         
         # 返回去重后的DataFrame
         df_unique = df.iloc[unique_indices].reset_index(drop=True)
@@ -112,28 +222,43 @@ class DetectionDeduplicator:
             return []
         
         # 步骤1：计算质量评分
-        for det in detections:
-            det['_quality_score'] = self._calculate_quality_score(det)
+        scores = np.array([self._calculate_quality_score(det) for det in detections], dtype=np.float64)
+        positions = np.arange(len(detections))
         
         # 步骤2：过滤低质量检测
         if self.min_quality_score > 0:
-            detections = [det for det in detections 
-                         if det['_quality_score'] >= self.min_quality_score]
-            logger.info(f"质量过滤后: {len(detections)} 条")
+            positions = positions[scores >= self.min_quality_score]
+            logger.info(f"质量过滤后: {len(positions)} 条")
         
         # 步骤3：按空间距离分组
-        groups = self._group_by_distance(detections)
-        logger.info(f"空间分组: 发现 {len(groups)} 个位置聚类")
+        group_ids = self._assign_groups(
+            np.array([detections[i].get('center_lat', 0.0) for i in positions], dtype=np.float64),
+            np.array([detections[i].get('center_lon', 0.0) for i in positions], dtype=np.float64)
+        )
         
         # 步骤4：每组保留质量评分最高的
-        unique_detections = []
-        for group in groups:
-            best_detection = max(group, key=lambda x: x['_quality_score'])
-            # 移除临时字段
-            best_detection.pop('_quality_score', None)
-            unique_detections.append(best_detection)
-        
-        return unique_detections
+        best = self._best_per_group(scores[positions], group_ids)
+        return [detections[i] for i in positions[best]]
+    
+    def _best_per_group(self, scores: np.ndarray, group_ids: np.ndarray) -> np.ndarray:
+        """
+        选出每组质量评分最高的检测（同分取靠前的）
+        
+        Args:
+            scores: 质量评分数组
+            group_ids: 组号数组（按各组第一个检测出现的顺序编号）
+            
+        Returns:
+            各组最佳检测的下标，按组号排列
+        """
+        group_count = int(group_ids.max()) + 1 if len(group_ids) else 0
+        logger.info(f"空间分组: 发现 {group_count} 个位置聚类")
+        
+        order = np.lexsort((-scores, group_ids))
+        sorted_ids = group_ids[order]
+        first_in_group = np.ones(len(order), dtype=bool)
+        first_in_group[1:] = sorted_ids[1:] != sorted_ids[:-1]
+        return order[first_in_group]
     
     def _calculate_quality_score(self, detection: Dict[str, Any]) -> float:
         """
@@ -175,14 +300,40 @@ class DetectionDeduplicator:
         
         return score
     
-    def _group_by_distance(self, detections: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    def _calculate_quality_scores(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        向量化计算整个DataFrame的质量评分（规则同 _calculate_quality_score）
+        
+        Args:
+            df: 包含检测结果的DataFrame
+            
+        Returns:
+            每行的质量评分数组
         """
-        按空间距离对检测进行分组
+        # 基础评分：置信度
+        scores = df['confidence'].to_numpy(dtype=np.float64, copy=True)
+        
+        # 因素1：边缘惩罚
+        if self.prefer_non_edge and 'is_on_edge' in df.columns:
+            scores[df['is_on_edge'].to_numpy().astype(bool)] *= self.edge_penalty
+        
+        # 因素2：GPS质量加成（缺列按MEDIUM，未知等级按1.0）
+        if self.prefer_rtk:
+            if 'gps_quality' in df.columns:
+                scores *= df['gps_quality'].map(self.gps_quality_weights).fillna(1.0).to_numpy(dtype=np.float64)
+            else:
+                scores *= self.gps_quality_weights.get('MEDIUM', 1.0)
+        
+        # 因素3：定位误差惩罚
+        if 'estimated_error' in df.columns:
+            estimated_error = df['estimated_error'].to_numpy(dtype=np.float64)
+            scores *= np.where(estimated_error > 10.0, 0.8, np.where(estimated_error > 5.0, 0.9, 1.0))
         
-        使用贪心聚类算法：
-        1. 遍历所有检测
-        2. 对于每个检测，找到距离最近的已有组
-        3. 如果距离 < threshold，加入该组；否则创建新组
+        return scores
+    
+    def _group_by_distance(self, detections: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        按空间距离对检测进行分组（分组规则见 _assign_groups）
         
         Args:
             detections: 检测结果列表
@@ -193,38 +344,73 @@ class DetectionDeduplicator:
         if not detections:
             return []
         
-        groups = []
+        group_ids = self._assign_groups(
+            np.array([det.get('center_lat', 0.0) for det in detections], dtype=np.float64),
+            np.array([det.get('center_lon', 0.0) for det in detections], dtype=np.float64)
+        )
         
-        for detection in detections:
-            lat = detection.get('center_lat', 0.0)
-            lon = detection.get('center_lon', 0.0)
-            
-            # 查找是否有相近的组
-            found_group = False
-            for group in groups:
-                # 计算与组中任一成员的距离
-                for member in group:
-                    member_lat = member.get('center_lat', 0.0)
-                    member_lon = member.get('center_lon', 0.0)
-                    
-                    distance = self._haversine_distance(
-                        lat, lon, member_lat, member_lon
-                    )
-                    
-                    if distance < self.distance_threshold:
-                        group.append(detection)
-                        found_group = True
-                        break
-                
-                if found_group:
-                    break
-            
-            # 如果没有找到相近的组，创建新组
-            if not found_group:
-                groups.append([detection])
+        groups = [[] for _ in range(int(group_ids.max()) + 1)]
+        for detection, group_id in zip(detections, group_ids):
+            groups[group_id].append(detection)
         
         return groups
     
+    def _assign_groups(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        按空间距离为检测分配组号
+        
+        距离 < threshold 的两个检测视为相连，相连关系传递（单链接聚类）：
+        经由中间检测相连的检测归入同一组，分组结果与遍历顺序无关。
+        
+        近邻候选由单位球面坐标上的 k-d 树一次性查出（弦长与球面距离单调对应，见 _query_pairs），
+        再用Haversine精确过滤，最后按连通分量分组。
+        
+        Args:
+            lats: 中心点纬度数组（度）
+            lons: 中心点经度数组（度）
+            
+        Returns:
+            每个检测的组号数组，按各组第一个检测出现的顺序编号
+        """
+        count = len(lats)
+        if count == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        lats = np.radians(lats)
+        lons = np.radians(lons)
+        cos_lats = np.cos(lats)
+        
+        # 坐标缺失的检测与任何检测都不相近，不进入k-d树
+        finite = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        
+        # 距离阈值对应的单位球弦长，略放大以免浮点误差漏掉边界上的近邻
+        half_angle = min(max(self.distance_threshold, 0.0) / (2 * EARTH_RADIUS), np.pi / 2)
+        radius = 2 * np.sin(half_angle) * (1 + 1e-6)
+        xyz = np.column_stack((
+            cos_lats[finite] * np.cos(lons[finite]),
+            cos_lats[finite] * np.sin(lons[finite]),
+            np.sin(lats[finite])
+        ))
+        pairs = finite[_query_pairs(xyz, radius)]
+        
+        first = pairs[:, 0]
+        second = pairs[:, 1]
+        haversine = distance_kernel.haversine_pairs if distance_kernel.NUMBA_AVAILABLE else _haversine_vector
+        distances = haversine(
+            lats[first], lons[first], cos_lats[first],
+            lats[second], lons[second], cos_lats[second]
+        )
+        near = distances < self.distance_threshold
+        
+        # 相近的检测对构成无向图，每个连通分量为一组
+        labels = _connected_labels(count, first[near], second[near])
+        
+        # 按各组第一个检测出现的顺序重新编号，使输出顺序稳定
+        _, first_index, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        relabel = np.empty(len(first_index), dtype=np.int64)
+        relabel[np.argsort(first_index)] = np.arange(len(first_index))
+        return relabel[inverse.ravel()]
+    
     def _haversine_distance(
         self, 
         lat1: float, 
@@ -243,24 +429,7 @@ class DetectionDeduplicator:
         Returns:
             距离（米）
         """
-        # 地球半径（米）
-        R = 6371000
-        
-        # 转换为弧度
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
-        
-        # Haversine公式
-        a = (math.sin(delta_lat / 2) ** 2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * 
-             math.sin(delta_lon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        distance = R * c
-        
-        return distance
+        return distance_kernel.haversine_m(lat1, lon1, lat2, lon2)
     
     def get_deduplication_stats(
         self, 
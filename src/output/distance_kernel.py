@@ -0,0 +1,74 @@
+"""
+去重距离计算内核 (Numba加速)
+Haversine地面距离的标量版本和逐对批量版本
+
+公式与 DetectionDeduplicator._haversine_distance 相同。未启用fastmath：
+坐标中可能含NaN，fastmath假设输入有限，会改变NaN的比较结果。
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba不可用时的占位装饰器（保持纯Python可执行）"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# 地球半径（米）
+EARTH_RADIUS = 6371000.0
+
+
+@njit(cache=True)
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    两个GPS坐标之间的地面距离（米）
+
+    Args:
+        lat1, lon1: 第一个点的纬度、经度（度）
+        lat2, lon2: 第二个点的纬度、经度（度）
+
+    Returns:
+        距离（米）
+    """
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    delta_lat = math.radians(lat2 - lat1)
+    delta_lon = math.radians(lon2 - lon1)
+
+    a = (math.sin(delta_lat / 2) ** 2 +
+         math.cos(lat1_rad) * math.cos(lat2_rad) *
+         math.sin(delta_lon / 2) ** 2)
+    return EARTH_RADIUS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+@njit(cache=True)
+def haversine_pairs(lats_a, lons_a, cos_a, lats_b, lons_b, cos_b):
+    """
+    逐对计算两组点之间的地面距离（米）
+
+    Args:
+        lats_a, lons_a: 第一组点的纬度、经度（弧度）
+        cos_a: 第一组点纬度的余弦
+        lats_b, lons_b: 第二组点的纬度、经度（弧度），与第一组逐个对应
+        cos_b: 第二组点纬度的余弦
+
+    Returns:
+        距离数组（米）
+    """
+    count = lats_a.shape[0]
+    distances = np.empty(count, dtype=np.float64)
+    for i in range(count):
+        sin_lat = math.sin((lats_b[i] - lats_a[i]) / 2)
+        sin_lon = math.sin((lons_b[i] - lons_a[i]) / 2)
+        a = sin_lat * sin_lat + cos_a[i] * cos_b[i] * sin_lon * sin_lon
+        distances[i] = EARTH_RADIUS * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return distances
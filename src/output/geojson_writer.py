@@ -14,6 +14,71 @@ from typing import Dict, List, Any
 import pandas as pd
 from loguru import logger
 
+from .paths import ensure_dir
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# 检测框四角点列（经度在前，符合GeoJSON坐标顺序）
+CORNER_COLUMNS = [
+    'corner1_lon', 'corner1_lat',
+    'corner2_lon', 'corner2_lat',
+    'corner3_lon', 'corner3_lat',
+    'corner4_lon', 'corner4_lat',
+]
+
+# 坐标列（取整时保留 coord_precision 位小数）
+COORDINATE_COLUMNS = CORNER_COLUMNS + ['center_lat', 'center_lon', 'drone_lat', 'drone_lon']
+
+# 取整时其他数值列保留的小数位数
+VALUE_DECIMALS = {
+    'confidence': 3,
+    'altitude': 2,
+    'estimated_error': 2,
+}
+
+# 坐标系定义：CGCS2000
+CRS = {
+    "type": "name",
+    "properties": {
+        "name": "urn:ogc:def:crs:EPSG::4490"
+    }
+}
+
+# 必需列标记（缺少该列时记录无效）
+_REQUIRED = object()
+
+# Feature属性：(列名, 类型转换, 缺列时的默认值)
+PROPERTY_FIELDS = [
+    ('frame_number', int, _REQUIRED),
+    ('timestamp', float, 0),
+    ('datetime', str, ''),
+    ('class_id', int, _REQUIRED),
+    ('class_name', str, _REQUIRED),
+    ('confidence', float, _REQUIRED),
+    ('center_lat', float, _REQUIRED),
+    ('center_lon', float, _REQUIRED),
+    ('altitude', float, _REQUIRED),
+    ('drone_lat', float, _REQUIRED),
+    ('drone_lon', float, _REQUIRED),
+    ('is_on_edge', bool, False),
+    ('edge_positions', str, ''),
+    ('image_path', str, ''),
+]
+
+# GPS质量等可选属性：(列名, 类型转换)，缺列或值为空时不输出
+OPTIONAL_PROPERTY_FIELDS = [
+    ('gps_quality', str),
+    ('positioning_state', str),
+    ('estimated_error', float),
+    ('gps_level', int),
+    ('satellite_count', int),
+]
+
 
 class GeoJSONWriter:
     """GeoJSON写入器类"""
@@ -37,8 +102,15 @@ class GeoJSONWriter:
         # 类别过滤（None表示不过滤）
         self.class_filter = config.get('geojson_class_filter', None)
         
+        # 按行输出（每行一个Feature的 .geojsonl 文件，元数据写入同名 .meta.json）
+        self.line_delimited = config.get('geojson_line_delimited', False)
+        self.extension = '.geojsonl' if self.line_delimited else '.geojson'
+        
+        # 坐标保留的小数位数（None表示保持原始精度；6位约0.1米，7位约1厘米）
+        self.coord_precision = config.get('geojson_coord_precision', None)
+        
         # 确保输出目录存在
-        os.makedirs(self.output_dir, exist_ok=True)
+        ensure_dir(self.output_dir)
         
         logger.info(f"GeoJSON写入器初始化: 输出目录={self.output_dir}")
     
@@ -80,13 +152,13 @@ class GeoJSONWriter:
         if output_dir is None:
             output_dir = self.output_dir
         else:
-            os.makedirs(output_dir, exist_ok=True)
+            ensure_dir(output_dir)
         
         results = {}
         
         try:
             # 1. 导出原始完整数据
-            raw_path = os.path.join(output_dir, 'detections_raw.geojson')
+            raw_path = os.path.join(output_dir, 'detections_raw' + self.extension)
             count_raw = self._export_dataframe(
                 df_raw, 
                 raw_path, 
@@ -96,7 +168,7 @@ class GeoJSONWriter:
             logger.info(f"✓ 导出原始GeoJSON: {raw_path} ({count_raw}条)")
             
             # 2. 导出去重后数据
-            unique_path = os.path.join(output_dir, 'detections_unique.geojson')
+            unique_path = os.path.join(output_dir, 'detections_unique' + self.extension)
             count_unique = self._export_dataframe(
                 df_unique, 
                 unique_path, 
@@ -106,7 +178,7 @@ class GeoJSONWriter:
             logger.info(f"✓ 导出去重GeoJSON: {unique_path} ({count_unique}条)")
             
             # 3. 导出高置信度数据（基于去重后的数据）
-            high_conf_path = os.path.join(output_dir, 'detections_high_conf.geojson')
+            high_conf_path = os.path.join(output_dir, 'detections_high_conf' + self.extension)
             count_high = self._export_dataframe(
                 df_unique, 
                 high_conf_path, 
@@ -140,8 +212,49 @@ class GeoJSONWriter:
         Returns:
             导出的记录数
         """
-        # 过滤数据
-        filtered_df = df.copy()
+        filtered_df = self._filter_dataframe(df, min_confidence, class_filter)
+        if self.coord_precision is not None:
+            filtered_df = self._quantize(filtered_df, self.coord_precision)
+        
+        if self.line_delimited:
+            return self._write_line_delimited(filtered_df, output_path, CRS, min_confidence)
+        
+        # 逐条生成Feature并直接写入文件，不在内存中保留完整的features列表；
+        # 每个Feature单独序列化后缩进到所在层级，文件内容与整体序列化一致
+        header = self._dumps({"type": "FeatureCollection", "crs": CRS})
+        feature_count = 0
+        
+        with open(output_path, 'wb') as f:
+            # 去掉结尾的 "\n}"，接上features数组
+            f.write(header[:-2] + b',\n  "features": [')
+            
+            for feature in self._iter_features(filtered_df):
+                try:
+                    data = self._dumps(feature)
+                except Exception as e:
+                    logger.warning(f"跳过无效记录 (frame {feature['properties'].get('frame_number', '?')}): {e}")
+                    continue
+                
+                f.write(b',\n    ' if feature_count else b'\n    ')
+                f.write(data.replace(b'\n', b'\n    '))
+                feature_count += 1
+            
+            f.write(b'\n  ]' if feature_count else b']')
+            
+            footer = self._dumps({"properties": self._collection_properties(feature_count, min_confidence)})
+            # 去掉开头的 "{"，接在features数组之后
+            f.write(b',' + footer[1:])
+        
+        return feature_count
+    
+    @staticmethod
+    def _filter_dataframe(
+        df: pd.DataFrame,
+        min_confidence: float = 0.0,
+        class_filter: List[str] = None
+    ) -> pd.DataFrame:
+        """按置信度阈值和类别过滤数据（布尔索引已生成新的数据框，无需预先复制）"""
+        filtered_df = df
         
         if min_confidence > 0:
             filtered_df = filtered_df[filtered_df['confidence'] >= min_confidence]
@@ -149,105 +262,252 @@ class GeoJSONWriter:
         if class_filter:
             filtered_df = filtered_df[filtered_df['class_name'].isin(class_filter)]
         
-        # 转换为GeoJSON Features
-        features = []
-        for _, row in filtered_df.iterrows():
-            try:
-                feature = self._detection_to_feature(row)
-                features.append(feature)
-            except Exception as e:
-                logger.warning(f"跳过无效记录 (frame {row.get('frame_number', '?')}): {e}")
+        return filtered_df
+    
+    @staticmethod
+    def _quantize(df: pd.DataFrame, coord_precision: int) -> pd.DataFrame:
+        """
+        按列对坐标和数值属性取整，减少序列化后的字节数（非数值列保持不变）
         
-        # 构建FeatureCollection
-        geojson = {
+        Args:
+            df: 数据框
+            coord_precision: 坐标保留的小数位数
+            
+        Returns:
+            取整后的数据框
+        """
+        decimals = {column: coord_precision for column in COORDINATE_COLUMNS}
+        decimals.update(VALUE_DECIMALS)
+        return df.round(decimals)
+    
+    def build_feature_collection(
+        self,
+        df: pd.DataFrame,
+        min_confidence: float = None,
+        coord_precision: int = None
+    ) -> tuple:
+        """
+        在内存中构建FeatureCollection（内容与 export_multiple 导出的文件一致）
+        
+        Args:
+            df: 数据框
+            min_confidence: 最小置信度阈值（默认使用配置的 geojson_min_confidence）
+            coord_precision: 坐标保留的小数位数（默认使用配置的 geojson_coord_precision）
+            
+        Returns:
+            (FeatureCollection字典, 过滤后的数据框)
+        """
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        if coord_precision is None:
+            coord_precision = self.coord_precision
+        
+        filtered_df = self._filter_dataframe(df, min_confidence)
+        feature_df = filtered_df
+        if coord_precision is not None:
+            feature_df = self._quantize(filtered_df, coord_precision)
+        features = list(self._iter_features(feature_df))
+        
+        collection = {
             "type": "FeatureCollection",
-            "crs": {
-                "type": "name",
-                "properties": {
-                    "name": "urn:ogc:def:crs:EPSG::4490"  # CGCS2000坐标系
-                }
-            },
+            "crs": CRS,
             "features": features,
-            "properties": {
-                "total_detections": len(features),
-                "source": "石马河四乱检测系统",
-                "coordinate_system": "CGCS2000",
-                "coordinate_note": "已从WGS84（无人机GPS）转换为CGCS2000（国家标准）",
-                "epsg_code": "EPSG:4490",
-                "min_confidence": min_confidence
-            }
+            "properties": self._collection_properties(len(features), min_confidence)
+        }
+        return collection, filtered_df
+    
+    def _write_line_delimited(
+        self,
+        df: pd.DataFrame,
+        output_path: str,
+        crs: Dict[str, Any],
+        min_confidence: float
+    ) -> int:
+        """
+        按行写入Feature（每行一个紧凑JSON，不含FeatureCollection外层），
+        坐标系和统计信息写入同名 .meta.json
+        
+        Args:
+            df: 过滤后的数据框
+            output_path: 输出文件路径
+            crs: 坐标系定义
+            min_confidence: 最小置信度阈值
+            
+        Returns:
+            导出的记录数
+        """
+        feature_count = 0
+        
+        with open(output_path, 'wb') as f:
+            for feature in self._iter_features(df):
+                try:
+                    data = self._dumps(feature, indent=False)
+                except Exception as e:
+                    logger.warning(f"跳过无效记录 (frame {feature['properties'].get('frame_number', '?')}): {e}")
+                    continue
+                
+                f.write(data)
+                f.write(b'\n')
+                feature_count += 1
+        
+        meta_path = os.path.splitext(output_path)[0] + '.meta.json'
+        with open(meta_path, 'wb') as f:
+            f.write(self._dumps({
+                "crs": crs,
+                "properties": self._collection_properties(feature_count, min_confidence)
+            }))
+        
+        return feature_count
+    
+    @staticmethod
+    def _collection_properties(feature_count: int, min_confidence: float) -> Dict[str, Any]:
+        """FeatureCollection的统计属性"""
+        return {
+            "total_detections": feature_count,
+            "source": "石马河四乱检测系统",
+            "coordinate_system": "CGCS2000",
+            "coordinate_note": "已从WGS84（无人机GPS）转换为CGCS2000（国家标准）",
+            "epsg_code": "EPSG:4490",
+            "min_confidence": min_confidence
         }
+    
+    def _iter_features(self, df: pd.DataFrame):
+        """
+        逐条生成GeoJSON Feature
+        
+        各列先整列转换为Python值（类型转换和空值判断按列一次完成），
+        逐行只组装字典；整列转换失败（缺少必需列或存在无法转换的值）时
+        改为逐行转换，跳过无效记录。
+        
+        Args:
+            df: 过滤后的数据框
+            
+        Yields:
+            GeoJSON Feature对象
+        """
+        try:
+            corner_columns = [df[column].tolist() for column in CORNER_COLUMNS]
+            
+            keys = [key for key, _, _ in PROPERTY_FIELDS]
+            value_columns = []
+            for key, convert, default in PROPERTY_FIELDS:
+                if key in df.columns:
+                    value_columns.append([convert(value) for value in df[key].tolist()])
+                elif default is _REQUIRED:
+                    raise KeyError(key)
+                else:
+                    value_columns.append([convert(default)] * len(df))
+            
+            optional_keys = []
+            optional_columns = []
+            for key, convert in OPTIONAL_PROPERTY_FIELDS:
+                if key in df.columns:
+                    optional_keys.append(key)
+                    optional_columns.append([
+                        convert(value) if present else None
+                        for value, present in zip(df[key].tolist(), df[key].notna().tolist())
+                    ])
+        except Exception:
+            yield from self._iter_features_by_row(df)
+            return
         
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(geojson, f, ensure_ascii=False, indent=2)
+        for corners, values, optional_values in zip(
+            zip(*corner_columns), zip(*value_columns), zip(*optional_columns)
+        ):
+            properties = dict(zip(keys, values))
+            for key, value in zip(optional_keys, optional_values):
+                if value is not None:
+                    properties[key] = value
+            
+            yield self._make_feature(corners, properties)
+    
+    def _iter_features_by_row(self, df: pd.DataFrame):
+        """逐行转换并生成Feature，跳过无效记录"""
+        # 按列批量取值后逐行组成字典，避免 iterrows 为每行构造Series
+        columns = list(df.columns)
+        for values in df.itertuples(index=False, name=None):
+            row = dict(zip(columns, values))
+            try:
+                feature = self._detection_to_feature(row)
+            except Exception as e:
+                logger.warning(f"跳过无效记录 (frame {row.get('frame_number', '?')}): {e}")
+                continue
+            yield feature
+    
+    @staticmethod
+    def _dumps(obj: Dict[str, Any], indent: bool = True) -> bytes:
+        """
+        序列化为UTF-8 JSON（orjson直接输出字节，未安装时使用标准库json）
         
-        return len(features)
+        Args:
+            obj: 待序列化对象
+            indent: True为缩进2格，False为不含空白的紧凑格式
+            
+        Returns:
+            JSON字节串
+        """
+        if ORJSON_AVAILABLE:
+            option = orjson.OPT_SERIALIZE_NUMPY
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, option=option)
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
     
-    def _detection_to_feature(self, row: pd.Series) -> Dict[str, Any]:
+    def _detection_to_feature(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """
         将单条检测记录转换为GeoJSON Feature
         
         Args:
-            row: DataFrame的一行
+            row: DataFrame的一行（列名 → 值）
             
         Returns:
             GeoJSON Feature对象
         """
-        # 提取四角点坐标构成多边形
-        coordinates = [[
-            [row['corner1_lon'], row['corner1_lat']],
-            [row['corner2_lon'], row['corner2_lat']],
-            [row['corner3_lon'], row['corner3_lat']],
-            [row['corner4_lon'], row['corner4_lat']],
-            [row['corner1_lon'], row['corner1_lat']]  # 闭合多边形
-        ]]
+        corners = [row[column] for column in CORNER_COLUMNS]
         
         # 构建属性（包含所有有用信息）
-        properties = {
-            'frame_number': int(row['frame_number']),
-            'timestamp': float(row.get('timestamp', 0)),
-            'datetime': str(row.get('datetime', '')),
-            'class_id': int(row['class_id']),
-            'class_name': str(row['class_name']),
-            'confidence': float(row['confidence']),
-            'center_lat': float(row['center_lat']),
-            'center_lon': float(row['center_lon']),
-            'altitude': float(row['altitude']),
-            'drone_lat': float(row['drone_lat']),
-            'drone_lon': float(row['drone_lon']),
-            'is_on_edge': bool(row.get('is_on_edge', False)),
-            'edge_positions': str(row.get('edge_positions', '')),
-            'image_path': str(row.get('image_path', ''))
-        }
+        properties = {}
+        for key, convert, default in PROPERTY_FIELDS:
+            value = row[key] if default is _REQUIRED else row.get(key, default)
+            properties[key] = convert(value)
         
         # 添加GPS质量信息（如果有）
-        if 'gps_quality' in row and pd.notna(row['gps_quality']):
-            properties['gps_quality'] = str(row['gps_quality'])
-        
-        if 'positioning_state' in row and pd.notna(row['positioning_state']):
-            properties['positioning_state'] = str(row['positioning_state'])
+        for key, convert in OPTIONAL_PROPERTY_FIELDS:
+            if key in row and pd.notna(row[key]):
+                properties[key] = convert(row[key])
         
-        if 'estimated_error' in row and pd.notna(row['estimated_error']):
-            properties['estimated_error'] = float(row['estimated_error'])
-        
-        if 'gps_level' in row and pd.notna(row['gps_level']):
-            properties['gps_level'] = int(row['gps_level'])
+        return self._make_feature(corners, properties)
+    
+    @staticmethod
+    def _make_feature(corners, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        由四角点坐标和属性构建Feature
         
-        if 'satellite_count' in row and pd.notna(row['satellite_count']):
-            properties['satellite_count'] = int(row['satellite_count'])
+        Args:
+            corners: 按 CORNER_COLUMNS 顺序排列的8个坐标值
+            properties: Feature属性
+            
+        Returns:
+            GeoJSON Feature对象
+        """
+        lon1, lat1, lon2, lat2, lon3, lat3, lon4, lat4 = corners
         
-        # 构建Feature
-        feature = {
+        return {
             "type": "Feature",
             "geometry": {
                 "type": "Polygon",
-                "coordinates": coordinates
+                "coordinates": [[
+                    [lon1, lat1],
+                    [lon2, lat2],
+                    [lon3, lat3],
+                    [lon4, lat4],
+                    [lon1, lat1]  # 闭合多边形
+                ]]
             },
             "properties": properties
         }
-        
-        return feature
     
     def export_from_dataframe(
         self, 
@@ -267,7 +527,7 @@ class GeoJSONWriter:
             输出文件路径
         """
         if output_path is None:
-            output_path = os.path.join(self.output_dir, 'detections.geojson')
+            output_path = os.path.join(self.output_dir, 'detections' + self.extension)
         
         self._export_dataframe(df, output_path, self.min_confidence, self.class_filter)
         
@@ -4,12 +4,19 @@
 """
 
 import os
+import threading
 import cv2
 import numpy as np
 from typing import Dict, Any, Optional
 from datetime import datetime
 from loguru import logger
 
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
 
 class ImageSaver:
     """图像保存器类"""
@@ -18,7 +25,8 @@ class ImageSaver:
         self,
         output_dir: str,
         save_format: str = "full",
-        image_quality: int = 90
+        image_quality: int = 90,
+        use_turbojpeg: bool = True
     ):
         """
         初始化图像保存器
@@ -27,6 +35,7 @@ class ImageSaver:
             output_dir: 图像输出目录
             save_format: 保存格式 ("crop"=裁剪目标区域, "full"=完整帧带标注)
             image_quality: 图像质量 (1-100)
+            use_turbojpeg: 是否使用libjpeg-turbo编码（需安装PyTurboJPEG，否则使用OpenCV）
         """
         self.output_dir = output_dir
         self.save_format = save_format
@@ -36,6 +45,19 @@ class ImageSaver:
         os.makedirs(output_dir, exist_ok=True)
         
         self.save_count = 0
+        self._count_lock = threading.Lock()  # 后台线程并发保存时保护计数
+        
+        # 标签文字尺寸缓存：标签为"类别 置信度(2位小数)"，取值有限
+        self._text_size_cache = {}
+        
+        # libjpeg-turbo编码器（每次encode独立创建压缩句柄，可在多线程间共享）
+        self._turbo = None
+        if use_turbojpeg and TURBOJPEG_AVAILABLE:
+            try:
+                self._turbo = TurboJPEG()
+                logger.info("JPEG编码使用libjpeg-turbo")
+            except Exception as e:
+                logger.warning(f"TurboJPEG初始化失败: {e}，使用OpenCV编码")
         
         logger.info(f"图像保存器初始化完成: {output_dir}")
     
@@ -44,7 +66,8 @@ class ImageSaver:
         image: np.ndarray,
         detection: Dict[str, Any],
         frame_number: int,
-        detection_index: int = 0
+        detection_index: int = 0,
+        timestamp: Optional[str] = None
     ) -> str:
         """
         保存检测目标图像
@@ -54,16 +77,13 @@ class ImageSaver:
             detection: 检测结果字典
             frame_number: 帧号
             detection_index: 检测目标索引
+            timestamp: 文件名中的时间戳（None表示取当前时间）
             
         Returns:
             保存的图像路径
         """
         try:
-            # 生成文件名
-            class_name = detection.get('class_name', 'unknown')
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
-            filename = f"frame_{frame_number:06d}_obj_{detection_index:03d}_{class_name}_{timestamp}.jpg"
-            filepath = os.path.join(self.output_dir, filename)
+            filepath = self._make_filepath(detection, frame_number, detection_index, timestamp)
             
             # 根据保存格式处理图像
             if self.save_format == "crop":
@@ -72,10 +92,8 @@ class ImageSaver:
                 save_image = self._draw_detection(image, detection)
             
             # 保存图像
-            cv2.imwrite(filepath, save_image, [cv2.IMWRITE_JPEG_QUALITY, self.image_quality])
-            
-            self.save_count += 1
-            logger.debug(f"图像已保存: {filename}")
+            self._write_jpeg(filepath, save_image)
+            self._count_saved(filepath)
             
             return filepath
             
@@ -83,6 +101,56 @@ class ImageSaver:
             logger.error(f"保存图像失败: {e}")
             return ""
     
+    def _make_filepath(
+        self,
+        detection: Dict[str, Any],
+        frame_number: int,
+        detection_index: int,
+        timestamp: Optional[str] = None
+    ) -> str:
+        """生成检测目标截图的保存路径"""
+        class_name = detection.get('class_name', 'unknown')
+        if timestamp is None:
+            timestamp = self._timestamp()
+        filename = f"frame_{frame_number:06d}_obj_{detection_index:03d}_{class_name}_{timestamp}.jpg"
+        return os.path.join(self.output_dir, filename)
+    
+    @staticmethod
+    def _timestamp() -> str:
+        """文件名用的当前时间（精确到毫秒）"""
+        return datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+    
+    def _count_saved(self, filepath: str):
+        """累计保存数量"""
+        with self._count_lock:
+            self.save_count += 1
+        logger.debug("图像已保存: {}", os.path.basename(filepath))
+    
+    def _write_jpeg(self, filepath: str, image: np.ndarray):
+        """
+        编码并写入JPEG文件
+        
+        Args:
+            filepath: 输出路径
+            image: BGR图像
+        """
+        if self._turbo is None:
+            # 先在内存中编码再由Python写文件：cv2.imwrite在Windows上无法打开
+            # 含中文（类别名）的路径
+            success, data = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, self.image_quality])
+            if not success:
+                raise RuntimeError(f"JPEG编码失败: {filepath}")
+        else:
+            # 与OpenCV默认一致使用4:2:0色度采样；裁剪得到的切片需先转为连续内存
+            data = self._turbo.encode(
+                np.ascontiguousarray(image),
+                quality=self.image_quality,
+                jpeg_subsample=TJSAMP_420
+            )
+        
+        with open(filepath, 'wb') as f:
+            f.write(data)
+    
     def _crop_detection(self, image: np.ndarray, detection: Dict[str, Any]) -> np.ndarray:
         """
         裁剪检测目标区域
@@ -99,9 +167,8 @@ class ImageSaver:
         if len(corners) < 4:
             return image
         
-        # 计算边界矩形
-        xs = [c[0] for c in corners]
-        ys = [c[1] for c in corners]
+        # 计算边界矩形（仅4个点，解包为元组比转NumPy数组更快）
+        xs, ys, *_ = zip(*corners)
         
         x_min = max(0, int(min(xs)))
         y_min = max(0, int(min(ys)))
@@ -125,11 +192,24 @@ class ImageSaver:
             绘制后的图像
         """
         img = image.copy()
+        self._draw_detection_inplace(img, detection)
+        return img
+    
+    def _draw_detection_inplace(self, img: np.ndarray, detection: Dict[str, Any]) -> Optional[tuple]:
+        """
+        直接在图像上绘制检测框和标签
         
+        Args:
+            img: 待绘制的图像（原地修改）
+            detection: 检测结果
+            
+        Returns:
+            被修改区域 (x1, y1, x2, y2)（已裁剪到图像范围），未绘制时为None
+        """
         # 获取检测框
         corners = detection.get('corners', [])
         if len(corners) < 4:
-            return img
+            return None
         
         # 转换为整数坐标
         pts = np.array([[int(x), int(y)] for x, y in corners], dtype=np.int32)
@@ -147,9 +227,11 @@ class ImageSaver:
         label_x, label_y = int(top_corner[0]), int(top_corner[1])
         
         # 绘制标签背景
-        (text_width, text_height), baseline = cv2.getTextSize(
-            label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2
-        )
+        text_size = self._text_size_cache.get(label)
+        if text_size is None:
+            text_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+            self._text_size_cache[label] = text_size
+        (text_width, text_height), baseline = text_size
         bg_y1 = max(0, label_y - text_height - baseline - 5)
         cv2.rectangle(
             img,
@@ -170,13 +252,21 @@ class ImageSaver:
             2
         )
         
-        return img
+        # 修改区域：检测框、标签背景和文字的外接矩形，外扩线宽和字形溢出的余量
+        margin = 8
+        x1 = min(int(pts[:, 0].min()), label_x) - margin
+        y1 = min(int(pts[:, 1].min()), bg_y1) - margin
+        x2 = max(int(pts[:, 0].max()), label_x + text_width) + margin
+        y2 = max(int(pts[:, 1].max()), label_y, max(text_height, label_y - baseline - 2) + baseline) + margin
+        height, width = img.shape[:2]
+        return max(0, x1), max(0, y1), min(width, x2 + 1), min(height, y2 + 1)
     
     def save_batch(
         self,
         image: np.ndarray,
         detections: list,
-        frame_number: int
+        frame_number: int,
+        start_index: int = 0
     ) -> list:
         """
         批量保存检测目标
@@ -185,14 +275,41 @@ class ImageSaver:
             image: 原始图像
             detections: 检测结果列表
             frame_number: 帧号
+            start_index: 第一个检测目标在本帧中的索引（同一帧分块保存时使用）
             
         Returns:
             保存的图像路径列表
         """
+        # 同一批的文件名共用一个时间戳（帧号和目标索引已保证唯一）
+        timestamp = self._timestamp()
+        
+        if self.save_format == "crop" or len(detections) < 2:
+            return [
+                self.save(image, detection, frame_number, start_index + i, timestamp)
+                for i, detection in enumerate(detections)
+            ]
+        
+        # 完整帧模式：整帧只复制一次，每个目标绘制、编码后只把绘制过的区域从原图恢复，
+        # 避免每个目标复制一次整帧
+        canvas = image.copy()
         image_paths = []
         
-        for i, detection in enumerate(detections):
-            filepath = self.save(image, detection, frame_number, i)
+        for i, detection in enumerate(detections, start_index):
+            dirty = None
+            try:
+                filepath = self._make_filepath(detection, frame_number, i, timestamp)
+                dirty = self._draw_detection_inplace(canvas, detection)
+                self._write_jpeg(filepath, canvas)
+                self._count_saved(filepath)
+            except Exception as e:
+                logger.error(f"保存图像失败: {e}")
+                filepath = ""
+                # 绘制中途失败时修改区域未知，整帧恢复
+                canvas[:] = image
+            else:
+                if dirty is not None:
+                    x1, y1, x2, y2 = dirty
+                    canvas[y1:y2, x1:x2] = image[y1:y2, x1:x2]
             image_paths.append(filepath)
         
         return image_paths
@@ -13,199 +13,142 @@
 
 import json
 import os
+import shutil
+from collections import Counter
 from typing import Dict, Any
+import numpy as np
+import pandas as pd
 from loguru import logger
 
+from .paths import ensure_dir
 
-class MapGenerator:
-    """地图生成器类"""
-    
-    def __init__(self, config: Dict[str, Any] = None):
-        """
-        初始化地图生成器
-        
-        Args:
-            config: 配置字典
-        """
-        if config is None:
-            config = {}
-        
-        self.config = config
-        
-        # 地图样式配置
-        self.class_colors = {
-            '违建': '#dc3545',      # 红色
-            '垃圾': '#fd7e14',      # 橙色
-            '污水': '#6f42c1',      # 紫色
-            '违种': '#28a745',      # 绿色
-            'Water Bodies': '#007bff',
-            'Vegetation': '#28a745',
-            'Mining Area': '#6f42c1',
-            'Debris': '#fd7e14',
-            'Industrial Buildings': '#6c757d',
-            'Waterway Facilities': '#17a2b8',
-            'Hydraulic Controls': '#e83e8c',
-            'Residences': '#ffc107',
-            'Sheds': '#20c997',
-            'Storage Zones': '#dc3545',
-            'Recreation Areas': '#f8f9fa'
-        }
-        
-        logger.info("地图生成器初始化完成")
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# 写入HTML文件时的缓冲区大小（字节）
+WRITE_BUFFER_SIZE = 1 << 20
+
+# 嵌入页面的JSON使用紧凑分隔符，不输出多余空格
+JSON_SEPARATORS = (',', ':')
+
+# Leaflet及插件的CDN地址（未配置本地资源目录时使用）
+LEAFLET_CDN = 'https://unpkg.com/leaflet@1.9.4/dist/'
+VECTOR_GRID_CDN = 'https://unpkg.com/leaflet.vectorgrid@1.3.0/dist/'
+
+# 本地资源目录中的文件名，以及复制到地图旁的子目录名
+LEAFLET_FILES = ('leaflet.js', 'leaflet.css')
+VECTOR_GRID_FILE = 'Leaflet.VectorGrid.bundled.js'
+ASSETS_SUBDIR = 'map_assets'
+
+# 默认底图：OpenStreetMap
+DEFAULT_TILE_URL = 'https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png'
+DEFAULT_TILE_ATTRIBUTION = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+
+# 每批序列化的Feature数：按批序列化后写入，限制单个中间结果的大小
+FEATURE_CHUNK_SIZE = 512
+
+
+def _dumps(obj: Any) -> bytes:
+    """
+    序列化为紧凑的UTF-8 JSON（orjson直接输出字节，未安装时使用标准库json）
     
-    def generate(self, geojson_path: str, output_path: str) -> str:
-        """
-        从GeoJSON文件生成HTML地图
-        
-        Args:
-            geojson_path: GeoJSON文件路径
-            output_path: HTML输出路径
-            
-        Returns:
-            生成的HTML文件路径
-        """
-        try:
-            # 读取GeoJSON数据
-            with open(geojson_path, 'r', encoding='utf-8') as f:
-                geojson_data = json.load(f)
-            
-            # 生成HTML
-            return self.generate_from_data(geojson_data, output_path)
-            
-        except Exception as e:
-            logger.error(f"生成地图失败: {e}")
-            return ""
+    Args:
+        obj: 待序列化对象
+        
+    Returns:
+        JSON字节串
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=JSON_SEPARATORS).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """解析UTF-8 JSON字节串（orjson未安装时使用标准库json）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _count_classes(class_names) -> Dict[str, int]:
+    """
+    统计各类别的检测数（供图例使用，缺少类别名的记为 unknown）
     
-    def generate_from_data(
-        self, 
-        geojson_data: Dict[str, Any], 
-        output_path: str
-    ) -> str:
-        """
-        从GeoJSON数据生成HTML地图
-        
-        Args:
-            geojson_data: GeoJSON数据字典
-            output_path: HTML输出路径
-            
-        Returns:
-            生成的HTML文件路径
-        """
-        try:
-            # 计算地图边界和中心
-            center_lat, center_lon, zoom_level = self._calculate_map_center(geojson_data)
-            
-            # 生成HTML内容
-            html_content = self._generate_html_content(
-                geojson_data, 
-                center_lat, 
-                center_lon, 
-                zoom_level
-            )
-            
-            # 写入文件
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            logger.info(f"✓ 生成HTML地图: {output_path}")
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"生成地图失败: {e}")
-            return ""
+    Args:
+        class_names: 类别名序列
+        
+    Returns:
+        类别名 → 数量
+    """
+    counts = Counter(class_names)
+    return {
+        ('unknown' if pd.isna(name) else str(name)): int(count)
+        for name, count in counts.items()
+    }
+
+
+def _write_json(f, geojson_data: Dict[str, Any]):
+    """
+    将GeoJSON数据分段序列化写入文件（输出与整体序列化相同）
     
-    def _calculate_map_center(
-        self, 
-        geojson_data: Dict[str, Any]
-    ) -> tuple:
-        """
-        计算地图中心和缩放级别
-        
-        Args:
-            geojson_data: GeoJSON数据
-            
-        Returns:
-            (center_lat, center_lon, zoom_level)
-        """
-        features = geojson_data.get('features', [])
-        
-        if not features:
-            return (23.0, 114.0, 12)  # 默认深圳地区
-        
-        # 提取所有中心点坐标
-        lats = []
-        lons = []
-        
-        for feature in features:
-            props = feature.get('properties', {})
-            if 'center_lat' in props and 'center_lon' in props:
-                lats.append(props['center_lat'])
-                lons.append(props['center_lon'])
-        
-        if not lats or not lons:
-            return (23.0, 114.0, 12)
-        
-        # 计算中心点
-        center_lat = (min(lats) + max(lats)) / 2
-        center_lon = (min(lons) + max(lons)) / 2
-        
-        # 根据范围估算缩放级别
-        lat_range = max(lats) - min(lats)
-        lon_range = max(lons) - min(lons)
-        max_range = max(lat_range, lon_range)
-        
-        # 简单的缩放级别估算
-        if max_range < 0.001:
-            zoom_level = 18  # 很小的区域
-        elif max_range < 0.01:
-            zoom_level = 15
-        elif max_range < 0.05:
-            zoom_level = 13
+    Args:
+        f: 已打开的二进制文件对象
+        geojson_data: GeoJSON数据字典
+    """
+    f.write(b'{')
+    for i, (key, value) in enumerate(geojson_data.items()):
+        if i:
+            f.write(b',')
+        f.write(_dumps(key))
+        f.write(b':')
+        if key == 'features' and isinstance(value, list):
+            f.write(b'[')
+            for start in range(0, len(value), FEATURE_CHUNK_SIZE):
+                if start:
+                    f.write(b',')
+                # 去掉批次列表自身的方括号，各批之间以逗号衔接
+                f.write(_dumps(value[start:start + FEATURE_CHUNK_SIZE])[1:-1])
+            f.write(b']')
         else:
-            zoom_level = 11
-        
-        return (center_lat, center_lon, zoom_level)
-    
-    def _generate_html_content(
-        self,
-        geojson_data: Dict[str, Any],
-        center_lat: float,
-        center_lon: float,
-        zoom_level: int
-    ) -> str:
-        """
-        生成HTML内容
-        
-        Args:
-            geojson_data: GeoJSON数据
-            center_lat: 地图中心纬度
-            center_lon: 地图中心经度
-            zoom_level: 缩放级别
-            
-        Returns:
-            HTML字符串
-        """
-        geojson_str = json.dumps(geojson_data, ensure_ascii=False)
-        colors_str = json.dumps(self.class_colors, ensure_ascii=False)
-        
-        html = f"""<!DOCTYPE html>
+            f.write(_dumps(value))
+    f.write(b'}')
+
+
+# HTML模板按动态内容拆分，静态部分原样写入，不经过str.format扫描和花括号转义
+
+# 页面头部，到Leaflet资源之前
+HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <title>石马河四乱检测结果可视化</title>
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <style>
-        body {{ 
+"""
+
+# Leaflet样式和脚本（资源地址待填充：CDN或地图旁的本地目录）
+HTML_LEAFLET_ASSETS = """    <link rel="stylesheet" href="{base}leaflet.css" />
+    <script src="{base}leaflet.js"></script>
+"""
+
+# Leaflet.VectorGrid（内置geojson-vt，浏览器端按瓦片切分GeoJSON），仅切片渲染时引入
+HTML_VECTOR_GRID_SCRIPT = """    <script src="{base}Leaflet.VectorGrid.bundled.js"></script>
+"""
+
+# 样式和面板，到地图初始化之前
+HTML_BODY = """    <style>
+        body { 
             margin: 0; 
             padding: 0; 
             font-family: 'Segoe UI', 'Microsoft YaHei', Arial, sans-serif; 
-        }}
-        #map {{ height: 100vh; width: 100%; }}
+        }
+        #map { height: 100vh; width: 100%; }
         
-        .info-panel {{
+        .info-panel {
             position: absolute; 
             top: 10px; 
             right: 10px;
@@ -216,33 +159,33 @@ class MapGenerator:
             z-index: 1000; 
             max-width: 320px;
             min-width: 250px;
-        }}
+        }
         
-        .info-panel h3 {{ 
+        .info-panel h3 { 
             margin-top: 0; 
             font-size: 18px; 
             color: #333;
             border-bottom: 2px solid #007bff;
             padding-bottom: 10px;
-        }}
+        }
         
-        .info-panel .stat-item {{
+        .info-panel .stat-item {
             display: flex;
             justify-content: space-between;
             margin: 8px 0;
             font-size: 14px;
-        }}
+        }
         
-        .info-panel .stat-label {{
+        .info-panel .stat-label {
             color: #666;
-        }}
+        }
         
-        .info-panel .stat-value {{
+        .info-panel .stat-value {
             font-weight: bold;
             color: #007bff;
-        }}
+        }
         
-        .legend {{
+        .legend {
             position: absolute; 
             bottom: 30px; 
             right: 10px;
@@ -253,54 +196,54 @@ class MapGenerator:
             z-index: 1000;
             max-height: 400px;
             overflow-y: auto;
-        }}
+        }
         
-        .legend h4 {{
+        .legend h4 {
             margin: 0 0 10px 0;
             font-size: 16px;
             color: #333;
-        }}
+        }
         
-        .legend-item {{ 
+        .legend-item { 
             display: flex; 
             align-items: center; 
             margin: 8px 0; 
             font-size: 13px; 
-        }}
+        }
         
-        .legend-color {{ 
+        .legend-color { 
             width: 24px; 
             height: 24px; 
             margin-right: 10px; 
             border: 2px solid #333;
             border-radius: 3px;
-        }}
+        }
         
-        .leaflet-popup-content {{
+        .leaflet-popup-content {
             font-size: 13px;
             line-height: 1.6;
-        }}
+        }
         
-        .leaflet-popup-content strong {{
+        .leaflet-popup-content strong {
             color: #007bff;
             font-size: 15px;
-        }}
+        }
         
-        .popup-field {{
+        .popup-field {
             margin: 5px 0;
             display: flex;
             justify-content: space-between;
-        }}
+        }
         
-        .popup-label {{
+        .popup-label {
             color: #666;
             min-width: 100px;
-        }}
+        }
         
-        .popup-value {{
+        .popup-value {
             font-weight: 500;
             text-align: right;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -334,21 +277,49 @@ class MapGenerator:
     
     <script>
         // 初始化地图
-        var map = L.map('map').setView([{center_lat}, {center_lon}], {zoom_level});
+"""
+
+# 地图初始化语句（中心和缩放级别待填充）：多边形统一绘制在Canvas上，不为每个检测框创建SVG节点
+HTML_MAP_VIEW = (
+    "        var canvasRenderer = L.canvas({{padding: 0.5}});\n"
+    "        var map = L.map('map', {{renderer: canvasRenderer, preferCanvas: true}})"
+    ".setView([{center_lat}, {center_lon}], {zoom_level});\n"
+)
+
+# 底图图层（瓦片地址和版权信息待填充，均为JSON字符串）
+HTML_TILE_LAYER = """        
+        // 底图瓦片异步解码，平移缩放时不在主线程上同步解码图片
+        var AsyncTileLayer = L.TileLayer.extend({{
+            createTile: function(coords, done) {{
+                var tile = L.TileLayer.prototype.createTile.call(this, coords, done);
+                tile.decoding = 'async';
+                return tile;
+            }}
+        }});
         
-        // 添加天地图底图（中国地区推荐）
-        // 备选：OpenStreetMap
-        L.tileLayer('https://{{s}}.tile.openstreetmap.org/{{z}}/{{x}}/{{y}}.png', {{
-            attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors',
+        // 添加底图（默认OpenStreetMap，可通过 map_tile_url 指向本地瓦片服务）
+        new AsyncTileLayer({url}, {{
+            attribution: {attribution},
             maxZoom: 19
         }}).addTo(map);
         
-        // 加载GeoJSON数据
-        var geojsonData = {geojson_str};
-        var classColors = {colors_str};
+"""
+
+# GeoJSON数据之前
+HTML_DATA_PREFIX = """        // 加载GeoJSON数据
+        var geojsonData = """
+
+# GeoJSON数据之后、类别颜色之前
+HTML_COLORS_PREFIX = ";\n        var classColors = "
+
+# 类别颜色之后、各类别数量之前
+HTML_COUNTS_PREFIX = ";\n        var classCounts = "
+
+# 各类别数量之后的样式和弹窗函数
+HTML_SCRIPT_FUNCTIONS = """;
         
         // 样式函数
-        function getStyle(feature) {{
+        function getStyle(feature) {
             var props = feature.properties;
             var className = props.class_name || 'unknown';
             var color = classColors[className] || '#6c757d';
@@ -357,135 +328,168 @@ class MapGenerator:
             var confidence = props.confidence || 0.5;
             var fillOpacity = 0.3 + confidence * 0.4;
             
-            return {{
+            return {
                 fillColor: color,
                 weight: 2,
                 opacity: 1,
                 color: color,
                 fillOpacity: fillOpacity
-            }};
-        }}
+            };
+        }
         
         // 弹窗内容生成
-        function onEachFeature(feature, layer) {{
-            if (feature.properties) {{
-                var p = feature.properties;
-                var popupContent = '<div style="min-width: 250px;">';
-                
-                // 标题
-                popupContent += '<strong>' + p.class_name + '</strong><br>';
-                popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
-                
-                // 基本信息
+        function buildPopupContent(p) {
+            var popupContent = '<div style="min-width: 250px;">';
+            
+            // 标题
+            popupContent += '<strong>' + p.class_name + '</strong><br>';
+            popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
+            
+            // 基本信息
+            popupContent += '<div class="popup-field">';
+            popupContent += '<span class="popup-label">置信度:</span>';
+            popupContent += '<span class="popup-value">' + (p.confidence * 100).toFixed(1) + '%</span>';
+            popupContent += '</div>';
+            
+            popupContent += '<div class="popup-field">';
+            popupContent += '<span class="popup-label">帧号:</span>';
+            popupContent += '<span class="popup-value">' + p.frame_number + '</span>';
+            popupContent += '</div>';
+            
+            if (p.datetime) {
                 popupContent += '<div class="popup-field">';
-                popupContent += '<span class="popup-label">置信度:</span>';
-                popupContent += '<span class="popup-value">' + (p.confidence * 100).toFixed(1) + '%</span>';
+                popupContent += '<span class="popup-label">时间:</span>';
+                popupContent += '<span class="popup-value">' + p.datetime + '</span>';
                 popupContent += '</div>';
-                
+            }
+            
+            // GPS坐标
+            popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
+            popupContent += '<div class="popup-field">';
+            popupContent += '<span class="popup-label">纬度:</span>';
+            popupContent += '<span class="popup-value">' + p.center_lat.toFixed(6) + '</span>';
+            popupContent += '</div>';
+            
+            popupContent += '<div class="popup-field">';
+            popupContent += '<span class="popup-label">经度:</span>';
+            popupContent += '<span class="popup-value">' + p.center_lon.toFixed(6) + '</span>';
+            popupContent += '</div>';
+            
+            popupContent += '<div class="popup-field">';
+            popupContent += '<span class="popup-label">高度:</span>';
+            popupContent += '<span class="popup-value">' + p.altitude.toFixed(1) + 'm</span>';
+            popupContent += '</div>';
+            
+            // GPS质量信息（如果有）
+            if (p.gps_quality) {
+                popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
                 popupContent += '<div class="popup-field">';
-                popupContent += '<span class="popup-label">帧号:</span>';
-                popupContent += '<span class="popup-value">' + p.frame_number + '</span>';
+                popupContent += '<span class="popup-label">GPS质量:</span>';
+                popupContent += '<span class="popup-value">' + p.gps_quality + '</span>';
                 popupContent += '</div>';
                 
-                if (p.datetime) {{
+                if (p.positioning_state) {
                     popupContent += '<div class="popup-field">';
-                    popupContent += '<span class="popup-label">时间:</span>';
-                    popupContent += '<span class="popup-value">' + p.datetime + '</span>';
+                    popupContent += '<span class="popup-label">定位状态:</span>';
+                    popupContent += '<span class="popup-value">' + p.positioning_state + '</span>';
                     popupContent += '</div>';
-                }}
+                }
                 
-                // GPS坐标
-                popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
-                popupContent += '<div class="popup-field">';
-                popupContent += '<span class="popup-label">纬度:</span>';
-                popupContent += '<span class="popup-value">' + p.center_lat.toFixed(6) + '</span>';
-                popupContent += '</div>';
-                
-                popupContent += '<div class="popup-field">';
-                popupContent += '<span class="popup-label">经度:</span>';
-                popupContent += '<span class="popup-value">' + p.center_lon.toFixed(6) + '</span>';
-                popupContent += '</div>';
-                
-                popupContent += '<div class="popup-field">';
-                popupContent += '<span class="popup-label">高度:</span>';
-                popupContent += '<span class="popup-value">' + p.altitude.toFixed(1) + 'm</span>';
-                popupContent += '</div>';
-                
-                // GPS质量信息（如果有）
-                if (p.gps_quality) {{
-                    popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
+                if (p.estimated_error !== undefined) {
+                    var errorColor = p.estimated_error < 5 ? '#28a745' : (p.estimated_error < 10 ? '#ffc107' : '#dc3545');
                     popupContent += '<div class="popup-field">';
-                    popupContent += '<span class="popup-label">GPS质量:</span>';
-                    popupContent += '<span class="popup-value">' + p.gps_quality + '</span>';
+                    popupContent += '<span class="popup-label">预估误差:</span>';
+                    popupContent += '<span class="popup-value" style="color: ' + errorColor + '">';
+                    popupContent += '±' + p.estimated_error.toFixed(2) + 'm</span>';
                     popupContent += '</div>';
-                    
-                    if (p.positioning_state) {{
-                        popupContent += '<div class="popup-field">';
-                        popupContent += '<span class="popup-label">定位状态:</span>';
-                        popupContent += '<span class="popup-value">' + p.positioning_state + '</span>';
-                        popupContent += '</div>';
-                    }}
-                    
-                    if (p.estimated_error !== undefined) {{
-                        var errorColor = p.estimated_error < 5 ? '#28a745' : (p.estimated_error < 10 ? '#ffc107' : '#dc3545');
-                        popupContent += '<div class="popup-field">';
-                        popupContent += '<span class="popup-label">预估误差:</span>';
-                        popupContent += '<span class="popup-value" style="color: ' + errorColor + '">';
-                        popupContent += '±' + p.estimated_error.toFixed(2) + 'm</span>';
-                        popupContent += '</div>';
-                    }}
-                    
-                    if (p.satellite_count) {{
-                        popupContent += '<div class="popup-field">';
-                        popupContent += '<span class="popup-label">卫星数:</span>';
-                        popupContent += '<span class="popup-value">' + p.satellite_count + '</span>';
-                        popupContent += '</div>';
-                    }}
-                }}
+                }
                 
-                // 边缘标记
-                if (p.is_on_edge) {{
-                    popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
-                    popupContent += '<div style="color: #ffc107; font-size: 12px;">';
-                    popupContent += '⚠️ 边缘检测: ' + (p.edge_positions || '未知');
+                if (p.satellite_count) {
+                    popupContent += '<div class="popup-field">';
+                    popupContent += '<span class="popup-label">卫星数:</span>';
+                    popupContent += '<span class="popup-value">' + p.satellite_count + '</span>';
                     popupContent += '</div>';
-                }}
-                
+                }
+            }
+            
+            // 边缘标记
+            if (p.is_on_edge) {
+                popupContent += '<hr style="margin: 8px 0; border-color: #ddd;">';
+                popupContent += '<div style="color: #ffc107; font-size: 12px;">';
+                popupContent += '⚠️ 边缘检测: ' + (p.edge_positions || '未知');
                 popupContent += '</div>';
-                
-                layer.bindPopup(popupContent, {{
-                    maxWidth: 300,
-                    className: 'custom-popup'
-                }});
-            }}
-        }}
+            }
+            
+            popupContent += '</div>';
+            return popupContent;
+        }
+        
+        var popupOptions = {
+            maxWidth: 300,
+            className: 'custom-popup'
+        };
+        
+        // 弹窗内容在打开时才生成，加载阶段不为每个检测框拼接HTML
+        function onEachFeature(feature, layer) {
+            if (feature.properties) {
+                layer.bindPopup(function() {
+                    return buildPopupContent(feature.properties);
+                }, popupOptions);
+            }
+        }
         
-        // 添加GeoJSON图层
-        var geojsonLayer = L.geoJSON(geojsonData, {{
+"""
+
+# 单一GeoJSON图层（要素较少时）
+HTML_GEOJSON_LAYER = """        // 添加GeoJSON图层
+        var geojsonLayer = L.geoJSON(geojsonData, {
+            renderer: canvasRenderer,
             style: getStyle,
             onEachFeature: onEachFeature
-        }}).addTo(map);
+        }).addTo(map);
         
         // 自适应边界
-        if (geojsonData.features.length > 0) {{
-            map.fitBounds(geojsonLayer.getBounds(), {{padding: [50, 50]}});
-        }}
+        if (geojsonData.features.length > 0) {
+            map.fitBounds(geojsonLayer.getBounds(), {padding: [50, 50]});
+        }
         
-        // 更新统计信息
-        document.getElementById('total-count').textContent = geojsonData.features.length;
+"""
+
+# 按视口切片渲染的图层（要素较多时）：只绘制当前视口内的瓦片，
+# 地图范围使用服务端计算的中心和缩放级别
+HTML_VECTOR_GRID_LAYER = """        // Leaflet 1.8+ 移除了 VectorGrid 点击事件依赖的 L.DomEvent.fakeStop
+        if (!L.DomEvent.fakeStop) {
+            L.DomEvent.fakeStop = function() { return true; };
+        }
         
-        // 生成图例
-        var classSet = new Set();
-        var classCounts = {{}};
+        // 按视口切片渲染GeoJSON图层
+        var geojsonLayer = L.vectorGrid.slicer(geojsonData, {
+            rendererFactory: L.canvas.tile,
+            vectorTileLayerStyles: {
+                sliced: function(properties) {
+                    var style = getStyle({properties: properties});
+                    style.fill = true;
+                    return style;
+                }
+            },
+            interactive: true,
+            maxZoom: 19
+        }).on('click', function(e) {
+            L.popup(popupOptions)
+                .setLatLng(e.latlng)
+                .setContent(buildPopupContent(e.layer.properties))
+                .openOn(map);
+        }).addTo(map);
         
-        geojsonData.features.forEach(function(f) {{
-            var className = f.properties.class_name;
-            classSet.add(className);
-            classCounts[className] = (classCounts[className] || 0) + 1;
-        }});
+"""
+
+# 统计信息、图例和页面结尾
+HTML_SCRIPT_END = """        // 更新统计信息
+        document.getElementById('total-count').textContent = geojsonData.features.length;
         
+        // 生成图例（各类别数量在生成页面时已统计）
         var legendItems = document.getElementById('legend-items');
-        Array.from(classSet).sort().forEach(function(className) {{
+        Object.keys(classCounts).sort().forEach(function(className) {
             var color = classColors[className] || '#6c757d';
             var count = classCounts[className];
             
@@ -494,11 +498,444 @@ class MapGenerator:
             item.innerHTML = '<div class="legend-color" style="background-color: ' + color + '"></div>' +
                            '<span>' + className + ' (' + count + ')</span>';
             legendItems.appendChild(item);
-        }});
+        });
         
         console.log('地图加载完成:', geojsonData.features.length, '个检测结果');
     </script>
 </body>
 </html>"""
+
+
+class MapGenerator:
+    """地图生成器类"""
+    
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        初始化地图生成器
+        
+        Args:
+            config: 配置字典
+        """
+        if config is None:
+            config = {}
+        
+        self.config = config
+        
+        # 地图样式配置
+        self.class_colors = {
+            '违建': '#dc3545',      # 红色
+            '垃圾': '#fd7e14',      # 橙色
+            '污水': '#6f42c1',      # 紫色
+            '违种': '#28a745',      # 绿色
+            'Water Bodies': '#007bff',
+            'Vegetation': '#28a745',
+            'Mining Area': '#6f42c1',
+            'Debris': '#fd7e14',
+            'Industrial Buildings': '#6c757d',
+            'Waterway Facilities': '#17a2b8',
+            'Hydraulic Controls': '#e83e8c',
+            'Residences': '#ffc107',
+            'Sheds': '#20c997',
+            'Storage Zones': '#dc3545',
+            'Recreation Areas': '#f8f9fa'
+        }
+        
+        # 要素数超过该值时按视口切片渲染（0表示始终使用单一GeoJSON图层）
+        self.tile_threshold = config.get('map_tile_threshold', 5000)
+        
+        # 底图瓦片地址和版权信息（可指向本地瓦片服务或离线瓦片目录）
+        self.tile_url = config.get('map_tile_url', DEFAULT_TILE_URL)
+        self.tile_attribution = config.get('map_tile_attribution', DEFAULT_TILE_ATTRIBUTION)
+        
+        # 本地Leaflet资源目录（含 leaflet.js/leaflet.css，可选 VectorGrid 插件），
+        # 配置后复制到地图旁引用，离线环境无需访问CDN；未配置时使用CDN
+        self.assets_dir = config.get('map_assets_dir', None)
+        self._copied_assets = {}  # 目标目录 → 已复制的本地资源 (leaflet, vectorgrid)
+        
+        # 是否总是在生成时计算地图中心（单一GeoJSON图层在页面中会按要素范围fitBounds，默认不计算）
+        self.precompute_center = config.get('map_precompute_center', False)
+        
+        # 与单次地图内容无关的模板片段在初始化时格式化并编码一次，批量或监视模式下重复生成地图时直接复用
+        self._tile_layer_script = HTML_TILE_LAYER.format(
+            url=_dumps(self.tile_url).decode('utf-8'),
+            attribution=_dumps(self.tile_attribution).decode('utf-8')
+        )
+        self._colors_script = HTML_COLORS_PREFIX.encode('utf-8') + _dumps(self.class_colors)
+        self._counts_prefix = HTML_COUNTS_PREFIX.encode('utf-8')
+        self._script_tails = {
+            tiled: b''.join([
+                HTML_SCRIPT_FUNCTIONS.encode('utf-8'),
+                (HTML_VECTOR_GRID_LAYER if tiled else HTML_GEOJSON_LAYER).encode('utf-8'),
+                HTML_SCRIPT_END.encode('utf-8'),
+            ])
+            for tiled in (False, True)
+        }
+        
+        logger.info("地图生成器初始化完成")
+    
+    def generate(self, geojson_path: str, output_path: str) -> str:
+        """
+        从GeoJSON文件生成HTML地图
+        
+        Args:
+            geojson_path: GeoJSON文件路径
+            output_path: HTML输出路径
+            
+        Returns:
+            生成的HTML文件路径
+        """
+        try:
+            # .geojsonl 为每行一个Feature，逐行流式处理
+            if geojson_path.endswith('.geojsonl'):
+                return self._generate_from_line_delimited(geojson_path, output_path)
+            
+            # 读取GeoJSON数据
+            with open(geojson_path, 'rb') as f:
+                geojson_data = _loads(f.read())
+            
+            # 生成HTML
+            return self.generate_from_data(geojson_data, output_path)
+            
+        except Exception as e:
+            logger.error(f"生成地图失败: {e}")
+            return ""
+    
+    def generate_from_data(
+        self, 
+        geojson_data: Dict[str, Any], 
+        output_path: str,
+        df: pd.DataFrame = None
+    ) -> str:
+        """
+        从GeoJSON数据生成HTML地图
+        
+        Args:
+            geojson_data: GeoJSON数据字典
+            output_path: HTML输出路径
+            df: 与features逐条对应的DataFrame（可选），提供时直接按
+                center_lat/center_lon 列计算地图范围，不再遍历features
+            
+        Returns:
+            生成的HTML文件路径
+        """
+        try:
+            features = geojson_data.get('features')
+            if not isinstance(features, list):
+                features = []
+            feature_count = len(features)
+            
+            # 图例的类别统计：有对应数据框时直接按列计数
+            if df is not None and 'class_name' in df.columns:
+                class_counts = _count_classes(df['class_name'].tolist())
+            else:
+                class_counts = _count_classes(
+                    feature.get('properties', {}).get('class_name') for feature in features
+                )
+            
+            # 计算地图边界和中心：单一GeoJSON图层在页面加载后按要素范围fitBounds，
+            # 初始视图会被立即覆盖，只有切片渲染或显式要求时才计算
+            if not (self.precompute_center or self._is_tiled(feature_count)):
+                view = (23.0, 114.0, 12)  # 默认深圳地区
+            elif df is not None and 'center_lat' in df.columns and 'center_lon' in df.columns:
+                view = self._map_view(
+                    df['center_lat'].to_numpy(dtype=np.float64),
+                    df['center_lon'].to_numpy(dtype=np.float64)
+                )
+            else:
+                view = self._calculate_map_center(geojson_data)
+            
+            return self._write_map(
+                output_path,
+                lambda f: _write_json(f, geojson_data),
+                feature_count,
+                class_counts,
+                view
+            )
+            
+        except Exception as e:
+            logger.error(f"生成地图失败: {e}")
+            return ""
+    
+    def _generate_from_line_delimited(self, geojson_path: str, output_path: str) -> str:
+        """
+        从 .geojsonl 文件流式生成HTML地图
+        
+        第一遍逐行解析，只统计要素数、类别数量和中心点坐标范围；第二遍把各行原样
+        拼接进页面，不在内存中保留Feature列表。
+        
+        Args:
+            geojson_path: .geojsonl 文件路径
+            output_path: HTML输出路径
+            
+        Returns:
+            生成的HTML文件路径
+        """
+        feature_count, class_counts, bounds = self._scan_line_delimited(geojson_path)
+        if bounds is None:
+            view = (23.0, 114.0, 12)  # 默认深圳地区
+        else:
+            view = self._view_from_bounds(*bounds)
+        
+        def write_data(f):
+            f.write(b'{"type":"FeatureCollection","features":[')
+            with open(geojson_path, 'rb') as src:
+                first = True
+                for line in src:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    if not first:
+                        f.write(b',')
+                    f.write(line)
+                    first = False
+            f.write(b']}')
+        
+        return self._write_map(output_path, write_data, feature_count, class_counts, view)
+    
+    @staticmethod
+    def _scan_line_delimited(geojson_path: str) -> tuple:
+        """
+        逐行扫描 .geojsonl 文件，统计要素数和各类别数量，并维护中心点坐标的最小/最大值
+        
+        Args:
+            geojson_path: .geojsonl 文件路径
+            
+        Returns:
+            (要素数, 各类别数量, (lat_min, lat_max, lon_min, lon_max))，无中心点坐标时范围为None
+        """
+        feature_count = 0
+        class_names = []
+        lat_min = lon_min = float('inf')
+        lat_max = lon_max = float('-inf')
+        
+        with open(geojson_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                feature_count += 1
+                props = _loads(line).get('properties', {})
+                class_names.append(props.get('class_name'))
+                if 'center_lat' in props and 'center_lon' in props:
+                    lat = props['center_lat']
+                    lon = props['center_lon']
+                    if lat < lat_min:
+                        lat_min = lat
+                    if lat > lat_max:
+                        lat_max = lat
+                    if lon < lon_min:
+                        lon_min = lon
+                    if lon > lon_max:
+                        lon_max = lon
+        
+        class_counts = _count_classes(class_names)
+        if lat_min > lat_max or lon_min > lon_max:
+            return feature_count, class_counts, None
+        return feature_count, class_counts, (lat_min, lat_max, lon_min, lon_max)
+    
+    def _write_map(
+        self,
+        output_path: str,
+        write_data,
+        feature_count: int,
+        class_counts: Dict[str, int],
+        view: tuple
+    ) -> str:
+        """
+        创建输出目录并写入HTML地图文件
+        
+        Args:
+            output_path: HTML输出路径
+            write_data: 向文件写入GeoJSON数据的函数 f -> None
+            feature_count: 要素数
+            class_counts: 各类别数量
+            view: (center_lat, center_lon, zoom_level)
+            
+        Returns:
+            生成的HTML文件路径
+        """
+        output_dir = os.path.dirname(output_path)
+        ensure_dir(output_dir)
+        asset_bases = self._prepare_assets(output_dir)
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            self._write_html(f, write_data, feature_count, class_counts, asset_bases, *view)
+        
+        logger.info(f"✓ 生成HTML地图: {output_path}")
+        return output_path
+    
+    def _prepare_assets(self, output_dir: str) -> tuple:
+        """
+        将本地Leaflet资源复制到地图旁，返回页面引用的资源地址前缀
+        
+        同一目标目录只复制一次；资源目录未配置或缺少文件时对应资源使用CDN。
+        
+        Args:
+            output_dir: HTML输出目录
+            
+        Returns:
+            (Leaflet地址前缀, VectorGrid地址前缀)
+        """
+        if not self.assets_dir:
+            return (LEAFLET_CDN, VECTOR_GRID_CDN)
+        
+        if output_dir not in self._copied_assets:
+            has_leaflet = all(
+                os.path.isfile(os.path.join(self.assets_dir, name)) for name in LEAFLET_FILES
+            )
+            has_vector_grid = os.path.isfile(os.path.join(self.assets_dir, VECTOR_GRID_FILE))
+            
+            if has_leaflet:
+                # leaflet.css 按相对路径引用 images/ 下的图标，整个目录一并复制
+                target = os.path.join(output_dir, ASSETS_SUBDIR)
+                if os.path.abspath(self.assets_dir) != os.path.abspath(target):
+                    shutil.copytree(self.assets_dir, target, dirs_exist_ok=True)
+                logger.info(f"地图使用本地Leaflet资源: {target}")
+            else:
+                logger.warning(f"本地资源目录缺少 {'/'.join(LEAFLET_FILES)}，地图使用CDN: {self.assets_dir}")
+            
+            self._copied_assets[output_dir] = (has_leaflet, has_leaflet and has_vector_grid)
+        
+        has_leaflet, has_vector_grid = self._copied_assets[output_dir]
+        local_base = ASSETS_SUBDIR + '/'
+        return (
+            local_base if has_leaflet else LEAFLET_CDN,
+            local_base if has_vector_grid else VECTOR_GRID_CDN,
+        )
+    
+    def _calculate_map_center(
+        self, 
+        geojson_data: Dict[str, Any]
+    ) -> tuple:
+        """
+        计算地图中心和缩放级别
+        
+        Args:
+            geojson_data: GeoJSON数据
+            
+        Returns:
+            (center_lat, center_lon, zoom_level)
+        """
+        features = geojson_data.get('features', [])
+        
+        # 提取所有中心点坐标
+        lats = []
+        lons = []
+        
+        for feature in features:
+            props = feature.get('properties', {})
+            if 'center_lat' in props and 'center_lon' in props:
+                lats.append(props['center_lat'])
+                lons.append(props['center_lon'])
+        
+        return self._map_view(
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lons, dtype=np.float64)
+        )
+    
+    @staticmethod
+    def _map_view(lats: np.ndarray, lons: np.ndarray) -> tuple:
+        """
+        由中心点坐标数组计算地图中心和缩放级别
+        
+        Args:
+            lats: 纬度数组
+            lons: 经度数组
+            
+        Returns:
+            (center_lat, center_lon, zoom_level)
+        """
+        if len(lats) == 0 or len(lons) == 0:
+            return (23.0, 114.0, 12)  # 默认深圳地区
+        
+        return MapGenerator._view_from_bounds(
+            float(lats.min()), float(lats.max()),
+            float(lons.min()), float(lons.max())
+        )
+    
+    @staticmethod
+    def _view_from_bounds(lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> tuple:
+        """
+        由中心点坐标范围计算地图中心和缩放级别
+        
+        Args:
+            lat_min, lat_max: 纬度范围
+            lon_min, lon_max: 经度范围
+            
+        Returns:
+            (center_lat, center_lon, zoom_level)
+        """
+        # 计算中心点
+        center_lat = (lat_min + lat_max) / 2
+        center_lon = (lon_min + lon_max) / 2
         
-        return html
+        # 根据范围估算缩放级别
+        max_range = max(lat_max - lat_min, lon_max - lon_min)
+        
+        # 简单的缩放级别估算
+        if max_range < 0.001:
+            zoom_level = 18  # 很小的区域
+        elif max_range < 0.01:
+            zoom_level = 15
+        elif max_range < 0.05:
+            zoom_level = 13
+        else:
+            zoom_level = 11
+        
+        return (center_lat, center_lon, zoom_level)
+    
+    def _is_tiled(self, feature_count: int) -> bool:
+        """要素数是否超过切片渲染阈值"""
+        return self.tile_threshold > 0 and feature_count > self.tile_threshold
+    
+    def _write_html(
+        self,
+        f,
+        write_data,
+        feature_count: int,
+        class_counts: Dict[str, int],
+        asset_bases: tuple,
+        center_lat: float,
+        center_lon: float,
+        zoom_level: int
+    ):
+        """
+        将HTML内容分段写入文件
+        
+        静态模板原样写入，只格式化地图初始化语句；GeoJSON数据由
+        write_data 逐段写入，不在内存中拼出完整的HTML字符串。
+        
+        Args:
+            f: 已打开的二进制文件对象
+            write_data: 向文件写入GeoJSON数据的函数 f -> None
+            feature_count: 要素数（决定是否按视口切片渲染）
+            class_counts: 各类别数量（图例）
+            asset_bases: (Leaflet地址前缀, VectorGrid地址前缀)
+            center_lat: 地图中心纬度
+            center_lon: 地图中心经度
+            zoom_level: 缩放级别
+        """
+        tiled = self._is_tiled(feature_count)
+        if tiled:
+            logger.info(f"要素数 {feature_count} 超过 {self.tile_threshold}，地图按视口切片渲染")
+        
+        leaflet_base, vector_grid_base = asset_bases
+        
+        f.write(''.join([
+            HTML_HEAD,
+            HTML_LEAFLET_ASSETS.format(base=leaflet_base),
+            HTML_VECTOR_GRID_SCRIPT.format(base=vector_grid_base) if tiled else '',
+            HTML_BODY,
+            HTML_MAP_VIEW.format(
+                center_lat=center_lat,
+                center_lon=center_lon,
+                zoom_level=zoom_level
+            ),
+            self._tile_layer_script,
+            HTML_DATA_PREFIX,
+        ]).encode('utf-8'))
+        write_data(f)
+        f.write(b''.join([
+            self._colors_script,
+            self._counts_prefix,
+            _dumps(class_counts),
+            self._script_tails[tiled],
+        ]))
@@ -0,0 +1,32 @@
+"""
+输出目录工具
+记录本进程内已确认存在的目录，批量生成文件时不再重复 os.makedirs 的逐级 stat
+"""
+
+import os
+
+
+# 已创建或确认存在的目录（规范化后的绝对路径）
+_ENSURED_DIRS = set()
+
+
+def ensure_dir(path: str):
+    """
+    确保目录存在，同一目录在本进程内只调用一次 os.makedirs
+
+    运行期间被外部删除的目录不会重新创建，需要时调用 forget_dirs 清空记录。
+
+    Args:
+        path: 目录路径（空字符串表示当前目录，直接返回）
+    """
+    if not path:
+        return
+    key = os.path.abspath(path)
+    if key not in _ENSURED_DIRS:
+        os.makedirs(key, exist_ok=True)
+        _ENSURED_DIRS.add(key)
+
+
+def forget_dirs():
+    """清空已确认目录的记录"""
+    _ENSURED_DIRS.clear()
@@ -19,6 +19,51 @@ from loguru import logger
 from .deduplication import DetectionDeduplicator
 from .geojson_writer import GeoJSONWriter
 from .map_generator import MapGenerator
+from .paths import ensure_dir
+
+try:
+    import pyarrow  # noqa: F401  (pandas read_csv 的 pyarrow 解析引擎)
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# 检测结果CSV的已知列类型（对应 CSVWriter.fieldnames），读取时不再逐列推断；
+# 浮点列保持float64，避免导出的GeoJSON属性值因精度变化而改变。
+# 可能整列为空的文本列（边缘位置、GPS质量等）仍由pandas推断，全空时按浮点NaN存储；
+# datetime 显式指定为文本，避免pyarrow引擎将其解析为时间类型
+CSV_DTYPES = {
+    'timestamp': 'float64',
+    'frame_number': 'int32',
+    'datetime': str,
+    'class_id': 'int32',
+    'class_name': str,
+    'confidence': 'float64',
+    'corner1_lat': 'float64',
+    'corner1_lon': 'float64',
+    'corner2_lat': 'float64',
+    'corner2_lon': 'float64',
+    'corner3_lat': 'float64',
+    'corner3_lon': 'float64',
+    'corner4_lat': 'float64',
+    'corner4_lon': 'float64',
+    'center_lat': 'float64',
+    'center_lon': 'float64',
+    'altitude': 'float64',
+    'drone_lat': 'float64',
+    'drone_lon': 'float64',
+    'is_on_edge': bool,
+    'estimated_error': 'float64',
+    'gps_level': 'int32',
+    'satellite_count': 'int32',
+}
+
+# 统计摘要中需要最小/最大/均值/中位数的数值列
+SUMMARY_STAT_COLUMNS = ['confidence', 'center_lat', 'center_lon', 'altitude', 'estimated_error']
+
+# 覆盖范围估算：每度纬度的米数、赤道处每度经度的米数（与 camera_model 默认值一致）
+METERS_PER_DEG_LAT = 110540.0
+METERS_PER_DEG_LON_EQUATOR = 111320.0
 
 
 class PostProcessor:
@@ -92,7 +137,7 @@ class PostProcessor:
             logger.info("="*60)
             
             # 读取CSV数据
-            df_raw = pd.read_csv(csv_path)
+            df_raw = self._read_detections(csv_path)
             logger.info(f"读取检测数据: {len(df_raw)} 条记录")
             
             if len(df_raw) == 0:
@@ -133,18 +178,29 @@ class PostProcessor:
                 results['files']['geojson'] = geojson_files
             
             # 任务3：生成HTML地图（使用去重后的数据）
-            if self.enable_map and self.map_generator and geojson_files:
+            if self.enable_map and self.map_generator and self.geojson_writer:
                 logger.info("生成HTML地图...")
                 map_path = self.config.get('map_output_path', 
                                           os.path.join(output_base_dir, 'map.html'))
                 
                 # 确保目录存在
-                os.makedirs(os.path.dirname(map_path), exist_ok=True)
+                ensure_dir(os.path.dirname(map_path))
                 
-                # 使用去重后的GeoJSON生成地图
-                map_file = self.map_generator.generate(
-                    geojson_files['unique'], 
-                    map_path
+                # 直接在内存中构建去重后的FeatureCollection，不再读回刚导出的GeoJSON文件；
+                # 地图仅用于浏览，坐标按 map_coord_precision 取整以减小页面体积
+                geojson_data, df_map = self.geojson_writer.build_feature_collection(
+                    df_unique,
+                    coord_precision=self.config.get('map_coord_precision', 7)
+                )
+                
+                # 逐条对应时地图范围直接按数据框的坐标列计算
+                if len(df_map) != len(geojson_data['features']):
+                    df_map = None
+                
+                map_file = self.map_generator.generate_from_data(
+                    geojson_data,
+                    map_path,
+                    df=df_map
                 )
                 
                 if map_file:
@@ -193,6 +249,28 @@ class PostProcessor:
             results['error'] = str(e)
             return results
     
+    @staticmethod
+    def _read_detections(csv_path: str) -> pd.DataFrame:
+        """
+        按预设列类型读取检测结果CSV（安装了pyarrow时使用pyarrow引擎）
+        
+        旧版本或手工编辑的CSV可能含空值或非预期类型，按预设类型解析失败时
+        改为自动推断类型重新读取。
+        
+        Args:
+            csv_path: CSV文件路径
+            
+        Returns:
+            检测数据框
+        """
+        try:
+            if PYARROW_AVAILABLE:
+                return pd.read_csv(csv_path, dtype=CSV_DTYPES, engine='pyarrow')
+            return pd.read_csv(csv_path, dtype=CSV_DTYPES)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"按预设列类型读取CSV失败，改为自动推断类型: {e}")
+            return pd.read_csv(csv_path)
+    
     def _generate_summary(
         self, 
         df_raw: pd.DataFrame, 
@@ -211,78 +289,97 @@ class PostProcessor:
             生成的文件路径
         """
         try:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write("="*70 + "\n")
-                f.write("石马河四乱检测系统 - 检测结果统计摘要\n")
-                f.write("="*70 + "\n\n")
-                
-                # 基本统计
-                f.write("## 1. 数据概览\n")
-                f.write("-"*70 + "\n")
-                f.write(f"原始检测总数: {len(df_raw)} 条\n")
-                
-                if self.enable_dedup and len(df_unique) != len(df_raw):
-                    removed = len(df_raw) - len(df_unique)
-                    rate = removed / len(df_raw) * 100 if len(df_raw) > 0 else 0
-                    f.write(f"去重后数量: {len(df_unique)} 条\n")
-                    f.write(f"去除重复: {removed} 条 ({rate:.1f}%)\n")
-                
-                # 使用去重后的数据进行统计
-                df = df_unique if len(df_unique) > 0 else df_raw
-                
-                # 按类别统计
-                f.write("\n## 2. 按类别统计\n")
-                f.write("-"*70 + "\n")
-                class_counts = df['class_name'].value_counts()
-                for class_name, count in class_counts.items():
-                    percentage = count / len(df) * 100
-                    f.write(f"  {class_name:20s}: {count:5d} ({percentage:5.1f}%)\n")
-                
-                # 置信度统计
-                f.write("\n## 3. 置信度统计\n")
-                f.write("-"*70 + "\n")
-                f.write(f"  平均置信度: {df['confidence'].mean():.3f}\n")
-                f.write(f"  最高置信度: {df['confidence'].max():.3f}\n")
-                f.write(f"  最低置信度: {df['confidence'].min():.3f}\n")
-                f.write(f"  中位数置信度: {df['confidence'].median():.3f}\n")
-                
-                # 地理坐标范围
-                f.write("\n## 4. 地理坐标范围\n")
-                f.write("-"*70 + "\n")
-                f.write(f"  纬度范围: {df['center_lat'].min():.6f} ~ {df['center_lat'].max():.6f}\n")
-                f.write(f"  经度范围: {df['center_lon'].min():.6f} ~ {df['center_lon'].max():.6f}\n")
-                f.write(f"  高度范围: {df['altitude'].min():.1f}m ~ {df['altitude'].max():.1f}m\n")
-                
-                # 计算覆盖范围
-                lat_range = (df['center_lat'].max() - df['center_lat'].min()) * 110540
-                lon_avg_lat = df['center_lat'].mean()
-                lon_range = (df['center_lon'].max() - df['center_lon'].min()) * 111320 * math.cos(math.radians(lon_avg_lat))
-                f.write(f"  覆盖范围: 约 {lat_range:.0f}m × {lon_range:.0f}m\n")
-                
-                # GPS质量统计（如果有）
-                if 'gps_quality' in df.columns and df['gps_quality'].notna().any():
-                    f.write("\n## 5. GPS质量统计\n")
-                    f.write("-"*70 + "\n")
-                    quality_counts = df['gps_quality'].value_counts()
-                    for quality, count in quality_counts.items():
-                        percentage = count / len(df) * 100
-                        f.write(f"  {quality:15s}: {count:5d} ({percentage:5.1f}%)\n")
-                    
-                    if 'estimated_error' in df.columns:
-                        f.write(f"\n  平均定位误差: {df['estimated_error'].mean():.2f}m\n")
-                        f.write(f"  最大定位误差: {df['estimated_error'].max():.2f}m\n")
-                
-                # 边缘检测统计
-                if 'is_on_edge' in df.columns:
-                    edge_count = df['is_on_edge'].sum()
-                    f.write("\n## 6. 边缘检测统计\n")
-                    f.write("-"*70 + "\n")
-                    f.write(f"  边缘检测数: {edge_count} ({edge_count/len(df)*100:.1f}%)\n")
-                    f.write(f"  完整检测数: {len(df) - edge_count} ({(len(df)-edge_count)/len(df)*100:.1f}%)\n")
+            # 各行先收集到列表，最后一次写入文件
+            parts = []
+            
+            parts.append("="*70 + "\n")
+            parts.append("石马河四乱检测系统 - 检测结果统计摘要\n")
+            parts.append("="*70 + "\n\n")
+            
+            # 基本统计
+            parts.append("## 1. 数据概览\n")
+            parts.append("-"*70 + "\n")
+            n_raw = len(df_raw)
+            n_unique = len(df_unique)
+            parts.append(f"原始检测总数: {n_raw} 条\n")
+            
+            if self.enable_dedup and n_unique != n_raw:
+                removed = n_raw - n_unique
+                rate = removed / n_raw * 100 if n_raw > 0 else 0
+                parts.append(f"去重后数量: {n_unique} 条\n")
+                parts.append(f"去除重复: {removed} 条 ({rate:.1f}%)\n")
+            
+            # 使用去重后的数据进行统计
+            df = df_unique if n_unique > 0 else df_raw
+            total = len(df)
+            columns = set(df.columns)
+            
+            # 数值列的统计量一次聚合得到
+            stat_columns = [column for column in SUMMARY_STAT_COLUMNS if column in columns]
+            stats = df[stat_columns].agg(['min', 'max', 'mean', 'median'])
+            
+            # 按类别统计
+            parts.append("\n## 2. 按类别统计\n")
+            parts.append("-"*70 + "\n")
+            class_counts = df['class_name'].value_counts()
+            parts.extend(
+                f"  {class_name:20s}: {count:5d} ({count / total * 100:5.1f}%)\n"
+                for class_name, count in class_counts.items()
+            )
+            
+            # 置信度统计
+            confidence = stats['confidence']
+            parts.append("\n## 3. 置信度统计\n")
+            parts.append("-"*70 + "\n")
+            parts.extend(
+                f"  {label}置信度: {confidence[stat]:.3f}\n"
+                for label, stat in (('平均', 'mean'), ('最高', 'max'), ('最低', 'min'), ('中位数', 'median'))
+            )
+            
+            # 地理坐标范围
+            lat = stats['center_lat']
+            lon = stats['center_lon']
+            altitude = stats['altitude']
+            parts.append("\n## 4. 地理坐标范围\n")
+            parts.append("-"*70 + "\n")
+            parts.append(f"  纬度范围: {lat['min']:.6f} ~ {lat['max']:.6f}\n")
+            parts.append(f"  经度范围: {lon['min']:.6f} ~ {lon['max']:.6f}\n")
+            parts.append(f"  高度范围: {altitude['min']:.1f}m ~ {altitude['max']:.1f}m\n")
+            
+            # 计算覆盖范围（经度方向按平均纬度处的余弦缩放）
+            cos_lat = math.cos(math.radians(lat['mean']))
+            lat_range = (lat['max'] - lat['min']) * METERS_PER_DEG_LAT
+            lon_range = (lon['max'] - lon['min']) * METERS_PER_DEG_LON_EQUATOR * cos_lat
+            parts.append(f"  覆盖范围: 约 {lat_range:.0f}m × {lon_range:.0f}m\n")
+            
+            # GPS质量统计（如果有；value_counts 不计空值，结果为空即整列无数据）
+            quality_counts = df['gps_quality'].value_counts() if 'gps_quality' in columns else None
+            if quality_counts is not None and len(quality_counts) > 0:
+                parts.append("\n## 5. GPS质量统计\n")
+                parts.append("-"*70 + "\n")
+                parts.extend(
+                    f"  {quality:15s}: {count:5d} ({count / total * 100:5.1f}%)\n"
+                    for quality, count in quality_counts.items()
+                )
                 
-                f.write("\n" + "="*70 + "\n")
-                f.write("统计摘要生成完成\n")
-                f.write("="*70 + "\n")
+                if 'estimated_error' in stats.columns:
+                    parts.append(f"\n  平均定位误差: {stats['estimated_error']['mean']:.2f}m\n")
+                    parts.append(f"  最大定位误差: {stats['estimated_error']['max']:.2f}m\n")
+            
+            # 边缘检测统计
+            if 'is_on_edge' in columns:
+                edge_count = df['is_on_edge'].sum()
+                parts.append("\n## 6. 边缘检测统计\n")
+                parts.append("-"*70 + "\n")
+                parts.append(f"  边缘检测数: {edge_count} ({edge_count/total*100:.1f}%)\n")
+                parts.append(f"  完整检测数: {total - edge_count} ({(total-edge_count)/total*100:.1f}%)\n")
+            
+            parts.append("\n" + "="*70 + "\n")
+            parts.append("统计摘要生成完成\n")
+            parts.append("="*70 + "\n")
+            
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(parts))
             
             logger.info(f"✓ 生成统计摘要: {output_path}")
             return output_path
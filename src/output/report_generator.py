@@ -4,6 +4,9 @@
 """
 
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 import numpy as np
 from loguru import logger
@@ -11,6 +14,10 @@ from .csv_writer import CSVWriter
 from .image_saver import ImageSaver
 
 
+# 后台保存时单个任务至少包含的检测目标数（分块越细，复制帧的次数越多）
+MIN_DETECTIONS_PER_TASK = 4
+
+
 class ReportGenerator:
     """报告生成器类"""
     
@@ -22,7 +29,10 @@ class ReportGenerator:
         image_format: str = "full",
         image_quality: int = 90,
         csv_write_mode: str = "overwrite",
-        post_process_config: dict = None
+        post_process_config: dict = None,
+        io_workers: int = 0,
+        copy_frames: bool = True,
+        drop_images_when_busy: bool = False
     ):
         """
         初始化报告生成器
@@ -35,6 +45,10 @@ class ReportGenerator:
             image_quality: 图像质量
             csv_write_mode: CSV写入模式
             post_process_config: 后处理配置（可选）
+            io_workers: 后台JPEG编码线程数 (0表示在调用线程中同步保存)
+            copy_frames: 后台保存前是否拷贝帧（读取器复用帧缓冲时必须为True）
+            drop_images_when_busy: 后台积压超限时丢弃最早几帧尚未开始的截图，
+                而不是阻塞调用线程（实时模式使用；CSV记录照常写入，图像路径为空）
         """
         self.csv_path = csv_path
         self.image_dir = image_dir
@@ -48,6 +62,23 @@ class ReportGenerator:
         if save_images:
             self.image_saver = ImageSaver(image_dir, image_format, image_quality)
         
+        # 后台图像保存：JPEG编码在线程池中进行（OpenCV编码时释放GIL），
+        # CSV按提交顺序写入，保证记录顺序与帧顺序一致；任务完成时唤醒写入线程，
+        # 没有新帧到来时已完成帧的记录也不会滞留
+        self._io_pool = None
+        self.copy_frames = copy_frames
+        self._pending = deque()
+        self._pending_lock = threading.RLock()  # 保护 _pending（调用线程与写入线程共用）
+        self._drain_event = threading.Event()
+        self._max_pending = max(1, io_workers) * 4
+        self._io_workers = max(1, io_workers)
+        self.drop_images_when_busy = drop_images_when_busy
+        self.dropped_images = 0
+        if io_workers > 0 and self.image_saver:
+            self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='report-io')
+            threading.Thread(target=self._drain_loop, name='report-drain', daemon=True).start()
+            logger.info(f"后台图像保存已启用 ({io_workers} 线程)")
+        
         # 初始化后处理器（v2.1新增）
         self.post_processor = None
         if post_process_config:
@@ -81,22 +112,125 @@ class ReportGenerator:
         if not detections:
             return
         
+        if self._io_pool is not None:
+            # 读取器复用帧缓冲时提交前拷贝，否则后台线程直接引用该帧
+            frame = image.copy() if self.copy_frames else image
+            
+            # 检测目标较多的帧分块交给多个线程并行编码（每块复制一次帧用于绘制）
+            chunk_size = max(MIN_DETECTIONS_PER_TASK, -(-len(detections) // self._io_workers))
+            with self._pending_lock:
+                tasks = [
+                    (self._io_pool.submit(
+                        self.image_saver.save_batch, frame, detections[start:start + chunk_size],
+                        frame_number, start
+                    ), len(detections[start:start + chunk_size]))
+                    for start in range(0, len(detections), chunk_size)
+                ]
+                self._pending.append((tasks, detections, pose, frame_number))
+                
+                # 积压过多时等待最早的任务（或丢弃其截图），限制内存占用
+                over_limit = len(self._pending) > self._max_pending
+                if over_limit and self.drop_images_when_busy:
+                    self._drop_oldest()
+                self._drain(block=over_limit and not self.drop_images_when_busy)
+            
+            for future, _ in tasks:
+                future.add_done_callback(self._on_task_done)
+            return
+        
         try:
             # 保存图像（如果启用）
             image_paths = []
             if self.save_images and self.image_saver:
                 image_paths = self.image_saver.save_batch(image, detections, frame_number)
             
-            # 写入CSV
-            for i, detection in enumerate(detections):
-                image_path = image_paths[i] if i < len(image_paths) else ""
-                self.csv_writer.write(detection, pose, frame_number, image_path)
-            
-            logger.debug(f"帧 {frame_number} 的 {len(detections)} 个检测结果已保存")
+            self._write_csv(detections, pose, frame_number, image_paths)
             
         except Exception as e:
             logger.error(f"保存检测结果时发生错误: {e}")
     
+    def _write_csv(
+        self,
+        detections: List[Dict[str, Any]],
+        pose: Dict[str, Any],
+        frame_number: int,
+        image_paths: List[str]
+    ):
+        """写入一帧的CSV记录"""
+        self.csv_writer.write_batch(detections, pose, frame_number, image_paths)
+        
+        logger.debug("帧 {} 的 {} 个检测结果已保存", frame_number, len(detections))
+    
+    def _on_task_done(self, future):
+        """
+        图像保存任务完成（或被取消）时唤醒写入线程
+        
+        回调在线程池的工作线程中执行，不能在此等待 _pending_lock：
+        调用线程可能正持锁等待排在后面的任务，工作线程被占用会导致死锁。
+        """
+        self._drain_event.set()
+    
+    def _drain_loop(self):
+        """写入线程：任务完成后按提交顺序写入已就绪帧的CSV记录，报告生成器关闭后退出"""
+        while True:
+            self._drain_event.wait()
+            self._drain_event.clear()
+            if self._io_pool is None:
+                return
+            self._drain()
+    
+    def _drop_oldest(self):
+        """取消超出积压上限的最早几帧中尚未开始的截图任务（调用方持有 _pending_lock，正在编码的任务无法取消）"""
+        # 取消任务会同步触发 _on_task_done，回调只唤醒写入线程、不取锁也不触碰 _pending（否则可能死锁）；
+        # 被取消帧的CSV记录随后由持有 _pending_lock 的 _drain 写出（save 中紧接着的调用或 report-drain 线程）
+        excess = len(self._pending) - self._max_pending
+        oldest = [(tasks, frame_number) for tasks, _, _, frame_number in list(self._pending)[:max(0, excess)]]
+        for tasks, frame_number in oldest:
+            dropped = sum(count for future, count in tasks if not future.cancelled() and future.cancel())
+            if dropped:
+                self.dropped_images += dropped
+                logger.warning(f"后台图像保存积压，丢弃帧 {frame_number} 的 {dropped} 张截图")
+    
+    def _drain(self, block: bool = False, wait_all: bool = False):
+        """
+        按提交顺序写入已完成图像保存的帧的CSV记录
+        
+        Args:
+            block: 积压超限时是否等待队首任务，直到不再超限
+            wait_all: 是否等待全部任务完成
+        """
+        with self._pending_lock:
+            self._drain_locked(block, wait_all)
+    
+    def _drain_locked(self, block: bool, wait_all: bool):
+        """_drain 的实现（调用方持有 _pending_lock）"""
+        while self._pending:
+            tasks, detections, pose, frame_number = self._pending[0]
+            over_limit = block and len(self._pending) > self._max_pending
+            if not (wait_all or over_limit or all(future.done() for future, _ in tasks)):
+                break
+            
+            self._pending.popleft()
+            image_paths = []
+            for future, count in tasks:
+                if future.cancelled():
+                    image_paths.extend([""] * count)
+                    continue
+                try:
+                    image_paths.extend(future.result())
+                except Exception as e:
+                    logger.error(f"保存检测图像时发生错误: {e}")
+                    image_paths.extend([""] * count)
+            
+            try:
+                self._write_csv(detections, pose, frame_number, image_paths)
+            except Exception as e:
+                logger.error(f"保存检测结果时发生错误: {e}")
+    
+    def flush(self):
+        """等待后台图像保存全部完成，并写入剩余CSV记录"""
+        self._drain(wait_all=True)
+    
     def save_realtime(
         self,
         detections: List[Dict[str, Any]],
@@ -117,6 +251,7 @@ class ReportGenerator:
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
+        self.flush()
         csv_stats = self.csv_writer.get_stats()
         
         stats = {
@@ -129,11 +264,19 @@ class ReportGenerator:
             image_stats = self.image_saver.get_stats()
             stats['image_dir'] = self.image_dir
             stats['image_save_count'] = image_stats['save_count']
+            stats['image_dropped_count'] = self.dropped_images
         
         return stats
     
     def close(self):
         """关闭报告生成器，释放资源，并执行后处理"""
+        # 0. 等待后台图像保存完成
+        if getattr(self, '_io_pool', None) is not None:
+            self.flush()
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+            self._drain_event.set()
+        
         # 1. 关闭CSV写入器
         if hasattr(self, 'csv_writer') and self.csv_writer is not None:
             self.csv_writer.close()
@@ -171,3 +314,5 @@ class ReportGenerator:
         if stats.get('save_images'):
             logger.info(f"图像目录: {stats.get('image_dir', 'N/A')}")
             logger.info(f"保存图像数: {stats.get('image_save_count', 0)}")
+            if stats.get('image_dropped_count'):
+                logger.info(f"积压丢弃图像数: {stats['image_dropped_count']}")
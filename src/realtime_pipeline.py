@@ -66,7 +66,8 @@ class RealtimePipeline:
             buffer_size=rtsp_config.get('buffer_size', 30),
             reconnect_interval=rtsp_config.get('reconnect_interval', 5),
             max_reconnect_attempts=rtsp_config.get('max_reconnect_attempts', 0),
-            transport_protocol=rtsp_config.get('transport_protocol', 'tcp')
+            transport_protocol=rtsp_config.get('transport_protocol', 'tcp'),
+            use_process=rtsp_config.get('use_process', False)
         )
         
         # OSD数据源：根据 osd_source 配置初始化
@@ -131,7 +132,10 @@ class RealtimePipeline:
             class_names=classes_config.get('names', {}),
             target_classes=classes_config.get('target_classes'),
             tracker_type=tracking_config.get('tracker', 'bytetrack.yaml'),
-            obb_mode=model_config.get('obb_mode', False)
+            obb_mode=model_config.get('obb_mode', False),
+            gpu_preprocess=model_config.get('gpu_preprocess', True),
+            cpu_preprocess=model_config.get('cpu_preprocess', False),
+            engine_path=model_config.get('engine', '')
         )
         
         # 目标跟踪管理器（延迟保存策略）
@@ -168,7 +172,9 @@ class RealtimePipeline:
             image_format=output_config.get('image_format', 'full'),
             image_quality=output_config.get('image_quality', 85),
             csv_write_mode=output_config.get('csv_write_mode', 'append'),
-            post_process_config=output_config  # 传递完整配置以启用后处理
+            post_process_config=output_config,  # 传递完整配置以启用后处理
+            io_workers=output_config.get('io_workers', 0),
+            drop_images_when_busy=output_config.get('io_drop_when_busy', False)
         )
         
         # 可视化器
@@ -193,7 +199,9 @@ class RealtimePipeline:
                     cache_enabled=True,
                     frame_interval=ocr_config.get('frame_interval', 10),  # 实时模式间隔更大
                     use_gpu=ocr_config.get('use_gpu', False),
-                    language=ocr_config.get('language', 'ch')
+                    language=ocr_config.get('language', 'ch'),
+                    use_tensorrt=ocr_config.get('use_tensorrt', False),
+                    precision=ocr_config.get('precision', 'fp32')
                 )
                 logger.info("OCR备用功能已启用")
             except Exception as e:
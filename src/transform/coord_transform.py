@@ -253,7 +253,118 @@ class CoordinateTransformer:
             transformed.append(transformed_detection)
         
         return transformed
-    
+
+    def transform_detections_batch(
+        self,
+        batch: List[Tuple[List[Dict[str, Any]], Dict[str, Any]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        多帧检测结果一次性坐标转换
+
+        将N帧×K个检测框的角点拼成 (M, 4, 2) 数组，按所属帧的航向旋转矩阵
+        用一次 einsum 完成投影，结果与逐帧调用 transform_detections 一致
+
+        Args:
+            batch: [(检测结果列表, 位姿), ...]
+
+        Returns:
+            每帧转换后的检测结果列表，顺序与输入一致
+        """
+        flat_dets = []
+        frame_index = []
+
+        for i, (detections, pose) in enumerate(batch):
+            for detection in detections:
+                corners = detection.get('corners')
+                if corners is not None and len(corners) == 4:
+                    flat_dets.append(detection)
+                    frame_index.append(i)
+                else:
+                    # 角点数不规则的检测框走逐个转换
+                    self.transform_detection(detection, pose)
+
+        if flat_dets:
+            self._project_corners_batch(flat_dets, frame_index, [pose for _, pose in batch])
+
+        return [list(detections) for detections, _ in batch]
+
+    def _project_corners_batch(
+        self,
+        detections: List[Dict[str, Any]],
+        frame_index: List[int],
+        poses: List[Dict[str, Any]]
+    ):
+        """
+        向量化的像素→地理坐标投影（算法同 pixel_to_geo）
+
+        Args:
+            detections: 待转换的检测结果（均为4个角点），原地写入 geo_coords / center_geo
+            frame_index: 每个检测结果所属的位姿下标
+            poses: 位姿列表 (WGS84)
+        """
+        n = len(poses)
+        frame_lat = np.empty(n)
+        frame_lon = np.empty(n)
+        gsd = np.empty((n, 2))
+        rotation = np.empty((n, 2, 2))
+        lon_scale = np.empty(n)
+
+        # 每帧的标量参数用math计算，保证与逐帧路径数值完全一致
+        for i, pose in enumerate(poses):
+            drone_lat = pose.get('latitude', 0)
+            altitude = pose.get('altitude', 0)
+
+            if altitude == 0:
+                logger.warning("飞行高度为0，坐标转换可能不准确")
+            if self.camera.use_attitude_correction and abs(pose.get('pitch', -90) + 90) >= 5:
+                logger.warning("当前版本暂不支持非垂直拍摄的姿态修正，使用简化算法")
+
+            yaw_rad = radians(pose.get('yaw', 0))
+            cos_yaw = cos(yaw_rad)
+            sin_yaw = sin(yaw_rad)
+
+            frame_lat[i] = drone_lat
+            frame_lon[i] = pose.get('longitude', 0)
+            gsd[i] = self.camera.calculate_gsd(altitude)
+            # 图像坐标系 → 东-北坐标系
+            rotation[i] = ((cos_yaw, sin_yaw), (-sin_yaw, cos_yaw))
+            lon_scale[i] = self.camera.meters_per_degree_lon * cos(radians(drone_lat))
+
+        idx = np.asarray(frame_index)
+        corners = np.asarray([det['corners'] for det in detections], dtype=np.float64)  # (M, 4, 2)
+
+        # 像素偏移 → 地面距离 (米)，图像Y向下取负
+        offsets = np.empty_like(corners)
+        offsets[..., 0] = (corners[..., 0] - self.camera.cx) * gsd[idx, 0, None]
+        offsets[..., 1] = -(corners[..., 1] - self.camera.cy) * gsd[idx, 1, None]
+
+        # (M, 2, 2) × (M, 4, 2) → (M, 4, 2) [east, north]
+        enu = np.einsum('mij,mkj->mki', rotation[idx], offsets)
+
+        lat = frame_lat[idx, None] + enu[..., 1] / self.camera.meters_per_degree_lat
+        lon = frame_lon[idx, None] + enu[..., 0] / lon_scale[idx, None]
+
+        # WGS84 → CGCS2000，pyproj支持数组输入
+        if self.enable_cgcs2000:
+            try:
+                lon_cgcs, lat_cgcs = self.wgs84_to_cgcs2000.transform(lon, lat)
+                lat, lon = np.asarray(lat_cgcs), np.asarray(lon_cgcs)
+            except Exception as e:
+                logger.error(f"坐标转换失败: {e}，返回WGS84坐标")
+
+        # 中心点按角点顺序累加，与逐帧路径的求和顺序一致
+        center_lat = (((lat[:, 0] + lat[:, 1]) + lat[:, 2]) + lat[:, 3]) / 4
+        center_lon = (((lon[:, 0] + lon[:, 1]) + lon[:, 2]) + lon[:, 3]) / 4
+
+        lat_rows = lat.tolist()
+        lon_rows = lon.tolist()
+        center_lat = center_lat.tolist()
+        center_lon = center_lon.tolist()
+
+        for m, detection in enumerate(detections):
+            detection['geo_coords'] = list(zip(lat_rows[m], lon_rows[m]))
+            detection['center_geo'] = (center_lat[m], center_lon[m])
+
     def validate_geo_coords(self, lat: float, lon: float) -> bool:
         """
         验证地理坐标是否合法
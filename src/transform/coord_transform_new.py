@@ -479,9 +479,8 @@ class CoordinateTransformerEnhanced:
         if altitude == 0:
             logger.warning("飞行高度为0，坐标转换可能不准确")
         
-        logger.debug(f"[3D转换] GPS({drone_lat:.6f}, {drone_lon:.6f}), "
-                    f"高度{altitude:.1f}m, "
-                    f"姿态(yaw={yaw:.1f}°, pitch={pitch:.1f}°, roll={roll:.1f}°)")
+        logger.debug("[3D转换] GPS({:.6f}, {:.6f}), 高度{:.1f}m, 姿态(yaw={:.1f}°, pitch={:.1f}°, roll={:.1f}°)",
+                     drone_lat, drone_lon, altitude, yaw, pitch, roll)
         
         # 2. 像素 -> 相机射线
         rays_camera = self._pixel_to_camera_ray(pixel_coords)
@@ -502,7 +501,7 @@ class CoordinateTransformerEnhanced:
         # 7. WGS84 -> CGCS2000
         coords_cgcs2000 = self.convert_wgs84_to_cgcs2000(coords_wgs84)
         
-        logger.debug(f"[3D转换] 成功转换 {len(coords_cgcs2000)} 个坐标点")
+        logger.debug("[3D转换] 成功转换 {} 个坐标点", len(coords_cgcs2000))
         
         return coords_cgcs2000, quality_info
     
@@ -39,6 +39,13 @@ class DataSynchronizer:
         else:
             self.pose_buffer = deque(maxlen=buffer_size)
         
+        # 批量载入时建立的有序时间戳数组和帧号索引（逐条添加后失效，回退线性扫描）
+        self._ts_array: Optional[np.ndarray] = None
+        self._ts_poses: List[Dict[str, Any]] = []
+        self._ts_sorted = False
+        self._last_ts_idx = 0
+        self._frame_index: Optional[Dict[int, Dict[str, Any]]] = None
+        
         # 统计信息
         self.stats = {
             'total_frames': 0,
@@ -59,6 +66,60 @@ class DataSynchronizer:
             return
         
         self.pose_buffer.append(pose_data)
+        self._ts_array = None
+        self._frame_index = None
+    
+    def load_bulk(self, timestamps: np.ndarray, poses: List[Dict[str, Any]]):
+        """
+        批量载入位姿数据，替换当前缓冲区
+        
+        时间戳单调递增时按时间戳同步改用二分查找，帧号同步改用字典索引。
+        
+        Args:
+            timestamps: 与poses一一对应的时间戳数组 (毫秒)
+            poses: 位姿数据列表
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if len(timestamps) != len(poses):
+            raise ValueError(f"时间戳数量({len(timestamps)})与位姿数量({len(poses)})不一致")
+        
+        # 有缓冲区上限时只保留最新的数据
+        if self.buffer_size is not None and len(poses) > self.buffer_size:
+            timestamps = timestamps[-self.buffer_size:]
+            poses = poses[-self.buffer_size:]
+        
+        self.pose_buffer.clear()
+        self.pose_buffer.extend(poses)
+        
+        self._ts_array = timestamps
+        self._ts_poses = list(poses)  # deque按下标访问为O(n)，二分结果从列表中取
+        self._ts_sorted = bool(np.all(timestamps[1:] >= timestamps[:-1]))
+        self._last_ts_idx = 0
+        
+        # 帧号重复时保留首次出现的位姿，与线性扫描一致
+        self._frame_index = {}
+        for pose in poses:
+            if 'frame_number' in pose:
+                self._frame_index.setdefault(pose['frame_number'], pose)
+        
+        if not self._ts_sorted:
+            logger.warning("位姿时间戳非单调递增，按时间戳同步将使用线性扫描")
+    
+    def finalize(self):
+        """
+        逐条添加位姿后建立时间戳索引
+        
+        按时间戳稳定排序一次后批量载入，之后按时间戳同步使用二分查找。
+        """
+        poses = list(self.pose_buffer)
+        if not poses:
+            return
+        
+        timestamps = np.array([pose['timestamp'] for pose in poses], dtype=np.float64)
+        order = np.argsort(timestamps, kind='stable')
+        self.load_bulk(timestamps[order], [poses[i] for i in order])
+        
+        logger.debug("位姿时间戳索引已建立: {} 条", len(poses))
     
     def sync_frame_with_pose(
         self,
@@ -111,15 +172,18 @@ class DataSynchronizer:
                 logger.info(f"【同步器调试】时间差: {abs(first_pose['timestamp'] - frame_timestamp)/1000}秒")
         
         # 找到时间差最小的位姿数据
-        min_diff = float('inf')
-        best_pose = None
-        
-        for pose in self.pose_buffer:
-            time_diff = abs(pose['timestamp'] - frame_timestamp)
+        if self._ts_array is not None and self._ts_sorted:
+            best_pose, min_diff = self._nearest_by_bisect(frame_timestamp)
+        else:
+            min_diff = float('inf')
+            best_pose = None
             
-            if time_diff < min_diff:
-                min_diff = time_diff
-                best_pose = pose
+            for pose in self.pose_buffer:
+                time_diff = abs(pose['timestamp'] - frame_timestamp)
+                
+                if time_diff < min_diff:
+                    min_diff = time_diff
+                    best_pose = pose
         
         # 检查时间差是否在容差范围内
         # 调试：打印容差检查信息
@@ -136,13 +200,46 @@ class DataSynchronizer:
                 / self.stats['matched_frames']
             )
             
-            logger.debug(f"成功匹配位姿数据，时间差: {min_diff:.2f}ms")
+            logger.debug("成功匹配位姿数据，时间差: {:.2f}ms", min_diff)
             return best_pose
         else:
             self.stats['unmatched_frames'] += 1
-            logger.warning(f"未找到匹配的位姿数据，最小时间差: {min_diff:.2f}ms")
+            logger.warning("未找到匹配的位姿数据，最小时间差: {:.2f}ms", min_diff)
             return None
     
+    def _nearest_by_bisect(self, frame_timestamp: float) -> tuple:
+        """
+        在有序时间戳数组上二分查找最近的位姿
+        
+        时间差相同时取较早的位姿，结果与线性扫描一致。
+        
+        Args:
+            frame_timestamp: 帧时间戳 (毫秒)
+            
+        Returns:
+            (位姿数据, 时间差)
+        """
+        ts = self._ts_array
+        
+        # 帧时间通常单调递增，从上次命中位置开始二分
+        lo = self._last_ts_idx if ts[self._last_ts_idx] <= frame_timestamp else 0
+        i = lo + int(np.searchsorted(ts[lo:], frame_timestamp, side='left'))
+        
+        if i == 0:
+            best_idx = 0
+        elif i == len(ts):
+            best_idx = i - 1
+        elif frame_timestamp - ts[i - 1] <= ts[i] - frame_timestamp:
+            best_idx = i - 1
+        else:
+            best_idx = i
+        
+        # 时间戳重复时定位到第一次出现的位置
+        best_idx = int(np.searchsorted(ts, ts[best_idx], side='left'))
+        self._last_ts_idx = best_idx
+        
+        return self._ts_poses[best_idx], abs(float(ts[best_idx]) - frame_timestamp)
+    
     def _sync_by_frame_number(self, frame_number: int) -> Optional[Dict[str, Any]]:
         """
         基于帧号的匹配
@@ -153,14 +250,21 @@ class DataSynchronizer:
         Returns:
             匹配的位姿数据
         """
-        for pose in self.pose_buffer:
-            if 'frame_number' in pose and pose['frame_number'] == frame_number:
+        if self._frame_index is not None:
+            pose = self._frame_index.get(frame_number)
+            if pose is not None:
                 self.stats['matched_frames'] += 1
-                logger.debug(f"成功匹配位姿数据，帧号: {frame_number}")
+                logger.debug("成功匹配位姿数据，帧号: {}", frame_number)
                 return pose
+        else:
+            for pose in self.pose_buffer:
+                if 'frame_number' in pose and pose['frame_number'] == frame_number:
+                    self.stats['matched_frames'] += 1
+                    logger.debug("成功匹配位姿数据，帧号: {}", frame_number)
+                    return pose
         
         self.stats['unmatched_frames'] += 1
-        logger.warning(f"未找到匹配的位姿数据，帧号: {frame_number}")
+        logger.warning("未找到匹配的位姿数据，帧号: {}", frame_number)
         return None
     
     def interpolate_pose(
@@ -226,12 +330,15 @@ class DataSynchronizer:
         if 'roll' in before_pose and 'roll' in after_pose:
             interpolated_pose['roll'] = before_pose['roll'] + ratio * (after_pose['roll'] - before_pose['roll'])
         
-        logger.debug(f"插值位姿数据，时间: {frame_timestamp}, 比例: {ratio:.3f}")
+        logger.debug("插值位姿数据，时间: {}, 比例: {:.3f}", frame_timestamp, ratio)
         return interpolated_pose
     
     def clear_buffer(self):
         """清空位姿缓冲区"""
         self.pose_buffer.clear()
+        self._ts_array = None
+        self._ts_poses = []
+        self._frame_index = None
         logger.info("位姿缓冲区已清空")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -0,0 +1,123 @@
+"""
+CSV写入器单元测试
+测试批量格式化的输出与csv.writer逐字节一致
+"""
+
+import sys
+import csv
+import io
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from src.output.csv_writer import CSVWriter
+
+
+# 需要加引号或转义的字段值
+TRICKY_VALUES = [
+    'plain',
+    'comma,inside',
+    'quote"inside',
+    '"quoted"',
+    'line\nbreak',
+    'carriage\rreturn',
+    'crlf\r\nend',
+    ',"\n\r',
+    '',
+    ' leading and trailing ',
+    '中文,类别',
+    None,
+    0.1 + 0.2,
+    1e-7,
+    float('nan'),
+    True,
+    -1,
+]
+
+TEST_POSE = {
+    'timestamp': 1234.5,
+    'datetime': '2024-05-01 10:20:30.123',
+    'altitude': 120.5,
+    'latitude': 22.779954,
+    'longitude': 114.100891,
+}
+
+
+def _detection(value, index):
+    """生成一个在多个字符串字段中使用value的检测结果"""
+    return {
+        'track_id': value,
+        'class_id': index,
+        'class_name': value,
+        'confidence': 0.875,
+        'geo_coords': [(22.1 + index, 114.1), (22.2, 114.2), (22.3, 114.3), (22.4, 114.4)],
+        'center_geo': (22.25, 114.25),
+        'is_on_edge': index % 2 == 0,
+        'edge_positions': ['top', 'left'] if index % 3 == 0 else [],
+        'quality_info': {
+            'quality_level': value,
+            'positioning_state': 'RTK,fixed',
+            'gps_level': 5,
+            'satellite_count': 18,
+        } if index % 2 else {},
+        'estimated_error': 0.35,
+    }
+
+
+def _reference_bytes(fieldnames, rows):
+    """csv.writer默认方言的输出"""
+    buf = io.StringIO(newline='')
+    writer = csv.writer(buf)
+    writer.writerow(fieldnames)
+    writer.writerows(rows)
+    return buf.getvalue().encode('utf-8')
+
+
+@pytest.fixture
+def writer(tmp_path):
+    csv_writer = CSVWriter(str(tmp_path / 'out.csv'), flush_rows=1000, flush_interval=0)
+    yield csv_writer
+    csv_writer.close()
+
+
+class TestCSVFormatting:
+    """批量格式化与csv.writer一致性测试"""
+
+    @pytest.mark.parametrize('value', TRICKY_VALUES)
+    def test_format_rows_matches_csv_writer(self, writer, value):
+        """单个特殊字段值的格式化结果与csv.writer一致"""
+        pose_head, pose_tail = writer._pose_fields(TEST_POSE)
+        row = writer._build_row(_detection(value, 3), 7, value, pose_head, pose_tail)
+        writer._pending.append(row)
+
+        expected = _reference_bytes(writer.fieldnames, [row])
+        header_len = len(_reference_bytes(writer.fieldnames, []))
+        assert writer._format_rows() == expected[header_len:]
+
+    def test_file_matches_csv_writer(self, writer, tmp_path):
+        """写入文件的完整内容（含表头）与csv.writer逐字节一致"""
+        detections = [_detection(value, i) for i, value in enumerate(TRICKY_VALUES)]
+        image_paths = [f'images/frame 7,{i}.jpg' for i in range(len(detections))]
+        writer.write_batch(detections, TEST_POSE, 7, image_paths)
+        writer.write(_detection('single,"row"\n', 99), TEST_POSE, 8, 'a"b.jpg')
+
+        pose_head, pose_tail = writer._pose_fields(TEST_POSE)
+        rows = [
+            writer._build_row(detection, 7, image_path, pose_head, pose_tail)
+            for detection, image_path in zip(detections, image_paths)
+        ]
+        rows.append(
+            writer._build_row(_detection('single,"row"\n', 99), 8, 'a"b.jpg', pose_head, pose_tail)
+        )
+        writer.close()
+
+        data = (tmp_path / 'out.csv').read_bytes()
+        assert data == _reference_bytes(writer.fieldnames, rows)
+
+        # 读回后与原始字段一致
+        with open(tmp_path / 'out.csv', newline='', encoding='utf-8') as f:
+            records = list(csv.reader(f))
+        assert len(records) == len(rows) + 1
+        assert records[1][writer.fieldnames.index('class_name')] == 'plain'
+        assert records[2][writer.fieldnames.index('class_name')] == 'comma,inside'
+        assert records[5][writer.fieldnames.index('class_name')] == 'line\nbreak'
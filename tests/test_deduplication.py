@@ -0,0 +1,131 @@
+"""
+检测去重单元测试
+测试空间分组（经由中间检测传递相连）和同分检测的取舍
+"""
+
+import sys
+import itertools
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.output import deduplication
+from src.output.deduplication import DetectionDeduplicator
+from src.output.distance_kernel import EARTH_RADIUS
+
+
+# 每米对应的纬度（度）
+DEG_PER_METER = 180.0 / (np.pi * EARTH_RADIUS)
+
+BASE_LAT = 22.779954
+BASE_LON = 114.100891
+
+
+def _detection(name, north_m, confidence, **extra):
+    """在基准点以北 north_m 米处生成一个检测"""
+    detection = {
+        'name': name,
+        'center_lat': BASE_LAT + north_m * DEG_PER_METER,
+        'center_lon': BASE_LON,
+        'confidence': confidence,
+    }
+    detection.update(extra)
+    return detection
+
+
+@pytest.fixture(params=['scipy', 'numpy'])
+def deduplicator(request, monkeypatch):
+    """分别使用scipy和numpy实现的近邻查询与连通分量"""
+    if request.param == 'scipy':
+        if not deduplication.SCIPY_AVAILABLE:
+            pytest.skip("未安装scipy")
+    else:
+        monkeypatch.setattr(deduplication, 'SCIPY_AVAILABLE', False)
+    return DetectionDeduplicator({'distance_threshold': 5.0})
+
+
+class TestGrouping:
+    """空间分组测试"""
+
+    def test_bridge_point_merges_groups(self, deduplicator):
+        """A-C相距8米超过阈值，但都与中间的B相距4米，三者归为一组"""
+        a = _detection('A', 0.0, 0.6)
+        b = _detection('B', 4.0, 0.7)
+        c = _detection('C', 8.0, 0.9)
+        far = _detection('D', 30.0, 0.5)
+
+        groups = deduplicator._group_by_distance([a, far, c, b])
+        assert [[det['name'] for det in group] for group in groups] == [['A', 'C', 'B'], ['D']]
+
+    def test_partition_independent_of_order(self, deduplicator):
+        """任意输入顺序下分组结果相同，组号按各组第一个检测出现的顺序编号"""
+        detections = [
+            _detection('A', 0.0, 0.6),
+            _detection('B', 4.0, 0.7),
+            _detection('C', 8.0, 0.9),
+            _detection('D', 30.0, 0.5),
+            _detection('E', 33.0, 0.5),
+        ]
+        for permutation in itertools.permutations(detections):
+            groups = deduplicator._group_by_distance(list(permutation))
+            partition = sorted(sorted(det['name'] for det in group) for group in groups)
+            assert partition == [['A', 'B', 'C'], ['D', 'E']]
+            assert groups[0][0] is permutation[0]
+
+    def test_threshold_is_exclusive(self, deduplicator):
+        """距离恰好等于阈值附近：小于阈值相连，大于阈值不相连"""
+        groups = deduplicator._group_by_distance([
+            _detection('A', 0.0, 0.5),
+            _detection('B', 4.999, 0.5),
+            _detection('C', 10.001, 0.5),
+        ])
+        assert [[det['name'] for det in group] for group in groups] == [['A', 'B'], ['C']]
+
+    def test_missing_coordinates_form_own_groups(self, deduplicator):
+        """坐标缺失的检测各自成组"""
+        nan = _detection('N', 0.0, 0.5)
+        nan['center_lat'] = float('nan')
+        groups = deduplicator._group_by_distance([
+            _detection('A', 0.0, 0.5), nan, dict(nan, name='M'), _detection('B', 1.0, 0.5)
+        ])
+        assert [[det['name'] for det in group] for group in groups] == [['A', 'B'], ['N'], ['M']]
+
+
+class TestDeduplicate:
+    """每组保留最佳检测测试"""
+
+    def test_bridge_keeps_single_best(self, deduplicator):
+        """经由中间检测相连的一组只保留评分最高的"""
+        result = deduplicator.deduplicate([
+            _detection('A', 0.0, 0.6),
+            _detection('B', 4.0, 0.7),
+            _detection('C', 8.0, 0.9),
+        ])
+        assert [det['name'] for det in result] == ['C']
+
+    def test_tie_keeps_first(self, deduplicator):
+        """同组同分时保留靠前的检测，各组按组号顺序输出"""
+        result = deduplicator.deduplicate([
+            _detection('far', 50.0, 0.4),
+            _detection('first', 0.0, 0.8),
+            _detection('edge', 2.0, 0.9, is_on_edge=True),
+            _detection('second', 4.0, 0.8),
+        ])
+        assert [det['name'] for det in result] == ['far', 'first']
+
+    def test_dataframe_matches_list(self, deduplicator):
+        """DataFrame去重与列表去重结果一致"""
+        detections = [
+            _detection('A', 0.0, 0.6, gps_quality='RTK'),
+            _detection('B', 4.0, 0.7, gps_quality='LOW'),
+            _detection('C', 8.0, 0.6, gps_quality='RTK'),
+            _detection('D', 30.0, 0.5, gps_quality='HIGH', estimated_error=12.0),
+            _detection('E', 33.0, 0.5, gps_quality='HIGH'),
+        ]
+        expected = [det['name'] for det in deduplicator.deduplicate(detections)]
+        df_unique = deduplicator.deduplicate_dataframe(pd.DataFrame(detections))
+
+        assert expected == ['A', 'E']
+        assert df_unique['name'].tolist() == expected
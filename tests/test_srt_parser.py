@@ -0,0 +1,137 @@
+"""
+SRT解析器单元测试
+测试字节扫描器与逐块Python解析结果的一致性（含格式异常的字幕块）
+"""
+
+import sys
+import importlib.util
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+from src.input import srt_parser, srt_scanner
+from src.input.srt_parser import SRTParser
+
+
+def _dji_block(index, frame, lat='22.779954', lon='114.100891', alt='120.500'):
+    """生成一个DJI格式的字幕块"""
+    ms = index * 33
+    start = f"00:00:{ms // 1000:02d},{ms % 1000:03d}"
+    end = f"00:00:{(ms + 33) // 1000:02d},{(ms + 33) % 1000:03d}"
+    return (
+        f"{index}\n"
+        f"{start} --> {end}\n"
+        f"<font size=\"28\">FrameCnt: {frame}, DiffTime: 33ms\n"
+        f"2024-05-01 10:20:30.{ms % 1000:03d}\n"
+        f"[iso: 100] [shutter: 1/1000.0] [fnum: 2.8] [ev: 0] "
+        f"[latitude: {lat}] [longitude: {lon}] "
+        f"[altitude: {alt}] "
+        f"[gb_yaw: -30.5 gb_pitch: -90.0 gb_roll: 0.0] "
+        f"[yaw: -30.5] [pitch: -90.0] [roll: 0.0] </font>\n"
+    )
+
+
+# 格式异常的字幕块：经纬度格式不符、缺少字段、非ASCII、非定宽时间戳等
+MALFORMED_BLOCKS = [
+    # 整数经纬度（必须带小数部分）
+    _dji_block(101, 101, lat='22'),
+    _dji_block(113, 113, lon='114'),
+    # 缺少整数部分或小数部分的经纬度
+    _dji_block(102, 102, lat='.0'),
+    _dji_block(114, 114, lon='114.'),
+    # 同一前缀多次出现，第一次不符合格式
+    _dji_block(103, 103).replace('[latitude: 22.779954]', '[latitude: N/A] [latitude: 22.5]'),
+    # 缺少GPS
+    _dji_block(104, 104).replace('[longitude: 114.100891] ', ''),
+    # 非定宽时间戳 / 错误的箭头
+    "105\n0:00:03,465 --> 0:00:03,498\n[latitude: 22.1] [longitude: 114.1]\n",
+    "106\n00:00:03,498 ->: 00:00:03,531\n[latitude: 22.1] [longitude: 114.1]\n",
+    # 非ASCII字符和大写前缀
+    _dji_block(107, 107).replace('[iso: 100]', '[备注: 测试]').replace('latitude', 'Latitude'),
+    # 只有两行
+    "108\n00:00:03,564 --> 00:00:03,597\n",
+    # 带符号和超长数字
+    _dji_block(109, '+109', lat='-22.779954', lon='+114.100891', alt='12345678901234567890.5'),
+    # 帧号和时间差格式不符
+    _dji_block(110, 'x').replace('DiffTime: 33ms', 'DiffTime: 33'),
+    # 序号不是数字
+    "abc\n00:00:03,663 --> 00:00:03,696\n[latitude: 22.1] [longitude: 114.1]\n",
+    # 高度和姿态角省略小数部分
+    _dji_block(112, 112, alt='120').replace('yaw: -30.5', 'yaw: 30.'),
+]
+
+
+def _write_srt(path, blocks, newline='\n'):
+    text = '\n'.join(blocks).replace('\n', newline)
+    path.write_bytes(text.encode('utf-8'))
+    return str(path)
+
+
+def _load_scanner_without_numba(monkeypatch):
+    """在屏蔽numba的情况下重新加载扫描器模块（纯Python执行）"""
+    monkeypatch.setitem(sys.modules, 'numba', None)
+    spec = importlib.util.spec_from_file_location(
+        'srt_scanner_no_numba', srt_scanner.__file__
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert not module.NUMBA_AVAILABLE
+    return module
+
+
+@pytest.fixture(params=['numba', 'no_numba'])
+def scanner_parser(request, monkeypatch):
+    """分别使用Numba编译和纯Python执行的扫描器"""
+    if request.param == 'numba':
+        if not srt_scanner.NUMBA_AVAILABLE:
+            pytest.skip("未安装numba")
+    else:
+        monkeypatch.setattr(srt_parser, 'srt_scanner', _load_scanner_without_numba(monkeypatch))
+    parser = SRTParser(backend='python')
+    parser.backend = 'numba'
+    return parser
+
+
+@pytest.fixture
+def sample_blocks():
+    normal = [_dji_block(i, i) for i in range(1, 41)]
+    return normal[:20] + MALFORMED_BLOCKS + normal[20:]
+
+
+class TestScannerParity:
+    """字节扫描器与Python解析结果一致性测试"""
+
+    @pytest.mark.parametrize('newline', ['\n', '\r\n'])
+    def test_parity_with_python(self, scanner_parser, sample_blocks, tmp_path, newline):
+        """扫描器结果与逐块Python解析完全一致"""
+        srt_path = _write_srt(tmp_path / 'sample.srt', sample_blocks, newline)
+
+        expected = SRTParser(backend='python').parse(srt_path)
+        actual = scanner_parser.parse(srt_path)
+
+        assert actual == expected
+        assert [type(v) for p in actual for v in p.values()] == \
+            [type(v) for p in expected for v in p.values()]
+
+    def test_malformed_blocks(self, scanner_parser, tmp_path):
+        """格式异常的字幕块按字段格式取舍"""
+        srt_path = _write_srt(tmp_path / 'malformed.srt', MALFORMED_BLOCKS)
+        poses = {p['block_number']: p for p in scanner_parser.parse(srt_path)}
+
+        # 整数或缺少整数部分的经纬度视为缺失
+        for block_number in (101, 102, 113, 114):
+            assert block_number not in poses
+        assert 104 not in poses
+        assert 108 not in poses
+        # 第一次出现不符合格式时使用下一次出现
+        assert poses[103]['latitude'] == 22.5
+        assert poses[105]['timestamp'] == 3465
+        assert poses[106]['timestamp'] == 0.0
+        assert poses[107]['latitude'] == 22.779954
+        assert 'frame_number' not in poses[109]
+        assert poses[109]['latitude'] == -22.779954
+        assert poses[109]['altitude'] == 12345678901234567890.5
+        assert 'frame_number' not in poses[110]
+        assert 'diff_time' not in poses[110]
+        assert poses[112]['altitude'] == 120.0
+        assert poses[112]['yaw'] == 30.0
@@ -0,0 +1,215 @@
+"""
+YOLO 模型 TensorRT 引擎导出脚本
+将 PyTorch 权重导出为 TensorRT 引擎（FP16 或 INT8），供检测流程通过
+yolo_config.yaml 的 model.engine 加载。
+
+INT8 需要校准数据：可直接指定数据集配置 (--data)，或从航拍图片目录中
+均匀抽取若干张图片 (--calib-dir) 自动生成校准数据集。
+
+导出的引擎为动态批次（最大批次为 --batch），运行时 batch.size 不能超过该值。
+引擎与导出时的 GPU 型号、TensorRT 版本和 imgsz 绑定，更换环境需重新导出。
+
+使用方式:
+    python tools/export_tensorrt.py --model models/yolov11x.pt --half
+    python tools/export_tensorrt.py --model models/yolov11x.pt --int8 --calib-dir data/input/images
+    python tools/export_tensorrt.py --model runs/obb/train/weights/best.pt --int8 --data data/dataset.yaml --imgsz 1280
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+from ultralytics import YOLO
+
+
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+
+def build_calibration_dataset(calib_dir: str, names: dict, num_images: int, work_dir: str) -> str:
+    """
+    从图片目录均匀抽取图片，生成 INT8 校准用的数据集配置
+
+    Args:
+        calib_dir: 航拍图片目录
+        names: 模型类别名称映射
+        num_images: 抽取图片数
+        work_dir: 临时目录
+
+    Returns:
+        数据集配置文件路径
+    """
+    with os.scandir(calib_dir) as entries:
+        image_files = sorted(
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_SUFFIXES)
+        )
+
+    if not image_files:
+        print(f"[错误] 校准目录中没有图片: {calib_dir}")
+        sys.exit(1)
+
+    # 按间隔抽样，覆盖整段航线的不同场景
+    step = max(1, len(image_files) // num_images)
+    samples = image_files[::step][:num_images]
+
+    images_dir = Path(work_dir) / "images" / "val"
+    images_dir.mkdir(parents=True)
+    for src in samples:
+        shutil.copy(src, images_dir / Path(src).name)
+
+    data_path = Path(work_dir) / "calib.yaml"
+    with open(data_path, "w", encoding="utf-8") as f:
+        f.write(f"path: {Path(work_dir).as_posix()}\n")
+        f.write("train: images/val\n")
+        f.write("val: images/val\n")
+        f.write("names:\n")
+        for idx, name in sorted(names.items()):
+            f.write(f"  {idx}: \"{name}\"\n")
+
+    print(f"[信息] 校准图片: {len(samples)} 张 (共 {len(image_files)} 张)")
+    return str(data_path)
+
+
+def export(
+    model_path: str,
+    imgsz: int = 1280,
+    batch: int = 8,
+    half: bool = False,
+    int8: bool = False,
+    data_path: str = None,
+    calib_dir: str = None,
+    calib_images: int = 200,
+    workspace: float = 4.0,
+    device: str = "0",
+):
+    """导出 TensorRT 引擎"""
+    if not Path(model_path).exists():
+        print(f"[错误] 模型文件不存在: {model_path}")
+        sys.exit(1)
+
+    print(f"[信息] 加载模型: {model_path}")
+    model = YOLO(model_path)
+
+    work_dir = None
+    try:
+        if int8 and not data_path:
+            if not calib_dir:
+                print("[错误] INT8 导出需要 --data 或 --calib-dir 提供校准图片")
+                sys.exit(1)
+            work_dir = tempfile.mkdtemp(prefix="trt_calib_")
+            data_path = build_calibration_dataset(calib_dir, model.names, calib_images, work_dir)
+
+        precision = "INT8" if int8 else ("FP16" if half else "FP32")
+        print(f"[信息] 开始导出 TensorRT 引擎 ({precision}, imgsz={imgsz}, 最大批次={batch})...")
+
+        export_args = dict(
+            format="engine",
+            imgsz=imgsz,
+            batch=batch,
+            dynamic=True,
+            half=half and not int8,
+            int8=int8,
+            workspace=workspace,
+            device=device,
+        )
+        if int8:
+            export_args["data"] = data_path
+
+        engine_path = model.export(**export_args)
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print("[完成] TensorRT 引擎导出成功")
+    print(f"  引擎文件: {engine_path}")
+    print("  在 config/yolo_config.yaml 中设置:")
+    print(f"    model.engine: \"{Path(engine_path).as_posix()}\"")
+    print(f"    detection.imgsz: {imgsz}")
+    print(f"    batch.size: <= {batch}")
+    print("=" * 60)
+
+    return engine_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 模型 TensorRT 引擎导出")
+    parser.add_argument(
+        "--model",
+        type=str,
+        required=True,
+        help="PyTorch 权重路径 (如 models/yolov11x.pt)",
+    )
+    parser.add_argument(
+        "--imgsz",
+        type=int,
+        default=1280,
+        help="模型输入尺寸，需与 detection.imgsz 一致 (默认: 1280)",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=8,
+        help="动态批次上限，需不小于 batch.size (默认: 8)",
+    )
+    parser.add_argument(
+        "--half",
+        action="store_true",
+        help="导出 FP16 引擎",
+    )
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="导出 INT8 引擎（需要校准数据）",
+    )
+    parser.add_argument(
+        "--data",
+        type=str,
+        default=None,
+        help="INT8 校准用数据集配置 (使用其 val 划分)",
+    )
+    parser.add_argument(
+        "--calib-dir",
+        type=str,
+        default=None,
+        help="INT8 校准图片目录 (未指定 --data 时使用)",
+    )
+    parser.add_argument(
+        "--calib-images",
+        type=int,
+        default=200,
+        help="从校准目录抽取的图片数 (默认: 200)",
+    )
+    parser.add_argument(
+        "--workspace",
+        type=float,
+        default=4.0,
+        help="TensorRT 构建工作空间 GB (默认: 4)",
+    )
+    parser.add_argument(
+        "--device",
+        type=str,
+        default="0",
+        help="设备 (默认: 0, 即第一块 GPU)",
+    )
+    args = parser.parse_args()
+
+    export(
+        model_path=args.model,
+        imgsz=args.imgsz,
+        batch=args.batch,
+        half=args.half,
+        int8=args.int8,
+        data_path=args.data,
+        calib_dir=args.calib_dir,
+        calib_images=args.calib_images,
+        workspace=args.workspace,
+        device=args.device,
+    )
+
+
+if __name__ == "__main__":
+    main()